@@ -3,12 +3,11 @@ from flask import Flask, send_from_directory, jsonify
 from flask_cors import CORS
 from flask_login import login_required
 from extensions import db
-from models import User, FAQ, DrugAlert, EducationalContent, SystemLog
 
 from auth import login_manager, auth_bp
 from routes_hybrid import api_bp, user_bp, pharma_bp
 from config import config
-from google_sheets_service import init_sheets_service
+from startup import start_warm_up
 
 def create_app(config_name=None):
     if config_name is None:
@@ -26,25 +25,14 @@ def create_app(config_name=None):
     login_manager.login_message = "يجب تسجيل الدخول للوصول إلى هذه الصفحة"
     login_manager.login_message_category = "info"
     
-    # Initialize Google Sheets service (deferred initialization)
-    def initialize_services():
-        if not hasattr(app, '_services_initialized'):
-            try:
-                sheets_service = init_sheets_service()
-                if sheets_service.is_available():
-                    app.logger.info("Google Sheets service initialized successfully")
-                else:
-                    app.logger.warning("Google Sheets service not available - reports will not be saved")
-                app._services_initialized = True
-            except Exception as e:
-                app.logger.error(f"Failed to initialize Google Sheets service: {e}")
-                app._services_initialized = True
-    
-    # Call initialization on first request
+    # Database setup, Google Sheets connection and background workers run in a
+    # warm-up thread per worker process (started by gunicorn's post_fork hook,
+    # or by the first request when running without gunicorn)
     @app.before_request
-    def before_first_request():
-        initialize_services()
-        initialize_database()
+    def wait_for_warm_up():
+        database_ready = start_warm_up(app)
+        if not database_ready.is_set():
+            database_ready.wait(app.config.get('WARM_UP_DATABASE_TIMEOUT', 30.0))
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix="/auth")
@@ -68,6 +56,9 @@ def create_app(config_name=None):
             sheets_service = get_sheets_service()
             if not sheets_service.is_available():
                 sheets_status = "disconnected"
+            elif sheets_service.scheduler.breaker.is_open:
+                # Upstream outage: calls fail fast until the supervisor's probe succeeds
+                sheets_status = "circuit_open"
         except Exception:
             sheets_status = "error"
         
@@ -111,40 +102,6 @@ def create_app(config_name=None):
         db.session.rollback()
         return jsonify({"error": "Internal server error", "message": "حدث خطأ في الخادم"}), 500
     
-    # Initialize database and create admin user (deferred initialization)
-    def initialize_database():
-        if not hasattr(app, '_database_initialized'):
-            db.create_all()
-            
-            # Create default admin user if it doesn't exist
-            admin_user = User.query.filter_by(username='admin').first()
-            if not admin_user:
-                admin_user = User(
-                    username='admin',
-                    email='admin@pharmacovigilance.iq',
-                    role='admin',
-                    full_name='مدير النظام',
-                    department='إدارة النظام'
-                )
-                admin_user.set_password(os.environ.get('ADMIN_PASSWORD', 'admin123'))
-                db.session.add(admin_user)
-                db.session.commit()
-                app.logger.info("Default admin user created")
-            
-            # Seed FAQ data if tables are empty (only PostgreSQL data)
-            if FAQ.query.count() == 0:
-                try:
-                    from seed_data_hybrid import seed_database
-                    seed_database()
-                    app.logger.info("Database seeded successfully")
-                except ImportError:
-                    app.logger.warning("seed_data_hybrid module not found, skipping seeding")
-                except Exception as e:
-                    app.logger.error(f"Error seeding database: {e}")
-            
-            app._database_initialized = True
-    
-    
     return app
 
 # Create application instance for WSGI
@@ -2,6 +2,7 @@ from functools import wraps
 from flask import Blueprint, request, jsonify, session, current_app
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from datetime import datetime
+from sqlalchemy.orm import joinedload
 from models import User, SystemLog
 from extensions import db
 
@@ -320,17 +321,30 @@ def reset_user_password(user_id):
             'message': 'حدث خطأ أثناء إعادة تعيين كلمة المرور'
         }), 500
 
+def activity_logs_query(user_id=None, action=None):
+    """Activity logs newest first, optionally for one user or action.
+    
+    Each filter plus the sort is served by one of the system_logs indexes,
+    and the user is loaded in the same query instead of once per log.
+    """
+    query = SystemLog.query.options(joinedload(SystemLog.user))
+    if user_id is not None:
+        query = query.filter(SystemLog.user_id == user_id)
+    if action:
+        query = query.filter(SystemLog.action == action)
+    return query.order_by(SystemLog.timestamp.desc())
+
 @auth_bp.route('/activity-logs', methods=['GET'])
 @require_role('admin')
 def get_activity_logs():
     """Get system activity logs (admin only)"""
     try:
         page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 50, type=int)
+        per_page = min(request.args.get('per_page', 50, type=int), 500)
         
-        logs = SystemLog.query.order_by(SystemLog.timestamp.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        logs = activity_logs_query(
+            request.args.get('user_id', type=int), request.args.get('action')
+        ).paginate(page=page, per_page=per_page, error_out=False)
         
         return jsonify({
             'logs': [log.to_dict() for log in logs.items],
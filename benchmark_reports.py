@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Report Path Benchmark for Pharmacovigilance Iraq Platform
+Measures throughput and tail latency of the report submit and dashboard paths
+against the fake Sheets backend, so no Google account is needed.
+
+Usage:
+    python benchmark_reports.py --submits 500 --reads 200 --latency 0.15
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_phase(name, count, concurrency, request):
+    """Run `count` requests over `concurrency` threads and print latency figures"""
+    latencies = []
+    failures = 0
+
+    def timed(index):
+        started = time.perf_counter()
+        ok = request(index)
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for elapsed, ok in pool.map(timed, range(count)):
+            latencies.append(elapsed)
+            if not ok:
+                failures += 1
+    wall = time.perf_counter() - started
+
+    print(f"{name}: {count} requests in {wall:.2f}s ({count / wall:.1f} req/s), {failures} failed")
+    print(f"  p50 {percentile(latencies, 0.50) * 1000:.1f} ms | "
+          f"p95 {percentile(latencies, 0.95) * 1000:.1f} ms | "
+          f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms | "
+          f"mean {statistics.mean(latencies) * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--submits', type=int, default=200, help='public report submissions to send')
+    parser.add_argument('--reads', type=int, default=100, help='dashboard listing/statistics requests to send')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads')
+    parser.add_argument('--latency', type=float, default=0.1, help='simulated Sheets API latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='probability of a simulated 503')
+    parser.add_argument('--read-quota', type=int, default=0, help='simulated read requests per minute (0 = unlimited)')
+    parser.add_argument('--write-quota', type=int, default=0, help='simulated write requests per minute (0 = unlimited)')
+    args = parser.parse_args()
+
+    os.environ['REPORT_STORAGE_BACKEND'] = 'fake'
+    os.environ['FAKE_SHEETS_LATENCY'] = str(args.latency)
+    os.environ['FAKE_SHEETS_ERROR_RATE'] = str(args.error_rate)
+    os.environ['FAKE_SHEETS_READ_QUOTA'] = str(args.read_quota)
+    os.environ['FAKE_SHEETS_WRITE_QUOTA'] = str(args.write_quota)
+    os.environ.setdefault('FLASK_ENV', 'development')
+    os.environ.setdefault('DEV_DATABASE_URL', 'sqlite:///benchmark.db')
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from app import app
+    from google_sheets_service import get_sheets_service
+
+    client = app.test_client()
+    client.get('/health')  # start the warm-up
+    deadline = time.monotonic() + 30
+    with app.app_context():
+        while not get_sheets_service().is_available():  # wait for the Sheets connection
+            if time.monotonic() > deadline:
+                raise SystemExit('The fake Sheets backend did not connect within 30s; see the log above')
+            time.sleep(0.05)
+
+    def submit(index):
+        response = client.post('/api/submit_report', json={
+            'drug_name': f'Benchmark drug {index % 25}',
+            'reaction_description': 'rash',
+            'reaction_severity': ['mild', 'moderate', 'severe'][index % 3],
+            'governorate': ['Baghdad', 'Basra', 'Najaf', 'Erbil'][index % 4]
+        })
+        return response.status_code == 200
+
+    def read(index):
+        response = client.get('/pharma/statistics')
+        return response.status_code == 200
+
+    run_phase('submit', args.submits, args.concurrency, submit)
+    run_phase('statistics', args.reads, args.concurrency, read)
+
+    with app.app_context():
+        stats = get_sheets_service().gc.stats
+    print(f"Sheets API calls: {stats['read']} reads, {stats['write']} writes, "
+          f"{stats['errors']} injected errors, {stats['quota_errors']} quota errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Query Plan Check for Pharmacovigilance Iraq Platform
+Runs EXPLAIN on the database queries behind the API endpoints and fails if
+any of them plans a sequential scan of a table holding more than --min-rows
+rows. Uses the application's database (DATABASE_URL, or DEV_DATABASE_URL in
+development); PostgreSQL and SQLite are supported.
+
+PostgreSQL picks sequential scans for small or never-analyzed tables, so run
+it against a database with production-sized tables after ANALYZE. On SQLite
+the plan does not depend on table sizes; --min-rows 0 checks every table,
+empty ones included. Unfiltered single-table LIMIT queries, which SQLite
+reports as SCAN but stop after LIMIT rows, are listed as exempt.
+
+Usage:
+    python check_query_plans.py --min-rows 10000
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+# A full table scan in EXPLAIN QUERY PLAN; index scans read "SCAN t USING INDEX ..."
+SQLITE_TABLE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?(?: LEFT-JOIN)?$')
+
+
+def endpoint_queries():
+    """(endpoint, query, full pass expected) for every query the endpoints run.
+
+    Queries marked as full passes read every row by design, like the page
+    total of an unfiltered listing or a content listing requested without
+    ?limit; their scans are reported but do not fail.
+    """
+    from extensions import db
+    from models import User
+    from auth import activity_logs_query
+    from content_listing import ContentOptions
+    from report_mirror import query_reports, reports_after
+
+    def count(query):
+        return db.select(db.func.count()).select_from(
+            query.enable_eagerloads(False).order_by(None).subquery()
+        )
+
+    content = []
+    for table in ('faqs', 'drug_alerts', 'educational_content'):
+        # The argument-less listing returns the whole table, as it always did
+        content.append((f'GET /api/{table}', ContentOptions(table).statement(), True))
+        content.append((f'GET /api/{table}?lang=&limit=',
+                        ContentOptions(table, lang='en', limit=20).statement(), False))
+        content.append((f'GET /api/{table}?lang=&active=&category=&limit=&cursor=',
+                        ContentOptions(table, lang='en', category='general', active=True,
+                                       limit=20, after=1000).statement(), False))
+
+    return content + [
+        ('POST /auth/login', User.query.filter_by(username='admin'), False),
+        ('GET /auth/activity-logs', activity_logs_query().limit(50), False),
+        ('GET /auth/activity-logs (total)', count(activity_logs_query()), True),
+        ('GET /auth/activity-logs?user_id=', activity_logs_query(user_id=1).limit(50), False),
+        ('GET /auth/activity-logs?user_id= (total)', count(activity_logs_query(user_id=1)), False),
+        ('GET /auth/activity-logs?action=', activity_logs_query(action='login').limit(50), False),
+        ('GET /pharma/adverse_reactions', query_reports('adverse_reactions', {}).limit(50), False),
+        ('GET /pharma/adverse_reactions?limit=&cursor=',
+         reports_after(query_reports('adverse_reactions', {}), 'adverse_reactions', {},
+                       ['2026-10-01T00:00:00', 1000])[0].limit(51), False),
+        ('GET /pharma/adverse_reactions?status=',
+         query_reports('adverse_reactions', {'status': 'new'}).limit(50), False),
+        ('GET /pharma/adverse_reactions?severity=',
+         query_reports('adverse_reactions', {'severity': 'severe'}).limit(50), False),
+        ('GET /pharma/intruder_reports', query_reports('intruder_reports', {}).limit(50), False),
+        ('GET /pharma/intruder_reports?status=',
+         query_reports('intruder_reports', {'status': 'new'}).limit(50), False),
+    ]
+
+
+def to_sql(query, dialect) -> str:
+    """SQL text of a query or select with its parameters inlined"""
+    statement = getattr(query, 'statement', query)
+    return str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+
+
+def _postgresql_scans(plan):
+    """Tables read by Seq Scan nodes of a JSON plan tree"""
+    tables = []
+    if plan.get('Node Type') == 'Seq Scan':
+        tables.append(plan['Relation Name'])
+    for child in plan.get('Plans', []):
+        tables.extend(_postgresql_scans(child))
+    return tables
+
+
+def sequential_scans(connection, sql, table_names):
+    """Tables the plan of sql reads with a sequential scan, scans exempted as bounded, and the plan as text"""
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        plan = connection.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + sql).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return _postgresql_scans(plan[0]['Plan']), [], json.dumps(plan[0]['Plan'], indent=2)
+
+    if dialect == 'sqlite':
+        details = [row[3] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql)]
+        tables = []
+        for detail in details:
+            match = SQLITE_TABLE_SCAN.match(detail)
+            if not match:
+                continue
+            # SQLAlchemy aliases tables as <table>_1; subqueries (anon_1) are not tables
+            name = match.group(1)
+            name = name if name in table_names else re.sub(r'_\d+$', '', name)
+            if name in table_names:
+                tables.append(name)
+
+        # An unfiltered single-table ORDER BY id LIMIT n walks the rowid b-tree and
+        # stops after n rows, but EXPLAIN QUERY PLAN reports it as a plain SCAN
+        accesses = [detail for detail in details if detail.startswith(('SCAN', 'SEARCH'))]
+        if (len(tables) == 1 and len(accesses) == 1 and re.search(r'\bLIMIT\b', sql)
+                and not re.search(r'\bWHERE\b', sql) and not any('TEMP B-TREE' in detail for detail in details)):
+            return [], tables, '\n'.join(details)
+        return tables, [], '\n'.join(details)
+
+    raise SystemExit(f'EXPLAIN check is not supported on {dialect}')
+
+
+def table_rows(connection, table) -> int:
+    """Row count of a table; the planner's estimate on PostgreSQL once it has one"""
+    from extensions import db
+
+    if connection.dialect.name == 'postgresql':
+        estimate = connection.execute(
+            db.text('SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)'), {'table': table}
+        ).scalar()
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+    return connection.execute(db.select(db.func.count()).select_from(db.metadata.tables[table])).scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--min-rows', type=int, default=10000,
+                        help='fail on sequential scans of tables with more rows than this')
+    parser.add_argument('--verbose', action='store_true', help='print every plan')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from app import app
+    from extensions import db
+
+    failures = 0
+    with app.app_context():
+        table_names = set(db.metadata.tables)
+        missing = table_names - set(db.inspect(db.engine).get_table_names())
+        if missing:
+            # A fresh database gets its tables from the first request's warm-up
+            print(f"Creating missing tables: {', '.join(sorted(missing))}")
+            db.create_all()
+
+        sizes = {}
+        with db.engine.connect() as connection:
+            for endpoint, query, full_pass in endpoint_queries():
+                tables, exempt, plan = sequential_scans(connection, to_sql(query, connection.dialect), table_names)
+                problems = []
+                for table in tables:
+                    if table not in sizes:
+                        sizes[table] = table_rows(connection, table)
+                    if args.min_rows <= 0 or sizes[table] > args.min_rows:
+                        problems.append(f'{table} ({sizes[table]:,} rows)')
+
+                if problems and not full_pass:
+                    failures += 1
+                    print(f"FAIL {endpoint}: sequential scan of {', '.join(problems)}")
+                elif problems:
+                    print(f"ok   {endpoint}: full pass over {', '.join(problems)}")
+                elif exempt:
+                    print(f"skip {endpoint}: SCAN {', '.join(exempt)} reads LIMIT rows in rowid order (exempt)")
+                else:
+                    print(f"ok   {endpoint}")
+                if args.verbose or exempt or (problems and not full_pass):
+                    print('     ' + plan.replace('\n', '\n     '))
+
+    print(f"{failures} of the checked queries scan large tables sequentially" if failures
+          else "No sequential scans of large tables")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -40,6 +41,86 @@ class Config:
     # Rate limiting
     RATELIMIT_STORAGE_URL = os.environ.get('REDIS_URL') or 'memory://'
     
+    # Report outbox (write-behind queue for Google Sheets appends)
+    OUTBOX_ENABLED = os.environ.get('OUTBOX_ENABLED', 'true').lower() in ['true', 'on', '1']
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE') or 100)
+    OUTBOX_FLUSH_INTERVAL = float(os.environ.get('OUTBOX_FLUSH_INTERVAL') or 2.0)
+    OUTBOX_MAX_BACKOFF = float(os.environ.get('OUTBOX_MAX_BACKOFF') or 300.0)
+    OUTBOX_RETENTION_DAYS = int(os.environ.get('OUTBOX_RETENTION_DAYS') or 7)
+    
+    # Resubmitted reports: 'flag' (keep it with a note), 'merge' (answer with the
+    # earlier report ID and store nothing) or 'off'; only reports with a reporter
+    # phone or name are checked. The window is in seconds and must stay shorter
+    # than the outbox retention
+    DUPLICATE_REPORT_ACTION = os.environ.get('DUPLICATE_REPORT_ACTION', 'flag').lower()
+    DUPLICATE_REPORT_WINDOW = float(os.environ.get('DUPLICATE_REPORT_WINDOW') or 1800.0)
+    
+    # Dashboard rollups are recounted from the sheet this often (seconds), to
+    # pick up edits made directly in Google Sheets
+    ROLLUP_REBUILD_INTERVAL = float(os.environ.get('ROLLUP_REBUILD_INTERVAL') or 86400.0)
+    
+    # Report storage backend: google_sheets, or fake for offline load tests
+    REPORT_STORAGE_BACKEND = os.environ.get('REPORT_STORAGE_BACKEND', 'google_sheets')
+    FAKE_SHEETS_KEY = os.environ.get('FAKE_SHEETS_KEY', 'local')
+    FAKE_SHEETS_LATENCY = float(os.environ.get('FAKE_SHEETS_LATENCY') or 0.0)
+    FAKE_SHEETS_LATENCY_JITTER = float(os.environ.get('FAKE_SHEETS_LATENCY_JITTER') or 0.0)
+    FAKE_SHEETS_ERROR_RATE = float(os.environ.get('FAKE_SHEETS_ERROR_RATE') or 0.0)
+    FAKE_SHEETS_READ_QUOTA = int(os.environ.get('FAKE_SHEETS_READ_QUOTA') or 0)
+    FAKE_SHEETS_WRITE_QUOTA = int(os.environ.get('FAKE_SHEETS_WRITE_QUOTA') or 0)
+    
+    # Google Sheets snapshot cache (seconds)
+    SHEETS_CACHE_TTL = float(os.environ.get('SHEETS_CACHE_TTL') or 30.0)
+    SHEETS_CACHE_MAX_AGE = float(os.environ.get('SHEETS_CACHE_MAX_AGE') or 600.0)
+    
+    # Report worksheet layout: 'none' (one sheet per report type) or 'monthly'
+    # (per-month sheets such as adverse_reactions_2026_10)
+    SHEETS_PARTITIONING = os.environ.get('SHEETS_PARTITIONING', 'none').lower()
+    
+    # Cache shared by all worker processes: redis://... (needs the redis package),
+    # file:///path for workers on one host, or none to let each worker cache alone
+    SHARED_CACHE_URL = (
+        os.environ.get('SHARED_CACHE_URL')
+        or os.environ.get('REDIS_URL')
+        or 'file://' + os.path.join(tempfile.gettempdir(), 'pharmacovigilance-cache')
+    )
+    SHARED_CACHE_LOCK_TTL = float(os.environ.get('SHARED_CACHE_LOCK_TTL') or 60.0)
+    SHARED_CACHE_WAIT = float(os.environ.get('SHARED_CACHE_WAIT') or 10.0)
+    
+    # Public content API (/api/faqs, /api/drug_alerts, /api/educational_content):
+    # server-side body cache lifetime for writes made outside the ORM, and the
+    # max-age clients and proxies may reuse a body for before revalidating (seconds)
+    CONTENT_CACHE_MAX_AGE = float(os.environ.get('CONTENT_CACHE_MAX_AGE') or 300.0)
+    CONTENT_CACHE_CONTROL_MAX_AGE = int(os.environ.get('CONTENT_CACHE_CONTROL_MAX_AGE') or 60)
+    
+    # PostgreSQL mirror of the report worksheets (seconds); ignored with
+    # SHEETS_PARTITIONING=monthly, since it does not follow the partitions
+    REPORT_MIRROR_ENABLED = os.environ.get('REPORT_MIRROR_ENABLED', 'false').lower() in ['true', 'on', '1']
+    REPORT_MIRROR_SYNC_INTERVAL = float(os.environ.get('REPORT_MIRROR_SYNC_INTERVAL') or 60.0)
+    REPORT_MIRROR_FULL_SYNC_INTERVAL = float(os.environ.get('REPORT_MIRROR_FULL_SYNC_INTERVAL') or 3600.0)
+    
+    # Sheets API scheduler: per-minute quotas of THIS worker process (divide the
+    # project quota by the number of gunicorn workers; 0 disables a limit)
+    SHEETS_READ_QUOTA = int(os.environ.get('SHEETS_READ_QUOTA') or 30)
+    SHEETS_WRITE_QUOTA = int(os.environ.get('SHEETS_WRITE_QUOTA') or 30)
+    # Calls that may go out back to back before the per-minute rate applies;
+    # defaults to the whole per-minute quota, which is how Google counts it
+    SHEETS_READ_BURST = float(os.environ['SHEETS_READ_BURST']) if os.environ.get('SHEETS_READ_BURST') else None
+    SHEETS_WRITE_BURST = float(os.environ['SHEETS_WRITE_BURST']) if os.environ.get('SHEETS_WRITE_BURST') else None
+    SHEETS_MAX_CONCURRENCY = int(os.environ.get('SHEETS_MAX_CONCURRENCY') or 4)
+    SHEETS_MAX_RETRIES = int(os.environ.get('SHEETS_MAX_RETRIES') or 4)
+    SHEETS_BACKOFF_BASE = float(os.environ.get('SHEETS_BACKOFF_BASE') or 1.0)
+    SHEETS_BACKOFF_MAX = float(os.environ.get('SHEETS_BACKOFF_MAX') or 32.0)
+    SHEETS_MAX_QUEUE_WAIT = float(os.environ.get('SHEETS_MAX_QUEUE_WAIT') or 20.0)
+    
+    # Sheets circuit breaker and reconnect supervisor (seconds)
+    SHEETS_REQUEST_TIMEOUT = float(os.environ.get('SHEETS_REQUEST_TIMEOUT') or 20.0)
+    SHEETS_BREAKER_THRESHOLD = int(os.environ.get('SHEETS_BREAKER_THRESHOLD') or 5)
+    SHEETS_SUPERVISOR_INTERVAL = float(os.environ.get('SHEETS_SUPERVISOR_INTERVAL') or 15.0)
+    SHEETS_SUPERVISOR_MAX_BACKOFF = float(os.environ.get('SHEETS_SUPERVISOR_MAX_BACKOFF') or 300.0)
+    
+    # Worker warm-up: how long a request waits for the database setup (seconds)
+    WARM_UP_DATABASE_TIMEOUT = float(os.environ.get('WARM_UP_DATABASE_TIMEOUT') or 30.0)
+    
     @staticmethod
     def init_app(app):
         pass
@@ -0,0 +1,175 @@
+"""
+Content Cache Module
+Serialized JSON bodies of the public content endpoints (/api/faqs,
+/api/drug_alerts, /api/educational_content), kept per table version. Every
+commit that touches a content table gives the table a new version, stored in
+the shared store so all workers see it, and requests against an unchanged
+version are answered from memory, or with 304 when the client already holds
+the body, without touching the database.
+
+Writes that bypass the ORM (raw SQL, psql) do not change the version, so
+cached bodies are also rebuilt after CONTENT_CACHE_MAX_AGE seconds.
+"""
+
+import hashlib
+import itertools
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import FAQ, DrugAlert, EducationalContent
+from shared_cache import get_shared_store
+
+# Tables served by the public content endpoints
+CONTENT_MODELS = {
+    'faqs': FAQ,
+    'drug_alerts': DrugAlert,
+    'educational_content': EducationalContent
+}
+
+VERSION_KEY = 'content_version:'
+
+# session.info key collecting the content tables written in the current transaction
+CHANGED_TABLES = 'content_tables_changed'
+
+# Bodies kept per process across all tables and query variants
+MAX_ENTRIES = 256
+
+
+class CachedBody:
+    """Serialized response body of one table version and query variant"""
+
+    def __init__(self, version: Optional[str], body: bytes):
+        self.version = version
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.built_at = time.monotonic()
+
+
+class ContentCache:
+    """Per-process cache of content bodies, invalidated through per-table versions"""
+
+    def __init__(self, max_age: float = 300.0):
+        self.max_age = max_age
+        self._entries: 'OrderedDict[Tuple[str, Hashable], CachedBody]' = OrderedDict()
+        self._local_versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._build_locks = {table: threading.Lock() for table in CONTENT_MODELS}
+        self.stats = {'hits': 0, 'builds': 0}
+
+    def version(self, table: str) -> Optional[str]:
+        """Current version of a table; None if the shared store cannot be read"""
+        store = get_shared_store(current_app.config)
+        if store is None:
+            return str(self._local_versions.get(table, 0))
+        try:
+            value = store.get(VERSION_KEY + table)
+        except Exception as e:
+            current_app.logger.warning(f"Content cache: cannot read the version of {table}: {e}")
+            return None
+        return value.decode() if value else '0'
+
+    def bump(self, tables: Iterable[str]):
+        """Give tables new versions after a commit changed them"""
+        store = get_shared_store(current_app.config)
+        for table in tables:
+            with self._lock:
+                self._local_versions[table] = self._local_versions.get(table, 0) + 1
+            if store is None:
+                continue
+            try:
+                store.set(VERSION_KEY + table, uuid.uuid4().hex.encode())
+            except Exception as e:
+                current_app.logger.error(f"Content cache: cannot publish the version of {table}: {e}")
+
+    def _fresh(self, key: Tuple[str, Hashable], version: Optional[str]) -> Optional[CachedBody]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry.built_at >= self.max_age:
+            return None
+        if version is not None and entry.version != version:
+            return None
+        return entry
+
+    def get(self, table: str, variant: Hashable, build: Callable[[], Any]) -> CachedBody:
+        """Body of one query variant of a table, built with build() when missing or outdated.
+
+        The version is read before building, so a commit landing during the
+        build leaves the entry outdated instead of hiding the change.
+        """
+        key = (table, variant)
+        version = self.version(table)
+        with self._lock:
+            entry = self._fresh(key, version)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry
+
+        with self._build_locks[table]:
+            with self._lock:
+                entry = self._fresh(key, version)
+            if entry is None:
+                entry = CachedBody(version, current_app.json.response(build()).get_data())
+                with self._lock:
+                    self._entries[key] = entry
+                    while len(self._entries) > MAX_ENTRIES:
+                        self._entries.popitem(last=False)
+                    self.stats['builds'] += 1
+        return entry
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, entries=len(self._entries))
+
+
+def mark_changed(session: Session, table: str):
+    """Record that the current transaction of session writes a content table"""
+    if table in CONTENT_MODELS:
+        session.info.setdefault(CHANGED_TABLES, set()).add(table)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_flushed_changes(session, flush_context):
+    for instance in itertools.chain(session.new, session.dirty, session.deleted):
+        mark_changed(session, getattr(instance, '__tablename__', None))
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_bulk_changes(orm_execute_state):
+    # Query.update()/delete() and insert() statements do not go through the flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            mark_changed(orm_execute_state.session, mapper.local_table.name)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_changes(session):
+    tables = session.info.pop(CHANGED_TABLES, None)
+    if tables and has_app_context():
+        get_content_cache(current_app.config).bump(tables)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop(CHANGED_TABLES, None)
+
+
+# One cache per process
+content_cache: Optional[ContentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_content_cache(config) -> ContentCache:
+    """Get (creating on first use) the process-wide content cache"""
+    global content_cache
+    if content_cache is None:
+        with _cache_lock:
+            if content_cache is None:
+                content_cache = ContentCache(config.get('CONTENT_CACHE_MAX_AGE', 300.0))
+    return content_cache
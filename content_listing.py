@@ -0,0 +1,171 @@
+"""
+Content Listing Module
+Language selection, field projection, filters and cursor pagination for the
+public content endpoints. Listings are read with a column-level SELECT, so a
+request for one language never loads the other two translations, and rows
+come back as plain mappings rather than ORM objects.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Hashable, List, Optional
+
+from extensions import db
+from content_cache import CONTENT_MODELS
+from report_listing import MAX_LISTING_LIMIT
+
+LANGUAGES = ['ar', 'en', 'ku']
+
+# Columns stored once per language, e.g. question_ar / question_en / question_ku
+TRANSLATED_FIELDS = {
+    'faqs': ['question', 'answer'],
+    'drug_alerts': ['title', 'content'],
+    'educational_content': ['title', 'content']
+}
+
+# Column ?category= filters on; drug alerts are categorized by alert type
+CATEGORY_COLUMNS = {
+    'faqs': 'category',
+    'drug_alerts': 'alert_type',
+    'educational_content': 'category'
+}
+
+# ?active= values; without the argument inactive items are listed too, as before
+ACTIVE_VALUES = {'true': True, '1': True, 'false': False, '0': False, 'all': None}
+
+
+def encode_cursor(last_id: int) -> str:
+    """Opaque cursor continuing a listing after the item with last_id"""
+    return base64.urlsafe_b64encode(json.dumps({'a': last_id}).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """Item ID a cursor continues after; raises ValueError for malformed cursors"""
+    if not cursor:
+        return 0
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        last_id = int(json.loads(base64.urlsafe_b64decode(padded.encode()))['a'])
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if last_id < 0:
+        raise ValueError('Invalid cursor')
+    return last_id
+
+
+def _json_value(value: Any) -> Any:
+    """Dates as ISO strings, like the models' to_dict()"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class ContentOptions:
+    """Language, projection, filter and pagination options of one content listing"""
+
+    def __init__(self, table: str, lang: Optional[str] = None, fields: Optional[List[str]] = None,
+                 category: Optional[str] = None, active: Optional[bool] = None,
+                 limit: Optional[int] = None, after: int = 0):
+        self.table = table
+        self.lang = lang
+        self.fields = fields
+        self.category = category
+        self.active = active
+        self.limit = limit
+        self.after = after
+
+    @classmethod
+    def from_request(cls, table: str, args) -> 'ContentOptions':
+        """Read lang, fields, category, active, limit and cursor; raises ValueError for invalid values"""
+        lang = args.get('lang') or None
+        if lang is not None and lang not in LANGUAGES:
+            raise ValueError(f"Invalid lang, expected one of {', '.join(LANGUAGES)}")
+
+        active = args.get('active')
+        if active is not None and active.lower() not in ACTIVE_VALUES:
+            raise ValueError('Invalid active, expected true, false or all')
+
+        limit = args.get('limit', type=int)
+        if limit is not None:
+            limit = max(1, min(limit, MAX_LISTING_LIMIT))
+
+        options = cls(table, lang, None, args.get('category') or None,
+                      ACTIVE_VALUES[active.lower()] if active is not None else None,
+                      limit, decode_cursor(args.get('cursor')))
+
+        fields = [field.strip() for field in args.get('fields', '').split(',') if field.strip()]
+        if fields:
+            available = options.columns()
+            unknown = [field for field in fields if field not in available]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+            options.fields = fields
+        return options
+
+    @property
+    def key(self) -> Hashable:
+        """Cache variant of these options"""
+        return (self.lang, tuple(self.fields or ()), self.category, self.active, self.limit, self.after)
+
+    def columns(self) -> Dict[str, Any]:
+        """Output field names and the column expressions they are read from.
+
+        With a language, each translated field appears once under its base
+        name (question, title, ...), falling back to the Arabic text, which
+        every item has, when the translation is missing.
+        """
+        table = CONTENT_MODELS[self.table].__table__
+        translated = {f'{field}_{lang}' for field in TRANSLATED_FIELDS[self.table] for lang in LANGUAGES}
+        columns = {
+            column.name: column for column in table.columns
+            if not (self.lang and column.name in translated)
+        }
+        if self.lang:
+            for field in TRANSLATED_FIELDS[self.table]:
+                localized = table.c[f'{field}_{self.lang}']
+                if self.lang != 'ar':
+                    localized = db.func.coalesce(db.func.nullif(localized, ''), table.c[f'{field}_ar'])
+                columns[field] = localized
+        return columns
+
+    def statement(self):
+        """SELECT of the requested columns, filtered and ordered by ID.
+
+        The cursor holds the last ID returned, so every page is an index
+        range scan however deep the client pages. The id field is always
+        included since cursors and links rely on it. With a limit, one extra
+        row is read to decide whether a next cursor exists.
+        """
+        table = CONTENT_MODELS[self.table].__table__
+        columns = self.columns()
+        names = ['id'] + [field for field in (self.fields or columns) if field != 'id']
+        statement = db.select(*[columns[name].label(name) for name in names])
+
+        if self.active is not None:
+            statement = statement.where(table.c.is_active == self.active)
+        if self.category:
+            statement = statement.where(table.c[CATEGORY_COLUMNS[self.table]] == self.category)
+        if self.after:
+            statement = statement.where(table.c.id > self.after)
+        statement = statement.order_by(table.c.id)
+        if self.limit is not None:
+            statement = statement.limit(self.limit + 1)
+        return statement
+
+    def fetch(self) -> Any:
+        """The listing: a plain list without ?limit, otherwise a page with the next cursor"""
+        items = [
+            {name: _json_value(value) for name, value in row.items()}
+            for row in db.session.execute(self.statement()).mappings()
+        ]
+        if self.limit is None:
+            return items
+
+        has_more = len(items) > self.limit
+        items = items[:self.limit]
+        return {
+            'items': items,
+            'next_cursor': encode_cursor(items[-1]['id']) if has_more else None,
+            'limit': self.limit
+        }
@@ -0,0 +1,290 @@
+"""
+Fake Sheets Module
+In-process stand-in for the parts of the gspread client used by
+GoogleSheetsService. It keeps worksheets in memory, follows the gspread
+Worksheet return shapes, and can inject latency, random API errors and
+per-minute quota limits so the report paths can be load-tested offline.
+
+Select it with REPORT_STORAGE_BACKEND=fake.
+"""
+
+import json
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import gspread
+from gspread.utils import a1_range_to_grid_range, rowcol_to_a1
+
+
+class _FakeResponse:
+    """Minimal requests.Response look-alike so gspread.exceptions.APIError can be raised"""
+
+    def __init__(self, status_code: int, message: str, status: str):
+        self.status_code = status_code
+        self._payload = {'error': {'code': status_code, 'message': message, 'status': status}}
+        self.text = json.dumps(self._payload)
+
+    def json(self):
+        return self._payload
+
+
+def _api_error(status_code: int, message: str, status: str) -> gspread.exceptions.APIError:
+    return gspread.exceptions.APIError(_FakeResponse(status_code, message, status))
+
+
+def _cell_value(value: Any) -> str:
+    """Store values the way Sheets renders RAW input back"""
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if value is None:
+        return ''
+    return str(value)
+
+
+def _trim_row(row: List[str]) -> List[str]:
+    end = len(row)
+    while end and row[end - 1] == '':
+        end -= 1
+    return row[:end]
+
+
+class FakeSheetsClient:
+    """Stand-in for gspread.Client with fault injection.
+
+    latency/latency_jitter are seconds added to every API call, error_rate is
+    the probability of a 503, and read_quota/write_quota are requests per
+    rolling minute before calls fail with 429 (0 disables the limit).
+    """
+
+    # Spreadsheets outlive client instances so re-initializing the service keeps the data
+    _spreadsheets: Dict[str, 'FakeSpreadsheet'] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, latency: float = 0.0, latency_jitter: float = 0.0, error_rate: float = 0.0,
+                 read_quota: int = 0, write_quota: int = 0, seed: Optional[int] = None):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.quotas = {'read': read_quota, 'write': write_quota}
+        self.stats = {'read': 0, 'write': 0, 'errors': 0, 'quota_errors': 0}
+        self._calls = {'read': deque(), 'write': deque()}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'FakeSheetsClient':
+        return cls(
+            latency=config.get('FAKE_SHEETS_LATENCY', 0.0),
+            latency_jitter=config.get('FAKE_SHEETS_LATENCY_JITTER', 0.0),
+            error_rate=config.get('FAKE_SHEETS_ERROR_RATE', 0.0),
+            read_quota=config.get('FAKE_SHEETS_READ_QUOTA', 0),
+            write_quota=config.get('FAKE_SHEETS_WRITE_QUOTA', 0)
+        )
+
+    def open_by_key(self, key: str) -> 'FakeSpreadsheet':
+        self._api_call('read')
+        with self._registry_lock:
+            spreadsheet = self._spreadsheets.get(key)
+            if spreadsheet is None:
+                spreadsheet = FakeSpreadsheet(key)
+                self._spreadsheets[key] = spreadsheet
+        spreadsheet.client = self
+        return spreadsheet
+
+    def _api_call(self, kind: str):
+        """Account for one API request: latency, quota and random failures"""
+        delay = self.latency + (self._random.uniform(0, self.latency_jitter) if self.latency_jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+        with self._lock:
+            self.stats[kind] += 1
+            quota = self.quotas[kind]
+            if quota:
+                calls = self._calls[kind]
+                now = time.monotonic()
+                while calls and now - calls[0] > 60:
+                    calls.popleft()
+                if len(calls) >= quota:
+                    self.stats['quota_errors'] += 1
+                    raise _api_error(
+                        429,
+                        f"Quota exceeded for quota metric '{kind.title()} requests' per minute",
+                        'RESOURCE_EXHAUSTED'
+                    )
+                calls.append(now)
+
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.stats['errors'] += 1
+                raise _api_error(503, 'The service is currently unavailable.', 'UNAVAILABLE')
+
+
+class FakeSpreadsheet:
+    """Stand-in for gspread.Spreadsheet"""
+
+    def __init__(self, key: str):
+        self.id = key
+        self.title = f'Local reports ({key})'
+        self.url = f'local://spreadsheets/{key}'
+        self.client: Optional[FakeSheetsClient] = None
+        self.modified_time = datetime.utcnow().isoformat() + 'Z'
+        self._worksheets: Dict[str, 'FakeWorksheet'] = {}
+        self._lock = threading.RLock()
+
+    def touch(self):
+        self.modified_time = datetime.utcnow().isoformat() + 'Z'
+
+    def get_lastUpdateTime(self) -> str:
+        self.client._api_call('read')
+        return self.modified_time
+
+    def worksheet(self, title: str) -> 'FakeWorksheet':
+        self.client._api_call('read')
+        worksheet = self._worksheets.get(title)
+        if worksheet is None:
+            raise gspread.WorksheetNotFound(title)
+        return worksheet
+
+    def worksheets(self) -> List['FakeWorksheet']:
+        self.client._api_call('read')
+        return list(self._worksheets.values())
+
+    def add_worksheet(self, title: str, rows: int, cols: int, index: Optional[int] = None) -> 'FakeWorksheet':
+        self.client._api_call('write')
+        with self._lock:
+            if title in self._worksheets:
+                raise _api_error(400, f'A sheet with the name "{title}" already exists.', 'INVALID_ARGUMENT')
+            worksheet = FakeWorksheet(self, title, len(self._worksheets), rows, cols)
+            self._worksheets[title] = worksheet
+            self.touch()
+            return worksheet
+
+
+class FakeWorksheet:
+    """Stand-in for gspread.Worksheet backed by a list of string rows"""
+
+    def __init__(self, spreadsheet: FakeSpreadsheet, title: str, sheet_id: int, rows: int, cols: int):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self.row_count = rows
+        self.col_count = cols
+        self._rows: List[List[str]] = []
+
+    def _read(self):
+        self.spreadsheet.client._api_call('read')
+
+    def _write(self):
+        self.spreadsheet.client._api_call('write')
+
+    def _last_row(self) -> int:
+        """Number of rows up to the last one with any content"""
+        end = len(self._rows)
+        while end and not any(self._rows[end - 1]):
+            end -= 1
+        return end
+
+    def _set_cell(self, row: int, col: int, value: Any):
+        while len(self._rows) < row:
+            self._rows.append([])
+        cells = self._rows[row - 1]
+        if len(cells) < col:
+            cells.extend([''] * (col - len(cells)))
+        cells[col - 1] = _cell_value(value)
+        self.row_count = max(self.row_count, row)
+        self.col_count = max(self.col_count, col)
+
+    def _write_block(self, start_row: int, start_col: int, values: List[List[Any]]):
+        for row_offset, row_values in enumerate(values):
+            for col_offset, value in enumerate(row_values):
+                self._set_cell(start_row + row_offset, start_col + col_offset, value)
+        self.spreadsheet.touch()
+
+    def _read_range(self, range_name: str) -> List[List[str]]:
+        grid = a1_range_to_grid_range(range_name)
+        start_row = grid.get('startRowIndex', 0)
+        end_row = min(grid.get('endRowIndex', self._last_row()), self._last_row())
+        start_col = grid.get('startColumnIndex', 0)
+        end_col = grid.get('endColumnIndex')
+
+        values = [_trim_row(list(row[start_col:end_col])) for row in self._rows[start_row:end_row]]
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def get_all_values(self, **kwargs) -> List[List[str]]:
+        self._read()
+        with self.spreadsheet._lock:
+            rows = [_trim_row(row) for row in self._rows[:self._last_row()]]
+        width = max((len(row) for row in rows), default=0)
+        return [row + [''] * (width - len(row)) for row in rows]
+
+    def get(self, range_name: Optional[str] = None, **kwargs) -> List[List[str]]:
+        self._read()
+        with self.spreadsheet._lock:
+            if range_name is None:
+                return [_trim_row(row) for row in self._rows[:self._last_row()]]
+            return self._read_range(range_name)
+
+    def batch_get(self, ranges: List[str], **kwargs) -> List[List[List[str]]]:
+        self._read()
+        with self.spreadsheet._lock:
+            return [self._read_range(range_name) for range_name in ranges]
+
+    def row_values(self, row: int, **kwargs) -> List[str]:
+        self._read()
+        with self.spreadsheet._lock:
+            return _trim_row(list(self._rows[row - 1])) if row <= len(self._rows) else []
+
+    def col_values(self, col: int, **kwargs) -> List[str]:
+        self._read()
+        with self.spreadsheet._lock:
+            column = [row[col - 1] if col <= len(row) else '' for row in self._rows]
+        return _trim_row(column)
+
+    def update(self, range_name: str, values: List[List[Any]] = None, **kwargs) -> Dict[str, Any]:
+        self._write()
+        grid = a1_range_to_grid_range(range_name)
+        with self.spreadsheet._lock:
+            self._write_block(grid.get('startRowIndex', 0) + 1, grid.get('startColumnIndex', 0) + 1, values or [])
+        return {'updatedRange': f"'{self.title}'!{range_name}"}
+
+    def update_cell(self, row: int, col: int, value: Any) -> Dict[str, Any]:
+        self._write()
+        with self.spreadsheet._lock:
+            self._write_block(row, col, [[value]])
+        return {'updatedRange': f"'{self.title}'!{rowcol_to_a1(row, col)}"}
+
+    def batch_update(self, data: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        self._write()
+        with self.spreadsheet._lock:
+            for item in data:
+                grid = a1_range_to_grid_range(item['range'])
+                self._write_block(grid.get('startRowIndex', 0) + 1, grid.get('startColumnIndex', 0) + 1, item['values'])
+        return {'totalUpdatedCells': sum(len(row) for item in data for row in item['values'])}
+
+    def append_row(self, values: List[Any], **kwargs) -> Dict[str, Any]:
+        return self.append_rows([values], **kwargs)
+
+    def append_rows(self, values: List[List[Any]], **kwargs) -> Dict[str, Any]:
+        self._write()
+        with self.spreadsheet._lock:
+            # Like the values.append API, write below the last row with content
+            start_row = self._last_row() + 1
+            self._write_block(start_row, 1, values)
+            width = max((len(row) for row in values), default=1)
+            end_row = start_row + len(values) - 1
+        return {
+            'spreadsheetId': self.spreadsheet.id,
+            'updates': {
+                'spreadsheetId': self.spreadsheet.id,
+                'updatedRange': f"'{self.title}'!A{start_row}:{rowcol_to_a1(end_row, width)}",
+                'updatedRows': len(values),
+                'updatedColumns': width,
+                'updatedCells': sum(len(row) for row in values)
+            }
+        }
@@ -67,6 +67,10 @@ def add_missing_columns(engine):
             ('ip_address', 'VARCHAR(45)'),
             ('user_agent', 'TEXT'),
             ('timestamp', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
+        ],
+        'report_outbox': [
+            ('fingerprint', 'VARCHAR(64)'),
+            ('duplicate_of', 'VARCHAR(40)')
         ]
     }
     
@@ -178,6 +182,139 @@ def create_missing_tables(engine):
                 timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users (id)
             )
+        ''',
+        'report_outbox': '''
+            CREATE TABLE IF NOT EXISTS report_outbox (
+                id SERIAL PRIMARY KEY,
+                report_id VARCHAR(40) UNIQUE NOT NULL,
+                sheet_name VARCHAR(50) NOT NULL,
+                payload TEXT NOT NULL,
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                sent_date TIMESTAMP,
+                fingerprint VARCHAR(64),
+                duplicate_of VARCHAR(40)
+            );
+            CREATE INDEX IF NOT EXISTS ix_report_outbox_sheet_status_id
+                ON report_outbox (sheet_name, status, id)
+        ''',
+        'adverse_reactions': '''
+            CREATE TABLE IF NOT EXISTS adverse_reactions (
+                id SERIAL PRIMARY KEY,
+                sheet_row INTEGER UNIQUE NOT NULL,
+                report_id TEXT,
+                timestamp TIMESTAMP,
+                patient_age TEXT,
+                patient_gender TEXT,
+                patient_weight TEXT,
+                drug_name TEXT,
+                drug_manufacturer TEXT,
+                drug_batch_number TEXT,
+                drug_dosage TEXT,
+                drug_route TEXT,
+                drug_indication TEXT,
+                reaction_description TEXT,
+                reaction_severity TEXT,
+                reaction_start_date TEXT,
+                reaction_end_date TEXT,
+                reaction_outcome TEXT,
+                reporter_name TEXT,
+                reporter_phone TEXT,
+                reporter_email TEXT,
+                reporter_type TEXT,
+                governorate TEXT,
+                city TEXT,
+                pharmacy_name TEXT,
+                pharmacy_address TEXT,
+                concomitant_drugs TEXT,
+                medical_history TEXT,
+                status TEXT,
+                priority TEXT,
+                assigned_to TEXT,
+                follow_up_required TEXT,
+                notes TEXT,
+                synced_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS ix_adverse_reactions_report_id ON adverse_reactions (report_id);
+            CREATE INDEX IF NOT EXISTS ix_adverse_reactions_timestamp ON adverse_reactions (timestamp);
+            CREATE INDEX IF NOT EXISTS ix_adverse_reactions_status ON adverse_reactions (lower(status));
+            CREATE INDEX IF NOT EXISTS ix_adverse_reactions_governorate ON adverse_reactions (lower(governorate));
+            CREATE INDEX IF NOT EXISTS ix_adverse_reactions_severity ON adverse_reactions (lower(reaction_severity))
+        ''',
+        'intruder_reports': '''
+            CREATE TABLE IF NOT EXISTS intruder_reports (
+                id SERIAL PRIMARY KEY,
+                sheet_row INTEGER UNIQUE NOT NULL,
+                report_id TEXT,
+                timestamp TIMESTAMP,
+                governorate TEXT,
+                pharmacy_name TEXT,
+                pharmacy_address TEXT,
+                pharmacy_license TEXT,
+                intruder_name TEXT,
+                intruder_role TEXT,
+                intruder_real_job TEXT,
+                intruder_residence TEXT,
+                intruder_id_number TEXT,
+                problem_description TEXT,
+                evidence_description TEXT,
+                reporter_name TEXT,
+                reporter_phone TEXT,
+                reporter_email TEXT,
+                reporter_anonymous TEXT,
+                status TEXT,
+                confirmed TEXT,
+                priority TEXT,
+                assigned_to TEXT,
+                notes TEXT,
+                synced_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS ix_intruder_reports_report_id ON intruder_reports (report_id);
+            CREATE INDEX IF NOT EXISTS ix_intruder_reports_timestamp ON intruder_reports (timestamp);
+            CREATE INDEX IF NOT EXISTS ix_intruder_reports_status ON intruder_reports (lower(status));
+            CREATE INDEX IF NOT EXISTS ix_intruder_reports_governorate ON intruder_reports (lower(governorate));
+            CREATE INDEX IF NOT EXISTS ix_intruder_reports_confirmed ON intruder_reports (lower(confirmed))
+        ''',
+        'sheet_sync_state': '''
+            CREATE TABLE IF NOT EXISTS sheet_sync_state (
+                sheet_name VARCHAR(50) PRIMARY KEY,
+                last_row INTEGER NOT NULL DEFAULT 1,
+                last_sync TIMESTAMP,
+                last_full_sync TIMESTAMP
+            )
+        ''',
+        'report_rollups': '''
+            CREATE TABLE IF NOT EXISTS report_rollups (
+                id SERIAL PRIMARY KEY,
+                sheet_name VARCHAR(50) NOT NULL,
+                day DATE NOT NULL,
+                governorate VARCHAR(100) NOT NULL DEFAULT '',
+                drug VARCHAR(200) NOT NULL DEFAULT '',
+                severity VARCHAR(50) NOT NULL DEFAULT '',
+                status VARCHAR(50) NOT NULL DEFAULT '',
+                count INTEGER NOT NULL DEFAULT 0,
+                CONSTRAINT uq_report_rollups_key UNIQUE (sheet_name, day, governorate, drug, severity, status)
+            )
+        ''',
+        'report_rollup_keys': '''
+            CREATE TABLE IF NOT EXISTS report_rollup_keys (
+                report_id VARCHAR(40) PRIMARY KEY,
+                sheet_name VARCHAR(50) NOT NULL,
+                day DATE NOT NULL,
+                governorate VARCHAR(100) NOT NULL DEFAULT '',
+                drug VARCHAR(200) NOT NULL DEFAULT '',
+                severity VARCHAR(50) NOT NULL DEFAULT '',
+                status VARCHAR(50) NOT NULL DEFAULT ''
+            )
+        ''',
+        'rollup_state': '''
+            CREATE TABLE IF NOT EXISTS rollup_state (
+                sheet_name VARCHAR(50) PRIMARY KEY,
+                built_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
         '''
     }
     
@@ -190,6 +327,90 @@ def create_missing_tables(engine):
             except SQLAlchemyError as e:
                 logger.error(f"Error creating table {table_name}: {e}")
 
+def create_missing_indexes(engine):
+    """Create secondary indexes missing from tables created before they were declared."""
+    
+    index_creation_sql = {
+        'ix_report_outbox_fingerprint': '''
+            CREATE INDEX IF NOT EXISTS ix_report_outbox_fingerprint ON report_outbox (fingerprint)
+        ''',
+        'ix_faqs_is_active_category': '''
+            CREATE INDEX IF NOT EXISTS ix_faqs_is_active_category ON faqs (is_active, category)
+        ''',
+        'ix_faqs_created_date': '''
+            CREATE INDEX IF NOT EXISTS ix_faqs_created_date ON faqs (created_date)
+        ''',
+        'ix_drug_alerts_is_active_created_date': '''
+            CREATE INDEX IF NOT EXISTS ix_drug_alerts_is_active_created_date ON drug_alerts (is_active, created_date)
+        ''',
+        'ix_drug_alerts_drug_name': '''
+            CREATE INDEX IF NOT EXISTS ix_drug_alerts_drug_name ON drug_alerts (drug_name)
+        ''',
+        'ix_drug_alerts_severity': '''
+            CREATE INDEX IF NOT EXISTS ix_drug_alerts_severity ON drug_alerts (severity)
+        ''',
+        'ix_drug_alerts_expiry_date': '''
+            CREATE INDEX IF NOT EXISTS ix_drug_alerts_expiry_date ON drug_alerts (expiry_date)
+        ''',
+        'ix_educational_content_is_active_category': '''
+            CREATE INDEX IF NOT EXISTS ix_educational_content_is_active_category ON educational_content (is_active, category)
+        ''',
+        'ix_educational_content_created_date': '''
+            CREATE INDEX IF NOT EXISTS ix_educational_content_created_date ON educational_content (created_date)
+        ''',
+        'ix_system_logs_timestamp': '''
+            CREATE INDEX IF NOT EXISTS ix_system_logs_timestamp ON system_logs (timestamp)
+        ''',
+        'ix_system_logs_user_id_timestamp': '''
+            CREATE INDEX IF NOT EXISTS ix_system_logs_user_id_timestamp ON system_logs (user_id, timestamp)
+        ''',
+        'ix_system_logs_action_timestamp': '''
+            CREATE INDEX IF NOT EXISTS ix_system_logs_action_timestamp ON system_logs (action, timestamp)
+        '''
+    }
+    
+    with engine.connect() as conn:
+        for index_name, sql in index_creation_sql.items():
+            try:
+                conn.execute(text(sql))
+                conn.commit()
+                logger.info(f"Ensured index {index_name} exists")
+            except SQLAlchemyError as e:
+                logger.error(f"Error creating index {index_name}: {e}")
+
+def widen_mirror_columns(engine):
+    """Turn the VARCHAR columns of report mirror tables created by older versions into TEXT.
+    
+    Sheet cells have no length limit, and one overlong value failed the whole
+    mirror sync. Also drops the lower(drug_name) index, which the substring
+    drug name filter never used.
+    """
+    with engine.connect() as conn:
+        for table_name in ('adverse_reactions', 'intruder_reports'):
+            try:
+                columns = inspect(engine).get_columns(table_name)
+            except Exception as e:
+                logger.warning(f"Could not inspect table {table_name}: {e}")
+                continue
+            
+            for column in columns:
+                if column['name'] == 'sheet_row' or 'CHAR' not in str(column['type']).upper():
+                    continue
+                try:
+                    conn.execute(text(f"ALTER TABLE {table_name} ALTER COLUMN {column['name']} TYPE TEXT"))
+                    conn.commit()
+                    logger.info(f"Changed {table_name}.{column['name']} to TEXT")
+                except SQLAlchemyError as e:
+                    conn.rollback()
+                    logger.error(f"Error changing {table_name}.{column['name']} to TEXT: {e}")
+        
+        try:
+            conn.execute(text("DROP INDEX IF EXISTS ix_adverse_reactions_drug_name"))
+            conn.commit()
+        except SQLAlchemyError as e:
+            conn.rollback()
+            logger.error(f"Error dropping index ix_adverse_reactions_drug_name: {e}")
+
 def main():
     """Main function to fix database schema."""
     logger.info("Starting database schema fix...")
@@ -210,6 +431,12 @@ def main():
         # Add missing columns
         add_missing_columns(engine)
         
+        # Create missing secondary indexes
+        create_missing_indexes(engine)
+        
+        # Widen report mirror columns created as VARCHAR
+        widen_mirror_columns(engine)
+        
         logger.info("Database schema fix completed successfully")
         
     except Exception as e:
@@ -8,23 +8,104 @@ import gspread
 import base64
 import json
 import os
+import threading
+import time
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from flask import current_app
 from google.oauth2.service_account import Credentials
+from sheet_cache import SnapshotCache, SheetSnapshot
+from report_storage import ReportStorage
+from sheet_indexes import FilterIndex, row_matches
+from sheets_scheduler import get_sheets_scheduler
+from shared_cache import get_shared_store
+from sheet_partitions import PartitionCatalog, partition_name, month_of, month_of_timestamp, month_of_report_id
 
 
-class GoogleSheetsService:
+# Header rows of the report worksheets, in column order
+WORKSHEET_HEADERS = {
+    'adverse_reactions': [
+        'Timestamp', 'ID', 'Patient Age', 'Patient Gender', 'Patient Weight',
+        'Drug Name', 'Drug Manufacturer', 'Drug Batch Number', 'Drug Dosage',
+        'Drug Route', 'Drug Indication', 'Reaction Description', 'Reaction Severity',
+        'Reaction Start Date', 'Reaction End Date', 'Reaction Outcome',
+        'Reporter Name', 'Reporter Phone', 'Reporter Email', 'Reporter Type',
+        'Governorate', 'City', 'Pharmacy Name', 'Pharmacy Address',
+        'Concomitant Drugs', 'Medical History', 'Status', 'Priority',
+        'Assigned To', 'Follow Up Required', 'Notes'
+    ],
+    'intruder_reports': [
+        'Timestamp', 'ID', 'Governorate', 'Pharmacy Name', 'Pharmacy Address',
+        'Pharmacy License', 'Intruder Name', 'Intruder Role', 'Intruder Real Job',
+        'Intruder Residence', 'Intruder ID Number', 'Problem Description',
+        'Evidence Description', 'Reporter Name', 'Reporter Phone', 'Reporter Email',
+        'Reporter Anonymous', 'Status', 'Confirmed', 'Priority', 'Assigned To', 'Notes'
+    ]
+}
+
+# Report fields that can be changed in bulk, mapped to their sheet headers
+BULK_UPDATE_FIELDS = {
+    'status': 'Status',
+    'assigned_to': 'Assigned To',
+    'priority': 'Priority',
+    'notes': 'Notes'
+}
+
+# Statuses counted by get_reports_summary for each report worksheet
+SUMMARY_STATUSES = {
+    'adverse_reactions': ['pending', 'under_review', 'reviewed', 'closed'],
+    'intruder_reports': ['pending', 'investigating', 'verified', 'closed']
+}
+
+# Confirmed column values treated as confirmed by the confirmed_only filter
+CONFIRMED_VALUES = ['true', '1', 'yes', 'confirmed']
+
+
+class GoogleSheetsService(ReportStorage):
     """Service class for Google Sheets operations"""
     
-    def __init__(self):
+    def __init__(self, connect: bool = True):
         self.gc = None
         self.spreadsheet = None
         self.worksheets = {}
+        self.headers = {}  # sheet name -> header row as last seen
+        self.header_columns = {}  # sheet name -> {header: 1-based column}
+        self.row_indexes = {}  # sheet name -> {report ID: sheet row}
+        self.snapshot_cache = SnapshotCache(
+            ttl=current_app.config.get('SHEETS_CACHE_TTL', 30.0),
+            max_age=current_app.config.get('SHEETS_CACHE_MAX_AGE', 600.0),
+            shared=get_shared_store(current_app.config),
+            lock_ttl=current_app.config.get('SHARED_CACHE_LOCK_TTL', 60.0)
+        )
+        self._snapshot_locks = {}
+        self._snapshot_locks_guard = threading.Lock()
+        self.scheduler = get_sheets_scheduler(current_app.config)  # every API call goes through it
+        self.partitioning = current_app.config.get('SHEETS_PARTITIONING') == 'monthly'
+        self.partition_catalog = PartitionCatalog(list(WORKSHEET_HEADERS))
+        self._partition_lock = threading.Lock()
+        self._closed_summaries = {}  # closed partition -> summary, used without a shared store
+        self.refresh_stats = {'revalidated': 0, 'tail': 0, 'full': 0}  # how stale snapshots were refreshed
+        self._row_counts = {}  # sheet name -> (data rows, modified time, monotonic check time)
+        self._ready = False
+        if connect:
+            self.connect()
+    
+    def connect(self):
+        """Authenticate, open the spreadsheet and check the worksheets.
+        
+        This is the slow part of startup; the warm-up thread calls it after the
+        service has been published so requests never wait on it.
+        """
+        self._ready = False
         self._initialize_client()
+        self._ready = self.gc is not None and self.spreadsheet is not None
     
     def _initialize_client(self):
         """Initialize Google Sheets client with service account using multiple authentication approaches"""
+        if current_app.config.get('REPORT_STORAGE_BACKEND') == 'fake':
+            self._initialize_fake_client()
+            return
+        
         try:
             # Environment variable validation
             required_env_vars = ['GOOGLE_SHEET_ID', 'GOOGLE_SERVICE_ACCOUNT_EMAIL', 'GOOGLE_PRIVATE_KEY']
@@ -154,9 +235,12 @@ class GoogleSheetsService:
                 current_app.logger.error('All authentication approaches failed')
                 return
             
+            # Bound every HTTP request so an upstream outage cannot hold a worker until gunicorn's timeout
+            self.gc.set_timeout(current_app.config.get('SHEETS_REQUEST_TIMEOUT', 20.0))
+            
             # Open the spreadsheet
             current_app.logger.info('Opening spreadsheet...')
-            self.spreadsheet = self.gc.open_by_key(sheet_id)
+            self.spreadsheet = self.scheduler.read(self.gc.open_by_key, sheet_id)
             current_app.logger.info(f'Loaded document: {self.spreadsheet.title}')
             
             self._setup_worksheets()
@@ -169,54 +253,53 @@ class GoogleSheetsService:
                 current_app.logger.error(f"Stack trace: {traceback.format_exc()}")
             self.gc = None
     
+    def _initialize_fake_client(self):
+        """Use the in-process Sheets stand-in instead of Google (load tests and offline benchmarks)"""
+        from fake_sheets import FakeSheetsClient
+        
+        try:
+            self.gc = FakeSheetsClient.from_config(current_app.config)
+            self.spreadsheet = self.scheduler.read(self.gc.open_by_key, current_app.config.get('FAKE_SHEETS_KEY', 'local'))
+            current_app.logger.warning(f'Using fake Google Sheets backend: {self.spreadsheet.title}')
+            self._setup_worksheets()
+        except Exception as e:
+            current_app.logger.error(f"Failed to initialize fake Sheets backend: {e}")
+            self.gc = None
+    
     def _setup_worksheets(self):
         """Setup required worksheets for different report types using robust approach"""
         if not self.spreadsheet:
             return
         
         worksheet_configs = {
-            'adverse_reactions': {
-                'headers': [
-                    'Timestamp', 'ID', 'Patient Age', 'Patient Gender', 'Patient Weight',
-                    'Drug Name', 'Drug Manufacturer', 'Drug Batch Number', 'Drug Dosage',
-                    'Drug Route', 'Drug Indication', 'Reaction Description', 'Reaction Severity',
-                    'Reaction Start Date', 'Reaction End Date', 'Reaction Outcome',
-                    'Reporter Name', 'Reporter Phone', 'Reporter Email', 'Reporter Type',
-                    'Governorate', 'City', 'Pharmacy Name', 'Pharmacy Address',
-                    'Concomitant Drugs', 'Medical History', 'Status', 'Priority',
-                    'Assigned To', 'Follow Up Required', 'Notes'
-                ]
-            },
-            'intruder_reports': {
-                'headers': [
-                    'Timestamp', 'ID', 'Governorate', 'Pharmacy Name', 'Pharmacy Address',
-                    'Pharmacy License', 'Intruder Name', 'Intruder Role', 'Intruder Real Job',
-                    'Intruder Residence', 'Intruder ID Number', 'Problem Description',
-                    'Evidence Description', 'Reporter Name', 'Reporter Phone', 'Reporter Email',
-                    'Reporter Anonymous', 'Status', 'Confirmed', 'Priority', 'Assigned To', 'Notes'
-                ]
-            }
+            sheet_name: {'headers': headers} for sheet_name, headers in WORKSHEET_HEADERS.items()
         }
         
         for sheet_name, config in worksheet_configs.items():
             try:
                 # Try to get existing worksheet
                 try:
-                    worksheet = self.spreadsheet.worksheet(sheet_name)
+                    worksheet = self.scheduler.read(self.spreadsheet.worksheet, sheet_name)
                     current_app.logger.info(f'Found existing {sheet_name} sheet')
                     
-                    # IMPORTANT: Force update all headers to ensure correct structure
+                    # Only rewrite the header row when it differs from the expected layout
                     try:
-                        current_app.logger.info(f'Attempting to update all headers on existing {sheet_name} sheet')
-                        worksheet.update('1:1', [config['headers']])
-                        current_app.logger.info('All headers updated successfully')
+                        headers = self.scheduler.read(worksheet.row_values, 1) if worksheet.row_count > 0 else []
+                        
+                        if headers == config['headers']:
+                            self._set_headers(sheet_name, headers)
+                        else:
+                            current_app.logger.info(f'Header row of {sheet_name} differs from the expected layout, updating it')
+                            self.scheduler.write(worksheet.update, '1:1', [config['headers']])
+                            self._set_headers(sheet_name, config['headers'])
+                            current_app.logger.info('All headers updated successfully')
                     except Exception as update_header_error:
                         current_app.logger.error(f'Failed to update all headers: {update_header_error}')
                         current_app.logger.info('Will try to continue with existing headers')
                         
                         # Check if we need to add specific missing columns
                         try:
-                            headers = worksheet.row_values(1) if worksheet.row_count > 0 else []
+                            headers = self.scheduler.read(worksheet.row_values, 1) if worksheet.row_count > 0 else []
                             current_app.logger.info(f'Current headers: {headers}')
                             
                             required_headers = config['headers']
@@ -230,11 +313,13 @@ class GoogleSheetsService:
                                     try:
                                         # Add the header to the end of the current headers
                                         new_headers = headers + [header]
-                                        worksheet.update('1:1', [new_headers])
+                                        self.scheduler.write(worksheet.update, '1:1', [new_headers])
                                         headers = new_headers
                                         current_app.logger.info(f'Added missing header: {header}')
                                     except Exception as single_header_error:
                                         current_app.logger.error(f'Failed to add header {header}: {single_header_error}')
+                            
+                            self._set_headers(sheet_name, headers)
                         except Exception as check_headers_error:
                             current_app.logger.error(f'Error checking headers: {check_headers_error}')
                     
@@ -244,27 +329,31 @@ class GoogleSheetsService:
                     # Create new worksheet
                     current_app.logger.info(f'Creating new {sheet_name} sheet')
                     try:
-                        worksheet = self.spreadsheet.add_worksheet(
+                        worksheet = self.scheduler.write(
+                            self.spreadsheet.add_worksheet,
                             title=sheet_name,
                             rows=1000,
-                            cols=len(config['headers'])
+                            cols=len(config['headers']),
+                            retry_server_errors=False
                         )
                         # Add headers
-                        worksheet.update('1:1', [config['headers']])
+                        self.scheduler.write(worksheet.update, '1:1', [config['headers']])
+                        self._set_headers(sheet_name, config['headers'])
                         self.worksheets[sheet_name] = worksheet
                         current_app.logger.info(f'New sheet created successfully with all headers: {sheet_name}')
                     except Exception as create_error:
                         current_app.logger.error(f'Error creating new sheet {sheet_name}: {create_error}')
                         
                         # Try to use the first sheet if available
-                        sheets = self.spreadsheet.worksheets()
+                        sheets = self.scheduler.read(self.spreadsheet.worksheets)
                         if sheets:
                             worksheet = sheets[0]
                             current_app.logger.info(f'Using existing first sheet: {worksheet.title}')
                             
                             # Try to set headers on this sheet
                             try:
-                                worksheet.update('1:1', [config['headers']])
+                                self.scheduler.write(worksheet.update, '1:1', [config['headers']])
+                                self._set_headers(sheet_name, config['headers'])
                                 self.worksheets[sheet_name] = worksheet
                                 current_app.logger.info('Headers set on existing sheet')
                             except Exception as header_error:
@@ -275,16 +364,126 @@ class GoogleSheetsService:
                 
             except Exception as e:
                 current_app.logger.error(f"Failed to setup worksheet {sheet_name}: {e}")
+        
+        if self.partitioning:
+            self._load_partitions()
+    
+    def _load_partitions(self):
+        """Find the existing monthly partitions with one worksheet listing"""
+        try:
+            for worksheet in self.scheduler.read(self.spreadsheet.worksheets):
+                if self.partition_catalog.register(worksheet.title):
+                    self.worksheets[worksheet.title] = worksheet
+        except Exception as e:
+            current_app.logger.error(f"Failed to list report partitions: {e}")
+    
+    def _ensure_partition(self, base: str, month) -> str:
+        """Title of the partition of base for month, creating the worksheet on first use"""
+        name = self.partition_catalog.get(base, month)
+        if name:
+            return name
+        
+        name = partition_name(base, month)
+        with self._partition_lock:
+            if self.partition_catalog.get(base, month):
+                return name
+            
+            headers = WORKSHEET_HEADERS[base]
+            try:
+                worksheet = self.scheduler.read(self.spreadsheet.worksheet, name)
+            except gspread.WorksheetNotFound:
+                current_app.logger.info(f'Creating partition {name}')
+                worksheet = self.scheduler.write(
+                    self.spreadsheet.add_worksheet, title=name, rows=1000, cols=len(headers),
+                    retry_server_errors=False
+                )
+                self.scheduler.write(worksheet.update, '1:1', [headers])
+                self._set_headers(name, headers)
+            
+            self.worksheets[name] = worksheet
+            self.partition_catalog.register(name)
+        return name
+    
+    def _write_target(self, sheet_name: str, row_data: Dict[str, Any]) -> str:
+        """Worksheet a new report row goes to: its month's partition when partitioning is on"""
+        if not self.partitioning or sheet_name not in WORKSHEET_HEADERS:
+            return sheet_name
+        
+        month = month_of_timestamp(row_data.get('Timestamp', '')) or month_of(datetime.now())
+        try:
+            return self._ensure_partition(sheet_name, month)
+        except Exception as e:
+            current_app.logger.error(f"Failed to open partition of {sheet_name} for {month}, using {sheet_name}: {e}")
+            return sheet_name
+    
+    def _read_targets(self, sheet_name: str, date_from=None, date_to=None) -> List[str]:
+        """Worksheets to read for a report sheet and an optional date range"""
+        if not self.partitioning or sheet_name not in WORKSHEET_HEADERS:
+            return [sheet_name]
+        return [
+            name for name in self.partition_catalog.overlapping(sheet_name, date_from, date_to)
+            if name in self.worksheets
+        ]
+    
+    def _locate_report(self, sheet_name: str, report_id: str) -> str:
+        """Worksheet holding a report: the month in its ID first, then every partition newest first"""
+        if not self.partitioning or sheet_name not in WORKSHEET_HEADERS:
+            return sheet_name
+        
+        month = month_of_report_id(report_id)
+        candidate = self.partition_catalog.get(sheet_name, month) if month else None
+        if candidate and self._find_report_row(candidate, report_id) is not None:
+            return candidate
+        
+        for name in reversed(self._read_targets(sheet_name)):
+            if name != candidate and self._find_report_row(name, report_id) is not None:
+                return name
+        return sheet_name
+    
+    def _set_headers(self, sheet_name: str, headers: List[str]):
+        """Remember the header row of a worksheet and its header-to-column map"""
+        self.headers[sheet_name] = list(headers)
+        self.header_columns[sheet_name] = {
+            header: index for index, header in enumerate(headers, start=1) if header
+        }
+    
+    def _get_headers(self, sheet_name: str, refresh: bool = False) -> List[str]:
+        """Get the cached header row of a worksheet, reading row 1 only when unknown or refreshing"""
+        if refresh or sheet_name not in self.headers:
+            worksheet = self.worksheets[sheet_name]
+            self._set_headers(sheet_name, self.scheduler.read(worksheet.row_values, 1))
+        return self.headers[sheet_name]
+    
+    def _refresh_headers(self, sheet_name: str) -> bool:
+        """Re-read row 1 after a failed write; returns True if the layout changed"""
+        previous = self.headers.get(sheet_name)
+        try:
+            current = self._get_headers(sheet_name, refresh=True)
+        except Exception as e:
+            current_app.logger.error(f"Failed to refresh headers of {sheet_name}: {e}")
+            return False
+        
+        if current != previous:
+            current_app.logger.info(f'Header layout of {sheet_name} changed: {current}')
+            return True
+        return False
+    
+    def _get_column(self, sheet_name: str, header: str) -> Optional[int]:
+        """1-based column of a header in a worksheet, or None if the sheet lacks it"""
+        self._get_headers(sheet_name)
+        return self.header_columns[sheet_name].get(header)
     
     def is_available(self) -> bool:
-        """Check if Google Sheets service is available"""
-        return self.gc is not None and self.spreadsheet is not None
+        """Check if Google Sheets service is available (connected and worksheets checked)"""
+        return self._ready and self.gc is not None and self.spreadsheet is not None
     
     def _save_report_with_fallback(self, sheet_name: str, row_data: Dict[str, Any]) -> bool:
         """Save report using multiple fallback methods like the Node.js implementation"""
         if not self.is_available() or sheet_name not in self.worksheets:
             return False
         
+        sheet_name = self._write_target(sheet_name, row_data)
+        
         try:
             current_app.logger.info(f'Starting to save report to {sheet_name} sheet')
             worksheet = self.worksheets[sheet_name]
@@ -295,17 +494,25 @@ class GoogleSheetsService:
             # Try multiple methods to add the row to the sheet
             success = False
             
-            # METHOD 1: Standard addRow method
-            try:
-                current_app.logger.info('Trying standard method to add row')
-                # Ensure the order of values matches the headers
-                ordered_row_values = [row_data.get(header, '') for header in worksheet.row_values(1)]
-                worksheet.append_row(ordered_row_values)
-                current_app.logger.info('Report saved to Google Sheets successfully using standard method')
-                success = True
-            except Exception as add_row_error:
-                current_app.logger.error(f'Error adding row with standard method: {add_row_error}')
-                current_app.logger.error(f'Error details: {add_row_error}')
+            # METHOD 1: Standard addRow method, retried once if the header layout changed
+            for attempt in range(2):
+                try:
+                    current_app.logger.info('Trying standard method to add row')
+                    # Ensure the order of values matches the headers
+                    ordered_row_values = [row_data.get(header, '') for header in self._get_headers(sheet_name)]
+                    response = self.scheduler.write(worksheet.append_row, ordered_row_values, retry_server_errors=False)
+                    current_app.logger.info('Report saved to Google Sheets successfully using standard method')
+                    self._index_appended_rows(sheet_name, response, [row_data])
+                    self.snapshot_cache.expire(sheet_name)
+                    self._row_counts.pop(sheet_name, None)
+                    self._forget_closed_summary(sheet_name)
+                    success = True
+                    break
+                except Exception as add_row_error:
+                    current_app.logger.error(f'Error adding row with standard method: {add_row_error}')
+                    current_app.logger.error(f'Error details: {add_row_error}')
+                    if attempt > 0 or not self._refresh_headers(sheet_name):
+                        break
             
             # METHOD 2: Try to append to any sheet if Method 1 failed
             if not success:
@@ -313,7 +520,7 @@ class GoogleSheetsService:
                     current_app.logger.info('Trying to append to any available sheet')
                     
                     # Get all sheets
-                    sheets = self.spreadsheet.worksheets()
+                    sheets = self.scheduler.read(self.spreadsheet.worksheets)
                     if sheets:
                         # Try each sheet until one works
                         for any_sheet in sheets:
@@ -321,7 +528,7 @@ class GoogleSheetsService:
                                 current_app.logger.info(f'Trying to append to sheet: {any_sheet.title}')
                                 
                                 # Get headers and map our data
-                                headers = any_sheet.row_values(1) if any_sheet.row_count > 0 else []
+                                headers = self.scheduler.read(any_sheet.row_values, 1) if any_sheet.row_count > 0 else []
                                 
                                 # Create row values based on headers
                                 row_values = []
@@ -331,7 +538,7 @@ class GoogleSheetsService:
                                     else:
                                         row_values.append('')  # Empty string for missing data
                                 
-                                any_sheet.append_row(row_values)
+                                self.scheduler.write(any_sheet.append_row, row_values, retry_server_errors=False)
                                 current_app.logger.info(f'Successfully added row to sheet: {any_sheet.title}')
                                 success = True
                                 break  # Exit the loop if successful
@@ -346,25 +553,29 @@ class GoogleSheetsService:
                 try:
                     current_app.logger.info("Trying to create a new sheet as last resort")
                     
+                    # Add headers from the original sheet layout or a default set
+                    headers_to_use = self.headers.get(sheet_name) or list(row_data.keys())
+                    
                     # Create a new sheet with a unique name
                     new_sheet_name = f"{sheet_name}_{int(datetime.now().timestamp())}"
-                    new_worksheet = self.spreadsheet.add_worksheet(
+                    new_worksheet = self.scheduler.write(
+                        self.spreadsheet.add_worksheet,
                         title=new_sheet_name,
                         rows=1000,
-                        cols=len(self.worksheets[sheet_name].row_values(1)) if sheet_name in self.worksheets and self.worksheets[sheet_name].row_count > 0 else 20 # Default columns
+                        cols=len(headers_to_use) or 20, # Default columns
+                        retry_server_errors=False
                     )
                     
-                    # Add headers from the original sheet config or a default set
-                    headers_to_use = self.worksheets[sheet_name].row_values(1) if sheet_name in self.worksheets and self.worksheets[sheet_name].row_count > 0 else list(row_data.keys())
                     if headers_to_use:
-                        new_worksheet.update("1:1", [headers_to_use])
+                        self.scheduler.write(new_worksheet.update, "1:1", [headers_to_use])
                     
                     # Add the row to the newly created sheet
                     ordered_row_values = [row_data.get(header, "") for header in headers_to_use]
-                    new_worksheet.append_row(ordered_row_values)
+                    self.scheduler.write(new_worksheet.append_row, ordered_row_values, retry_server_errors=False)
                     
                     current_app.logger.info(f"Successfully created new sheet {new_sheet_name} and added row")
                     self.worksheets[new_sheet_name] = new_worksheet # Add to our tracked worksheets
+                    self._set_headers(new_sheet_name, headers_to_use)
                     success = True
                 except Exception as create_sheet_error:
                     current_app.logger.error(f"Failed to create new sheet as last resort: {create_sheet_error}")
@@ -381,72 +592,55 @@ class GoogleSheetsService:
     
     def add_adverse_reaction(self, report_data: Dict[str, Any]) -> bool:
         """Add adverse reaction report to Google Sheets using robust fallback approach"""
-        # Prepare row data with proper mapping
-        row_data = {
-            'Timestamp': datetime.now().isoformat(),
-            'ID': report_data.get('id', ''),
-            'Patient Age': report_data.get('patient_age', ''),
-            'Patient Gender': report_data.get('patient_gender', ''),
-            'Patient Weight': report_data.get('patient_weight', ''),
-            'Drug Name': report_data.get('drug_name', ''),
-            'Drug Manufacturer': report_data.get('drug_manufacturer', ''),
-            'Drug Batch Number': report_data.get('drug_batch_number', ''),
-            'Drug Dosage': report_data.get('drug_dosage', ''),
-            'Drug Route': report_data.get('drug_route', ''),
-            'Drug Indication': report_data.get('drug_indication', ''),
-            'Reaction Description': report_data.get('reaction_description', ''),
-            'Reaction Severity': report_data.get('reaction_severity', ''),
-            'Reaction Start Date': report_data.get('reaction_start_date', ''),
-            'Reaction End Date': report_data.get('reaction_end_date', ''),
-            'Reaction Outcome': report_data.get('reaction_outcome', ''),
-            'Reporter Name': report_data.get('reporter_name', ''),
-            'Reporter Phone': report_data.get('reporter_phone', ''),
-            'Reporter Email': report_data.get('reporter_email', ''),
-            'Reporter Type': report_data.get('reporter_type', ''),
-            'Governorate': report_data.get('governorate', ''),
-            'City': report_data.get('city', ''),
-            'Pharmacy Name': report_data.get('pharmacy_name', ''),
-            'Pharmacy Address': report_data.get('pharmacy_address', ''),
-            'Concomitant Drugs': report_data.get('concomitant_drugs', ''),
-            'Medical History': report_data.get('medical_history', ''),
-            'Status': report_data.get('status', 'pending'),
-            'Priority': report_data.get('priority', 'normal'),
-            'Assigned To': report_data.get('assigned_to', ''),
-            'Follow Up Required': report_data.get('follow_up_required', False),
-            'Notes': ''
-        }
-        
-        return self._save_report_with_fallback('adverse_reactions', row_data)
+        return self._save_report_with_fallback('adverse_reactions', build_adverse_reaction_row(report_data))
     
     def add_intruder_report(self, report_data: Dict[str, Any]) -> bool:
         """Add intruder report to Google Sheets using robust fallback approach"""
-        # Prepare row data with proper mapping
-        row_data = {
-            'Timestamp': datetime.now().isoformat(),
-            'ID': report_data.get('id', ''),
-            'Governorate': report_data.get('governorate', ''),
-            'Pharmacy Name': report_data.get('pharmacy_name', ''),
-            'Pharmacy Address': report_data.get('pharmacy_address', ''),
-            'Pharmacy License': report_data.get('pharmacy_license', ''),
-            'Intruder Name': report_data.get('intruder_name', ''),
-            'Intruder Role': report_data.get('intruder_role', ''),
-            'Intruder Real Job': report_data.get('intruder_real_job', ''),
-            'Intruder Residence': report_data.get('intruder_residence', ''),
-            'Intruder ID Number': report_data.get('intruder_id_number', ''),
-            'Problem Description': report_data.get('problem_description', ''),
-            'Evidence Description': report_data.get('evidence_description', ''),
-            'Reporter Name': report_data.get('reporter_name', ''),
-            'Reporter Phone': report_data.get('reporter_phone', ''),
-            'Reporter Email': report_data.get('reporter_email', ''),
-            'Reporter Anonymous': report_data.get('reporter_anonymous', False),
-            'Status': report_data.get('status', 'pending'),
-            'Confirmed': report_data.get('confirmed', False),
-            'Priority': report_data.get('priority', 'normal'),
-            'Assigned To': report_data.get('assigned_to', ''),
-            'Notes': ''
-        }
+        return self._save_report_with_fallback('intruder_reports', build_intruder_report_row(report_data))
+    
+    def append_rows(self, sheet_name: str, rows: List[Dict[str, Any]]) -> bool:
+        """Append several prepared rows with a single append_rows call, keeping their order"""
+        if not self.is_available() or sheet_name not in self.worksheets:
+            return False
+        
+        if not rows:
+            return True
         
-        return self._save_report_with_fallback('intruder_reports', row_data)
+        if self.partitioning and sheet_name in WORKSHEET_HEADERS:
+            # One append per partition; the outbox already sends one append_group per call
+            groups = {}
+            for row in rows:
+                groups.setdefault(self._write_target(sheet_name, row), []).append(row)
+            return all(self._append_to_worksheet(target, group) for target, group in groups.items())
+        
+        return self._append_to_worksheet(sheet_name, rows)
+    
+    def append_group(self, sheet_name: str, row: Dict[str, Any]) -> str:
+        """Rows with the same group land in the same worksheet (their month's partition)"""
+        if not self.partitioning or sheet_name not in WORKSHEET_HEADERS:
+            return sheet_name
+        return partition_name(sheet_name, month_of_timestamp(row.get('Timestamp', '')) or month_of(datetime.now()))
+    
+    def _append_to_worksheet(self, sheet_name: str, rows: List[Dict[str, Any]]) -> bool:
+        """One append_rows call on one worksheet, retried once after a header layout change"""
+        worksheet = self.worksheets[sheet_name]
+        for attempt in range(2):
+            try:
+                headers = self._get_headers(sheet_name)
+                values = [[row.get(header, '') for header in headers] for row in rows]
+                response = self.scheduler.write(worksheet.append_rows, values, retry_server_errors=False)
+                self._index_appended_rows(sheet_name, response, rows)
+                self.snapshot_cache.expire(sheet_name)
+                self._row_counts.pop(sheet_name, None)
+                self._forget_closed_summary(sheet_name)
+                current_app.logger.info(f'Appended {len(values)} rows to {sheet_name} sheet')
+                return True
+            except Exception as e:
+                current_app.logger.error(f"Failed to append rows to {sheet_name}: {e}")
+                # Retry once only if the failure was caused by a changed header layout
+                if attempt > 0 or not self._refresh_headers(sheet_name):
+                    return False
+        return False
     
     def get_reports_summary(self) -> Dict[str, Any]:
         """Get summary statistics from Google Sheets with robust error handling"""
@@ -456,47 +650,22 @@ class GoogleSheetsService:
         try:
             summary = {}
             
-            # Get adverse reactions summary with error handling
-            if 'adverse_reactions' in self.worksheets:
+            for sheet_name, statuses in SUMMARY_STATUSES.items():
+                if sheet_name not in self.worksheets:
+                    continue
+                
                 try:
-                    worksheet = self.worksheets['adverse_reactions']
-                    
-                    # Use safer method to get records
-                    all_records = self._get_records_safely(worksheet)
-                    
-                    summary['adverse_reactions'] = {
-                        'total': len(all_records),
-                        'pending': len([r for r in all_records if r.get('Status', '').lower() == 'pending']),
-                        'under_review': len([r for r in all_records if r.get('Status', '').lower() == 'under_review']),
-                        'reviewed': len([r for r in all_records if r.get('Status', '').lower() == 'reviewed']),
-                        'closed': len([r for r in all_records if r.get('Status', '').lower() == 'closed'])
-                    }
-                except Exception as adverse_error:
-                    current_app.logger.error(f"Error getting adverse reactions summary: {adverse_error}")
-                    summary['adverse_reactions'] = {
-                        'total': 0, 'pending': 0, 'under_review': 0, 'reviewed': 0, 'closed': 0
-                    }
-            
-            # Get intruder reports summary with error handling
-            if 'intruder_reports' in self.worksheets:
-                try:
-                    worksheet = self.worksheets['intruder_reports']
-                    
-                    # Use safer method to get records
-                    all_records = self._get_records_safely(worksheet)
-                    
-                    summary['intruder_reports'] = {
-                        'total': len(all_records),
-                        'pending': len([r for r in all_records if r.get('Status', '').lower() == 'pending']),
-                        'investigating': len([r for r in all_records if r.get('Status', '').lower() == 'investigating']),
-                        'verified': len([r for r in all_records if r.get('Status', '').lower() == 'verified']),
-                        'closed': len([r for r in all_records if r.get('Status', '').lower() == 'closed'])
-                    }
-                except Exception as intruder_error:
-                    current_app.logger.error(f"Error getting intruder reports summary: {intruder_error}")
-                    summary['intruder_reports'] = {
-                        'total': 0, 'pending': 0, 'investigating': 0, 'verified': 0, 'closed': 0
-                    }
+                    # With partitioning the per-partition counts are added up
+                    totals = {'total': 0}
+                    totals.update({status: 0 for status in statuses})
+                    for worksheet_name in self._read_targets(sheet_name):
+                        for key, count in self._worksheet_summary(worksheet_name, statuses).items():
+                            totals[key] = totals.get(key, 0) + count
+                    summary[sheet_name] = totals
+                except Exception as sheet_error:
+                    current_app.logger.error(f"Error getting {sheet_name} summary: {sheet_error}")
+                    summary[sheet_name] = {'total': 0}
+                    summary[sheet_name].update({status: 0 for status in statuses})
             
             return summary
             
@@ -504,48 +673,459 @@ class GoogleSheetsService:
             current_app.logger.error(f"Failed to get reports summary from sheets: {e}")
             return {}
     
-    def _get_records_safely(self, worksheet) -> List[Dict[str, Any]]:
-        """Safely get records from worksheet, handling empty rows and malformed data"""
+    def probe(self) -> bool:
+        """One cheap read used by the supervisor to test a recovered backend"""
+        try:
+            self.scheduler.read(self.spreadsheet.get_lastUpdateTime)
+            return True
+        except Exception as e:
+            current_app.logger.warning(f"Sheets probe failed: {e}")
+            return False
+    
+    def _worksheet_summary(self, worksheet_name: str, statuses: List[str]) -> Dict[str, int]:
+        """Total and per-status counts of one worksheet (or partition)"""
+        # Past months no longer receive reports, so their counts are kept until we edit them
+        closed = self.partitioning and self.partition_catalog.is_closed(worksheet_name)
+        if closed:
+            cached = self._closed_summary(worksheet_name)
+            if cached is not None:
+                return cached
+        
+        # Another worker may already have counted the current shared snapshot
+        snapshot = self.snapshot_cache.get(worksheet_name)
+        if (snapshot is None or not self.snapshot_cache.is_fresh(snapshot)
+                or not self.snapshot_cache.is_current(snapshot)):
+            shared_summary = self.snapshot_cache.shared_summary(worksheet_name, 'summary')
+            if shared_summary is not None:
+                return shared_summary
+        
+        # Counts come from one pass over the dictionary-encoded Status column
+        snapshot = self.get_snapshot(worksheet_name)
+        if snapshot is None:
+            raise ValueError('no snapshot available')
+        
+        status_counts = snapshot.columns.value_counts('Status')
+        result = {'total': snapshot.columns.length}
+        result.update({status: status_counts.get(status, 0) for status in statuses})
+        self.snapshot_cache.store_summary(snapshot, 'summary', result)
+        if closed:
+            self._remember_closed_summary(worksheet_name, result)
+        return result
+    
+    def _closed_summary(self, worksheet_name: str) -> Optional[Dict[str, int]]:
+        shared = self.snapshot_cache.shared
+        if shared is None:
+            return self._closed_summaries.get(worksheet_name)
+        try:
+            return shared.get_json(f'closed-summary:{worksheet_name}')
+        except Exception:
+            return None
+    
+    def _remember_closed_summary(self, worksheet_name: str, result: Dict[str, int]):
+        shared = self.snapshot_cache.shared
+        if shared is None:
+            self._closed_summaries[worksheet_name] = result
+            return
+        try:
+            shared.set_json(f'closed-summary:{worksheet_name}', result)
+        except Exception as e:
+            current_app.logger.warning(f"Could not store summary of {worksheet_name}: {e}")
+    
+    def _forget_closed_summary(self, worksheet_name: str):
+        self._closed_summaries.pop(worksheet_name, None)
+        shared = self.snapshot_cache.shared
+        if shared is not None:
+            try:
+                shared.delete(f'closed-summary:{worksheet_name}')
+            except Exception as e:
+                current_app.logger.warning(f"Could not drop stored summary of {worksheet_name}: {e}")
+    
+    def _probe_modified_time(self) -> Optional[str]:
+        """Cheap staleness check: the spreadsheet's last modified time from Drive metadata"""
         try:
-            # Get all values from the worksheet
-            all_values = worksheet.get_all_values()
+            return self.scheduler.read(self.spreadsheet.get_lastUpdateTime)
+        except Exception as e:
+            current_app.logger.warning(f"Could not read spreadsheet modified time: {e}")
+            return None
+    
+    def get_snapshot(self, sheet_name: str) -> Optional[SheetSnapshot]:
+        """Get the cached snapshot of a worksheet, downloading it only when stale.
+        
+        While the circuit breaker is open a stale snapshot is served as is
+        rather than failing.
+        """
+        snapshot = self.snapshot_cache.get(sheet_name)
+        if snapshot and self.scheduler.breaker.is_open:
+            return snapshot
+        if snapshot and self.snapshot_cache.is_fresh(snapshot) and self.snapshot_cache.is_current(snapshot):
+            return snapshot
+        
+        with self._snapshot_locks_guard:
+            lock = self._snapshot_locks.setdefault(sheet_name, threading.Lock())
+        
+        with lock:
+            # Another thread may have refreshed it while we waited
+            snapshot = self.snapshot_cache.get(sheet_name)
+            if snapshot and self.snapshot_cache.is_fresh(snapshot) and self.snapshot_cache.is_current(snapshot):
+                return snapshot
             
-            if not all_values or len(all_values) < 2:
-                # No data or only headers
-                return []
+            # ...or another worker process
+            shared = self.snapshot_cache.load_shared(sheet_name)
+            if shared is not None:
+                return self._adopt_snapshot(sheet_name, shared)
             
-            # Get headers from first row
-            headers = all_values[0]
-            records = []
+            with self.snapshot_cache.refresh_lock(sheet_name) as refreshing:
+                if not refreshing:
+                    # Another worker is downloading this sheet right now; wait for its result
+                    shared = self._wait_for_shared_snapshot(sheet_name)
+                    if shared is not None:
+                        return self._adopt_snapshot(sheet_name, shared)
+                    if snapshot is not None:
+                        return snapshot
+                
+                # Probe before downloading so a change made during the download
+                # is still seen as newer than this snapshot next time
+                modified_time = self._probe_modified_time()
+                if snapshot and self.snapshot_cache.can_revalidate(snapshot) and modified_time == snapshot.modified_time:
+                    self.refresh_stats['revalidated'] += 1
+                    self.snapshot_cache.mark_checked(snapshot)
+                    return snapshot
+                
+                if snapshot and self.snapshot_cache.can_extend(snapshot):
+                    extended = self._tail_refresh(sheet_name, snapshot, modified_time)
+                    if extended is not None:
+                        return self._adopt_snapshot(sheet_name, extended)
+                
+                worksheet = self.worksheets[sheet_name]
+                values = self.scheduler.read(worksheet.get_all_values)
+                self.refresh_stats['full'] += 1
+                snapshot = self.snapshot_cache.put(sheet_name, values, modified_time)
+                return self._adopt_snapshot(sheet_name, snapshot)
+    
+    def _tail_refresh(self, sheet_name: str, snapshot: SheetSnapshot,
+                      modified_time: Optional[str]) -> Optional[SheetSnapshot]:
+        """Refresh a snapshot by fetching only the rows below it, with one batch_get.
+        
+        The same request re-reads the header row and the ID and Status columns
+        of the rows already cached; if any of them differ the sheet was edited
+        out of band (rows inserted, deleted or re-statused) and None is
+        returned so the caller does a full reload.
+        """
+        headers = snapshot.headers
+        probe_headers = [header for header in ('ID', 'Status') if header in headers]
+        if not headers or not probe_headers:
+            return None
+        
+        last_row = len(snapshot.rows) + 1
+        last_column = gspread.utils.rowcol_to_a1(1, len(headers)).rstrip('0123456789')
+        ranges = [f'A1:{last_column}1', f'A{last_row + 1}:{last_column}']
+        for header in probe_headers:
+            column = gspread.utils.rowcol_to_a1(1, headers.index(header) + 1).rstrip('0123456789')
+            ranges.append(f'{column}2:{column}{last_row}')
+        
+        try:
+            header_range, tail, *probes = self.scheduler.read(self.worksheets[sheet_name].batch_get, ranges)
+        except Exception as e:
+            current_app.logger.warning(f"Tail fetch of {sheet_name} failed, reloading it: {e}")
+            return None
+        
+        current_headers = list(header_range[0]) if header_range else []
+        if current_headers + [''] * (len(headers) - len(current_headers)) != headers:
+            return None
+        
+        for header, probe in zip(probe_headers, probes):
+            position = headers.index(header)
+            for row_offset, row in enumerate(snapshot.rows):
+                cached = row[position] if position < len(row) else ''
+                current = probe[row_offset][0] if row_offset < len(probe) and probe[row_offset] else ''
+                if cached != current:
+                    current_app.logger.info(f'{sheet_name} was edited outside the app, reloading it')
+                    return None
+        
+        self.refresh_stats['tail'] += 1
+        width = len(headers)
+        new_rows = [list(row) + [''] * (width - len(row)) for row in tail]
+        return self.snapshot_cache.extend(snapshot, new_rows, modified_time)
+    
+    def _adopt_snapshot(self, sheet_name: str, snapshot: SheetSnapshot) -> SheetSnapshot:
+        """Bring headers and the row index in line with a newly loaded snapshot"""
+        if snapshot.headers and snapshot.headers != self.headers.get(sheet_name):
+            # Schema change detected from the downloaded header row
+            self._set_headers(sheet_name, snapshot.headers)
+        self.row_indexes[sheet_name] = self._build_row_index(snapshot)
+        return snapshot
+    
+    def _wait_for_shared_snapshot(self, sheet_name: str) -> Optional[SheetSnapshot]:
+        """Poll the shared cache while another worker holds the refresh lock"""
+        deadline = time.monotonic() + current_app.config.get('SHARED_CACHE_WAIT', 10.0)
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            shared = self.snapshot_cache.load_shared(sheet_name)
+            if shared is not None:
+                return shared
+        return None
+    
+    def _build_row_index(self, snapshot: SheetSnapshot) -> Dict[str, int]:
+        """Map report IDs to sheet row numbers from a downloaded snapshot"""
+        if 'ID' not in snapshot.headers:
+            return {}
+        
+        id_position = snapshot.headers.index('ID')
+        index = {}
+        for row_number, row in enumerate(snapshot.rows, start=2):
+            if id_position < len(row) and row[id_position].strip():
+                index[row[id_position].strip()] = row_number
+        return index
+    
+    def _index_appended_rows(self, sheet_name: str, response: Any, rows: List[Dict[str, Any]]):
+        """Add rows just appended to the ID index using the range reported by the API"""
+        index = self.row_indexes.get(sheet_name)
+        if index is None:
+            return
+        
+        try:
+            updated_range = response['updates']['updatedRange']
+            first_cell = updated_range.split('!')[-1].split(':')[0]
+            start_row = gspread.utils.a1_to_rowcol(first_cell)[0]
+        except Exception:
+            # Without the row numbers the index would be wrong; rebuild it on next use
+            self.row_indexes.pop(sheet_name, None)
+            return
+        
+        for offset, row in enumerate(rows):
+            report_id = str(row.get('ID', '')).strip()
+            if report_id:
+                index[report_id] = start_row + offset
+    
+    def _find_report_row(self, sheet_name: str, report_id: str) -> Optional[int]:
+        """Sheet row number of a report, building the ID index from a snapshot if needed"""
+        if sheet_name not in self.row_indexes:
+            self.get_snapshot(sheet_name)
+        return self.row_indexes.get(sheet_name, {}).get(str(report_id).strip())
+    
+    def _get_records_safely(self, sheet_name: str) -> List[Dict[str, Any]]:
+        """Safely get records of a worksheet from its cached snapshot"""
+        try:
+            snapshot = self.get_snapshot(sheet_name)
+            return snapshot.records if snapshot else []
             
-            # Process each data row (skip header row)
-            for row_index, row in enumerate(all_values[1:], start=2):
-                try:
-                    # Skip completely empty rows
+        except Exception as e:
+            current_app.logger.error(f"Error in _get_records_safely: {e}")
+            return []
+    
+    def read_rows(self, sheet_name: str, start_row: int, end_row: Optional[int] = None) -> List[List[str]]:
+        """Read raw rows start_row..end_row (open-ended when end_row is None) with one range request.
+        
+        Rows are padded to the header width; blank rows inside the range are kept
+        so the caller can derive sheet row numbers from list positions.
+        """
+        if not self.is_available() or sheet_name not in self.worksheets:
+            return []
+        
+        width = len(self._get_headers(sheet_name))
+        last_column = gspread.utils.rowcol_to_a1(1, width).rstrip('0123456789')
+        range_name = f"A{start_row}:{last_column}{end_row if end_row else ''}"
+        values = self.scheduler.read(self.worksheets[sheet_name].get, range_name)
+        return [list(row) + [''] * (width - len(row)) for row in values]
+    
+    def report_snapshots(self, sheet_name: str, date_from=None, date_to=None) -> List[SheetSnapshot]:
+        """Current snapshots of a report sheet (all overlapping partitions with partitioning)"""
+        if not self.is_available() or sheet_name not in self.worksheets:
+            return []
+        
+        snapshots = []
+        for worksheet_name in self._read_targets(sheet_name, date_from, date_to):
+            snapshot = self.get_snapshot(worksheet_name)
+            if snapshot is not None:
+                snapshots.append(snapshot)
+        return snapshots
+    
+    def count_rows(self, sheet_name: str) -> int:
+        """Number of data rows in a worksheet, cached until the spreadsheet changes.
+        
+        Uses the local snapshot when it is fresh; otherwise reads only the
+        Timestamp column, which every report has (legacy and hand-entered rows
+        may lack an ID), and skips even that while the modified time is unchanged.
+        """
+        snapshot = self.snapshot_cache.get(sheet_name)
+        if snapshot and self.snapshot_cache.is_fresh(snapshot) and self.snapshot_cache.is_current(snapshot):
+            return len(snapshot.rows)
+        
+        cached = self._row_counts.get(sheet_name)
+        if cached and time.monotonic() - cached[2] < self.snapshot_cache.ttl:
+            return cached[0]
+        
+        modified_time = self._probe_modified_time()
+        if cached and modified_time is not None and modified_time == cached[1]:
+            self._row_counts[sheet_name] = (cached[0], modified_time, time.monotonic())
+            return cached[0]
+        
+        column = gspread.utils.rowcol_to_a1(1, self._get_column(sheet_name, 'Timestamp') or 1).rstrip('0123456789')
+        values = self.scheduler.read(self.worksheets[sheet_name].get, f'{column}2:{column}')
+        count = len(values)
+        self._row_counts[sheet_name] = (count, modified_time, time.monotonic())
+        return count
+    
+    def get_report_page(self, sheet_name: str, page: int, per_page: int) -> Dict[str, Any]:
+        """One page of a report sheet, newest first, without downloading the whole sheet.
+        
+        Reports are appended at the bottom, so page N is a block of rows counted
+        up from the last one and costs one range read (two when it straddles
+        monthly partitions). A fresh snapshot is used instead when there is one.
+        """
+        result = {'reports': [], 'total': 0, 'pages': 0, 'current_page': page}
+        if not self.is_available() or sheet_name not in self.worksheets:
+            return result
+        
+        try:
+            # Newest partition first; each contributes its rows bottom-up
+            targets = [(name, self.count_rows(name)) for name in reversed(self._read_targets(sheet_name))]
+            total = sum(count for _, count in targets)
+            result['total'] = total
+            result['pages'] = -(-total // per_page)
+            
+            skip = (page - 1) * per_page
+            wanted = per_page
+            for name, count in targets:
+                if wanted <= 0:
+                    break
+                if skip >= count:
+                    skip -= count
+                    continue
+                
+                # Newest-first positions skip..skip+take-1 are sheet rows counted up from count+1
+                take = min(wanted, count - skip)
+                end_row = count + 1 - skip
+                start_row = end_row - take + 1
+                result['reports'].extend(reversed(self._page_records(name, start_row, end_row)))
+                wanted -= take
+                skip = 0
+            return result
+        
+        except Exception as e:
+            current_app.logger.error(f"Failed to read page {page} of {sheet_name}: {e}")
+            return result
+    
+    def _page_records(self, sheet_name: str, start_row: int, end_row: int) -> List[Dict[str, Any]]:
+        """Records of sheet rows start_row..end_row, from a fresh snapshot or one range read"""
+        snapshot = self.snapshot_cache.get(sheet_name)
+        if snapshot and self.snapshot_cache.is_fresh(snapshot) and self.snapshot_cache.is_current(snapshot):
+            headers = snapshot.headers
+            rows = snapshot.rows[start_row - 2:end_row - 1]
+        else:
+            headers = self._get_headers(sheet_name)
+            rows = self.read_rows(sheet_name, start_row, end_row)
+        
+        records = []
+        for row in rows:
+            if any(cell.strip() for cell in row if cell):
+                records.append({
+                    header: row[position].strip() if position < len(row) else ''
+                    for position, header in enumerate(headers)
+                })
+        return records
+    
+    def iter_report_rows(self, sheet_name: str, filters: Dict[str, Any] = None,
+                         chunk_size: int = 1000):
+        """Yield the rows of a report sheet matching the listing filters, oldest first.
+        
+        Rows are read chunk_size at a time with range requests and never turned
+        into records or cached, so memory stays flat however large the sheet
+        is. Chunks are read until one comes back empty rather than up to
+        count_rows(), so no trailing row is missed whichever cells it has.
+        Each row is a list in WORKSHEET_HEADERS order, whatever the column
+        layout of the worksheets it came from.
+        """
+        filters = filters or {}
+        conditions = self._listing_conditions(sheet_name, filters)
+        date_from, date_to = filters.get('date_from'), filters.get('date_to')
+        low = date_from.isoformat() if date_from else ''
+        high = date_to.isoformat() if date_to else '9999-12-31'
+        headers = WORKSHEET_HEADERS[sheet_name]
+        
+        for worksheet_name in self._read_targets(sheet_name, date_from, date_to):
+            worksheet_headers = self._get_headers(worksheet_name)
+            remap = None
+            if worksheet_headers != headers:
+                remap = [worksheet_headers.index(header) if header in worksheet_headers else None for header in headers]
+            timestamp = worksheet_headers.index('Timestamp') if 'Timestamp' in worksheet_headers else None
+            
+            start_row = 2
+            while True:
+                rows = self.read_rows(worksheet_name, start_row, start_row + chunk_size - 1)
+                if not rows:
+                    break
+                start_row += chunk_size
+                for row in rows:
                     if not any(cell.strip() for cell in row if cell):
                         continue
+                    if conditions and not row_matches(conditions, worksheet_headers, row):
+                        continue
+                    if (date_from or date_to) and not (
+                            timestamp is not None and low <= row[timestamp].strip()[:10] <= high):
+                        continue
                     
-                    # Create record dictionary, handling missing columns
-                    record = {}
-                    for col_index, header in enumerate(headers):
-                        if col_index < len(row):
-                            record[header] = row[col_index].strip()
-                        else:
-                            record[header] = ''  # Default empty value for missing columns
-                    
-                    # Only add record if it has some meaningful data
-                    if any(value.strip() for value in record.values()):
-                        records.append(record)
-                        
-                except Exception as row_error:
-                    current_app.logger.warning(f"Error processing row {row_index}: {row_error}")
-                    continue  # Skip problematic rows
+                    row = [cell.strip() for cell in row]
+                    if remap is not None:
+                        row = [row[position] if position is not None else '' for position in remap]
+                    yield row
+    
+    def _filter_records(self, sheet_name: str, conditions: List[Any], date_from=None,
+                        date_to=None) -> List[Dict[str, Any]]:
+        """Records of a report sheet matching all conditions, resolved through the snapshots' filter indexes.
+        
+        Each condition is (kind, header, value) with kind 'equals', 'contains' or
+        'any_of'; the matching position sets are intersected. With partitioning
+        only the partitions overlapping date_from..date_to are read.
+        """
+        return [record for _, _, record in self._filter_rows(sheet_name, conditions, date_from, date_to)]
+    
+    def _filter_rows(self, sheet_name: str, conditions: List[Any], date_from=None,
+                     date_to=None) -> List[Tuple[str, int, Dict[str, Any]]]:
+        """Like _filter_records, as (worksheet, sheet row, record) entries in sheet order"""
+        entries = []
+        for worksheet_name in self._read_targets(sheet_name, date_from, date_to):
+            snapshot = self.get_snapshot(worksheet_name)
+            if snapshot is None:
+                continue
             
-            return records
+            row_numbers = snapshot.columns.row_numbers.tolist()
+            if not conditions:
+                positions = range(len(snapshot.records))
+            else:
+                index = snapshot.filter_index
+                position_sets = [getattr(index, kind)(header, value) for kind, header, value in conditions]
+                positions = FilterIndex.intersect(position_sets).tolist()
+            entries.extend((worksheet_name, row_numbers[position], snapshot.records[position]) for position in positions)
+        
+        if date_from or date_to:
+            # ISO timestamps compare correctly as strings on their date prefix
+            low = date_from.isoformat() if date_from else ''
+            high = date_to.isoformat() if date_to else '9999-12-31'
+            entries = [entry for entry in entries if low <= entry[2].get('Timestamp', '')[:10] <= high]
+        return entries
+    
+    def _listing_conditions(self, sheet_name: str, filters: Dict[str, Any]) -> List[Any]:
+        """Filter conditions of the listing query arguments, as used by _filter_records"""
+        conditions = []
+        
+        if filters.get('status'):
+            conditions.append(('equals', 'Status', filters['status']))
+        
+        if sheet_name == 'adverse_reactions':
+            if filters.get('severity'):
+                conditions.append(('equals', 'Reaction Severity', filters['severity']))
             
-        except Exception as e:
-            current_app.logger.error(f"Error in _get_records_safely: {e}")
-            return []
+            if filters.get('drug_name'):
+                conditions.append(('contains', 'Drug Name', filters['drug_name']))
+        
+        if filters.get('governorate'):
+            conditions.append(('equals', 'Governorate', filters['governorate']))
+        
+        if sheet_name == 'intruder_reports' and filters.get('confirmed_only'):
+            conditions.append(('any_of', 'Confirmed', CONFIRMED_VALUES))
+        
+        return conditions
     
     def get_adverse_reactions(self, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Get adverse reaction reports from Google Sheets with optional filters and safe error handling"""
@@ -553,37 +1133,11 @@ class GoogleSheetsService:
             return []
         
         try:
-            worksheet = self.worksheets['adverse_reactions']
-            
-            # Use safe method to get records
-            all_records = self._get_records_safely(worksheet)
-            
-            # Apply filters if provided
-            if filters:
-                filtered_records = []
-                for record in all_records:
-                    include_record = True
-                    
-                    if filters.get('status') and record.get('Status', '').lower() != filters['status'].lower():
-                        include_record = False
-                    
-                    if filters.get('severity') and record.get('Reaction Severity', '').lower() != filters['severity'].lower():
-                        include_record = False
-                    
-                    if filters.get('drug_name'):
-                        drug_name = record.get('Drug Name', '').lower()
-                        if filters['drug_name'].lower() not in drug_name:
-                            include_record = False
-                    
-                    if filters.get('governorate') and record.get('Governorate', '').lower() != filters['governorate'].lower():
-                        include_record = False
-                    
-                    if include_record:
-                        filtered_records.append(record)
-                
-                return filtered_records
-            
-            return all_records
+            filters = filters or {}
+            return self._filter_records(
+                'adverse_reactions', self._listing_conditions('adverse_reactions', filters),
+                filters.get('date_from'), filters.get('date_to')
+            )
             
         except Exception as e:
             current_app.logger.error(f"Failed to get adverse reactions from sheets: {e}")
@@ -595,69 +1149,141 @@ class GoogleSheetsService:
             return []
         
         try:
-            worksheet = self.worksheets['intruder_reports']
-            
-            # Use safe method to get records
-            all_records = self._get_records_safely(worksheet)
-            
-            # Apply filters if provided
-            if filters:
-                filtered_records = []
-                for record in all_records:
-                    include_record = True
-                    
-                    if filters.get('status') and record.get('Status', '').lower() != filters['status'].lower():
-                        include_record = False
-                    
-                    if filters.get('governorate') and record.get('Governorate', '').lower() != filters['governorate'].lower():
-                        include_record = False
-                    
-                    if filters.get('confirmed_only'):
-                        confirmed = record.get('Confirmed', '').lower()
-                        if confirmed not in ['true', '1', 'yes', 'confirmed']:
-                            include_record = False
-                    
-                    if include_record:
-                        filtered_records.append(record)
-                
-                return filtered_records
-            
-            return all_records
+            filters = filters or {}
+            return self._filter_records(
+                'intruder_reports', self._listing_conditions('intruder_reports', filters),
+                filters.get('date_from'), filters.get('date_to')
+            )
             
         except Exception as e:
             current_app.logger.error(f"Failed to get intruder reports from sheets: {e}")
             return []
     
+    def get_report_rows(self, sheet_name: str, filters: Dict[str, Any] = None) -> List[Tuple[str, int, Dict[str, Any]]]:
+        """Filtered reports of a report sheet as (worksheet, sheet row, record) entries, for cursor listings"""
+        if not self.is_available() or sheet_name not in self.worksheets:
+            return []
+        
+        try:
+            filters = filters or {}
+            return self._filter_rows(
+                sheet_name, self._listing_conditions(sheet_name, filters),
+                filters.get('date_from'), filters.get('date_to')
+            )
+            
+        except Exception as e:
+            current_app.logger.error(f"Failed to get {sheet_name} from sheets: {e}")
+            return []
+    
     def update_report_status(self, sheet_name: str, report_id: str, status: str) -> bool:
         """Update report status in Google Sheets"""
         if not self.is_available() or sheet_name not in self.worksheets:
             return False
         
         try:
+            sheet_name = self._locate_report(sheet_name, report_id)
             worksheet = self.worksheets[sheet_name]
             
-            # Find the row with the matching ID
-            id_column = worksheet.col_values(1)  # Assuming ID is in first column
-            
-            for i, cell_id in enumerate(id_column):
-                if str(cell_id) == str(report_id):
-                    # Update status column (assuming it's in a specific position)
-                    if sheet_name == 'adverse_reactions':
-                        status_col = 27  # Status column position
-                    elif sheet_name == 'intruder_reports':
-                        status_col = 18  # Status column position
-                    else:
-                        return False
-                    
-                    worksheet.update_cell(i + 1, status_col, status)
-                    return True
+            # Find the row with the matching ID through the maintained index
+            row_number = self._find_report_row(sheet_name, report_id)
+            if row_number is None:
+                return False
             
-            return False
+            # Locate the Status column by name in the cached header layout
+            status_col = self._get_column(sheet_name, 'Status')
+            if status_col is None:
+                return False
+            
+            self.scheduler.write(worksheet.update_cell, row_number, status_col, status)
+            self._cells_written(sheet_name, [(row_number, status_col, status)])
+            return True
             
         except Exception as e:
             current_app.logger.error(f"Failed to update report status in sheets: {e}")
             return False
     
+    def _cells_written(self, sheet_name: str, cells: List[Any]):
+        """Reflect our own cell writes in the cached snapshot and forget derived summaries"""
+        self.snapshot_cache.update_cells(sheet_name, cells)
+        self._forget_closed_summary(sheet_name)
+    
+    def batch_update_reports(self, changes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply many report changes with a single batch_update call per worksheet.
+        
+        Each change holds sheet_name, report_id and any of the BULK_UPDATE_FIELDS.
+        Returns one result per change, in the same order.
+        """
+        results = [
+            {'sheet_name': change.get('sheet_name'), 'report_id': change.get('report_id'), 'success': False}
+            for change in changes
+        ]
+        
+        if not self.is_available():
+            for result in results:
+                result['error'] = 'Google Sheets service not available'
+            return results
+        
+        # Group changes by worksheet so each sheet gets one request
+        by_sheet = {}
+        for position, change in enumerate(changes):
+            sheet_name = change.get('sheet_name')
+            if not sheet_name or not change.get('report_id'):
+                results[position]['error'] = 'Missing sheet_name or report_id'
+            elif sheet_name not in self.worksheets:
+                results[position]['error'] = f'Unknown sheet {sheet_name}'
+            else:
+                try:
+                    target = self._locate_report(sheet_name, change['report_id'])
+                except Exception as e:
+                    current_app.logger.error(f"Failed to locate report {change['report_id']}: {e}")
+                    target = sheet_name
+                by_sheet.setdefault(target, []).append(position)
+        
+        for sheet_name, positions in by_sheet.items():
+            cells = []
+            pending = []
+            try:
+                for position in positions:
+                    change = changes[position]
+                    row_number = self._find_report_row(sheet_name, change['report_id'])
+                    if row_number is None:
+                        results[position]['error'] = 'Report not found'
+                        continue
+                    
+                    fields = {header: change[key] for key, header in BULK_UPDATE_FIELDS.items() if key in change}
+                    if not fields:
+                        results[position]['error'] = 'No fields to update'
+                        continue
+                    
+                    columns = {header: self._get_column(sheet_name, header) for header in fields}
+                    missing = [header for header, column in columns.items() if column is None]
+                    if missing:
+                        results[position]['error'] = f"Sheet has no {', '.join(missing)} column"
+                        continue
+                    
+                    cells.extend(
+                        (row_number, columns[header], '' if value is None else str(value))
+                        for header, value in fields.items()
+                    )
+                    pending.append(position)
+                
+                if cells:
+                    self.scheduler.write(self.worksheets[sheet_name].batch_update, [
+                        {'range': gspread.utils.rowcol_to_a1(row, column), 'values': [[value]]}
+                        for row, column, value in cells
+                    ])
+                    self._cells_written(sheet_name, cells)
+                
+                for position in pending:
+                    results[position]['success'] = True
+                    
+            except Exception as e:
+                current_app.logger.error(f"Failed to batch update reports in {sheet_name}: {e}")
+                for position in pending:
+                    results[position]['error'] = 'Google Sheets update failed'
+        
+        return results
+    
     def get_spreadsheet_url(self) -> Optional[str]:
         """Get the URL of the Google Spreadsheet"""
         if self.spreadsheet:
@@ -665,15 +1291,95 @@ class GoogleSheetsService:
         return None
 
 
+def build_adverse_reaction_row(report_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map submitted adverse reaction fields onto the adverse_reactions sheet headers"""
+    # Prepare row data with proper mapping
+    row_data = {
+        'Timestamp': datetime.now().isoformat(),
+        'ID': report_data.get('id', ''),
+        'Patient Age': report_data.get('patient_age', ''),
+        'Patient Gender': report_data.get('patient_gender', ''),
+        'Patient Weight': report_data.get('patient_weight', ''),
+        'Drug Name': report_data.get('drug_name', ''),
+        'Drug Manufacturer': report_data.get('drug_manufacturer', ''),
+        'Drug Batch Number': report_data.get('drug_batch_number', ''),
+        'Drug Dosage': report_data.get('drug_dosage', ''),
+        'Drug Route': report_data.get('drug_route', ''),
+        'Drug Indication': report_data.get('drug_indication', ''),
+        'Reaction Description': report_data.get('reaction_description', ''),
+        'Reaction Severity': report_data.get('reaction_severity', ''),
+        'Reaction Start Date': report_data.get('reaction_start_date', ''),
+        'Reaction End Date': report_data.get('reaction_end_date', ''),
+        'Reaction Outcome': report_data.get('reaction_outcome', ''),
+        'Reporter Name': report_data.get('reporter_name', ''),
+        'Reporter Phone': report_data.get('reporter_phone', ''),
+        'Reporter Email': report_data.get('reporter_email', ''),
+        'Reporter Type': report_data.get('reporter_type', ''),
+        'Governorate': report_data.get('governorate', ''),
+        'City': report_data.get('city', ''),
+        'Pharmacy Name': report_data.get('pharmacy_name', ''),
+        'Pharmacy Address': report_data.get('pharmacy_address', ''),
+        'Concomitant Drugs': report_data.get('concomitant_drugs', ''),
+        'Medical History': report_data.get('medical_history', ''),
+        'Status': report_data.get('status', 'pending'),
+        'Priority': report_data.get('priority', 'normal'),
+        'Assigned To': report_data.get('assigned_to', ''),
+        'Follow Up Required': report_data.get('follow_up_required', False),
+        'Notes': ''
+    }
+    
+    return row_data
+
+
+def build_intruder_report_row(report_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map submitted intruder report fields onto the intruder_reports sheet headers"""
+    # Prepare row data with proper mapping
+    row_data = {
+        'Timestamp': datetime.now().isoformat(),
+        'ID': report_data.get('id', ''),
+        'Governorate': report_data.get('governorate', ''),
+        'Pharmacy Name': report_data.get('pharmacy_name', ''),
+        'Pharmacy Address': report_data.get('pharmacy_address', ''),
+        'Pharmacy License': report_data.get('pharmacy_license', ''),
+        'Intruder Name': report_data.get('intruder_name', ''),
+        'Intruder Role': report_data.get('intruder_role', ''),
+        'Intruder Real Job': report_data.get('intruder_real_job', ''),
+        'Intruder Residence': report_data.get('intruder_residence', ''),
+        'Intruder ID Number': report_data.get('intruder_id_number', ''),
+        'Problem Description': report_data.get('problem_description', ''),
+        'Evidence Description': report_data.get('evidence_description', ''),
+        'Reporter Name': report_data.get('reporter_name', ''),
+        'Reporter Phone': report_data.get('reporter_phone', ''),
+        'Reporter Email': report_data.get('reporter_email', ''),
+        'Reporter Anonymous': report_data.get('reporter_anonymous', False),
+        'Status': report_data.get('status', 'pending'),
+        'Confirmed': report_data.get('confirmed', False),
+        'Priority': report_data.get('priority', 'normal'),
+        'Assigned To': report_data.get('assigned_to', ''),
+        'Notes': ''
+    }
+    
+    return row_data
+
+
 # Create a global instance that will be initialized when Flask app starts
 sheets_service = None
 
-def init_sheets_service():
-    """Initialize the global sheets service instance"""
+def init_sheets_service(connect: bool = True):
+    """Initialize the global sheets service instance.
+    
+    With connect=False the instance is published unconnected and reports
+    itself unavailable until GoogleSheetsService.connect() completes.
+    """
     global sheets_service
-    sheets_service = GoogleSheetsService()
+    sheets_service = GoogleSheetsService(connect=connect)
     return sheets_service
 
+def reset_sheets_service():
+    """Drop the global instance so a forked worker builds its own HTTP client"""
+    global sheets_service
+    sheets_service = None
+
 def get_sheets_service():
     """Get the global sheets service instance"""
     global sheets_service
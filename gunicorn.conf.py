@@ -0,0 +1,35 @@
+"""
+Gunicorn configuration for Pharmacovigilance Iraq Platform
+Loads the application once in the master (--preload), creates the database
+tables before any worker exists, and warms each worker up in the background
+right after it is forked.
+"""
+
+preload_app = True
+
+
+def when_ready(server):
+    from app import app
+    from extensions import db
+    from startup import initialize_database
+    
+    # Done once here so workers booting together do not race on CREATE TABLE;
+    # the flag is inherited by every forked worker, whose warm-up then skips it
+    with app.app_context():
+        try:
+            initialize_database(app)
+            app._database_initialized = True
+        except Exception as e:
+            server.log.error(f"Database initialization failed: {e}")
+        finally:
+            db.session.remove()
+            db.engine.dispose()
+
+
+def post_fork(server, worker):
+    from app import app
+    from startup import reset_after_fork, start_warm_up
+    
+    reset_after_fork(app)
+    start_warm_up(app)
+    server.log.info(f"Worker {worker.pid} warm-up started")
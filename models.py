@@ -64,6 +64,13 @@ class SystemLog(db.Model):
     
     user = db.relationship('User', backref='system_logs')
     
+    # /auth/activity-logs lists newest first, optionally for one user or action
+    __table_args__ = (
+        db.Index('ix_system_logs_timestamp', 'timestamp'),
+        db.Index('ix_system_logs_user_id_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_system_logs_action_timestamp', 'action', 'timestamp'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -93,6 +100,11 @@ class FAQ(db.Model):
     created_date = db.Column(db.DateTime, default=datetime.utcnow)
     updated_date = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_faqs_is_active_category', 'is_active', 'category'),
+        db.Index('ix_faqs_created_date', 'created_date'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -131,6 +143,13 @@ class DrugAlert(db.Model):
     
     creator = db.relationship('User', backref='created_alerts')
     
+    __table_args__ = (
+        db.Index('ix_drug_alerts_is_active_created_date', 'is_active', 'created_date'),
+        db.Index('ix_drug_alerts_drug_name', 'drug_name'),
+        db.Index('ix_drug_alerts_severity', 'severity'),
+        db.Index('ix_drug_alerts_expiry_date', 'expiry_date'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -171,6 +190,11 @@ class EducationalContent(db.Model):
     
     creator = db.relationship('User', backref='created_content')
     
+    __table_args__ = (
+        db.Index('ix_educational_content_is_active_category', 'is_active', 'category'),
+        db.Index('ix_educational_content_created_date', 'created_date'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -187,3 +211,173 @@ class EducationalContent(db.Model):
             'updated_date': self.updated_date.isoformat() if self.updated_date else None,
             'created_by': self.created_by
         }
+
+class ReportOutbox(db.Model):
+    """Reports accepted from the forms and waiting to be appended to Google Sheets"""
+    __tablename__ = 'report_outbox'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    report_id = db.Column(db.String(40), unique=True, nullable=False)
+    sheet_name = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON row keyed by sheet header
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_date = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_date = db.Column(db.DateTime)
+    fingerprint = db.Column(db.String(64))  # resubmission fingerprint, see report_dedup
+    duplicate_of = db.Column(db.String(40))  # report ID this one was flagged as a duplicate of
+    
+    __table_args__ = (
+        db.Index('ix_report_outbox_sheet_status_id', 'sheet_name', 'status', 'id'),
+        db.Index('ix_report_outbox_fingerprint', 'fingerprint'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'report_id': self.report_id,
+            'sheet_name': self.sheet_name,
+            'status': self.status,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'created_date': self.created_date.isoformat() if self.created_date else None,
+            'sent_date': self.sent_date.isoformat() if self.sent_date else None,
+            'duplicate_of': self.duplicate_of
+        }
+
+class AdverseReaction(db.Model):
+    """PostgreSQL mirror of the adverse_reactions worksheet (Google Sheets stays the source of truth)"""
+    __tablename__ = 'adverse_reactions'
+    
+    # Sheet cells hold unbounded form and hand-entered text, so the mirrored
+    # columns are TEXT: one overlong value must not fail a whole sync batch
+    id = db.Column(db.Integer, primary_key=True)
+    sheet_row = db.Column(db.Integer, unique=True, nullable=False)
+    report_id = db.Column(db.Text, index=True)
+    timestamp = db.Column(db.DateTime, index=True)
+    patient_age = db.Column(db.Text)
+    patient_gender = db.Column(db.Text)
+    patient_weight = db.Column(db.Text)
+    drug_name = db.Column(db.Text)
+    drug_manufacturer = db.Column(db.Text)
+    drug_batch_number = db.Column(db.Text)
+    drug_dosage = db.Column(db.Text)
+    drug_route = db.Column(db.Text)
+    drug_indication = db.Column(db.Text)
+    reaction_description = db.Column(db.Text)
+    reaction_severity = db.Column(db.Text)
+    reaction_start_date = db.Column(db.Text)
+    reaction_end_date = db.Column(db.Text)
+    reaction_outcome = db.Column(db.Text)
+    reporter_name = db.Column(db.Text)
+    reporter_phone = db.Column(db.Text)
+    reporter_email = db.Column(db.Text)
+    reporter_type = db.Column(db.Text)
+    governorate = db.Column(db.Text)
+    city = db.Column(db.Text)
+    pharmacy_name = db.Column(db.Text)
+    pharmacy_address = db.Column(db.Text)
+    concomitant_drugs = db.Column(db.Text)
+    medical_history = db.Column(db.Text)
+    status = db.Column(db.Text)
+    priority = db.Column(db.Text)
+    assigned_to = db.Column(db.Text)
+    follow_up_required = db.Column(db.Text)
+    notes = db.Column(db.Text)
+    synced_date = db.Column(db.DateTime, default=datetime.utcnow)
+
+class IntruderReport(db.Model):
+    """PostgreSQL mirror of the intruder_reports worksheet (Google Sheets stays the source of truth)"""
+    __tablename__ = 'intruder_reports'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    sheet_row = db.Column(db.Integer, unique=True, nullable=False)
+    report_id = db.Column(db.Text, index=True)
+    timestamp = db.Column(db.DateTime, index=True)
+    governorate = db.Column(db.Text)
+    pharmacy_name = db.Column(db.Text)
+    pharmacy_address = db.Column(db.Text)
+    pharmacy_license = db.Column(db.Text)
+    intruder_name = db.Column(db.Text)
+    intruder_role = db.Column(db.Text)
+    intruder_real_job = db.Column(db.Text)
+    intruder_residence = db.Column(db.Text)
+    intruder_id_number = db.Column(db.Text)
+    problem_description = db.Column(db.Text)
+    evidence_description = db.Column(db.Text)
+    reporter_name = db.Column(db.Text)
+    reporter_phone = db.Column(db.Text)
+    reporter_email = db.Column(db.Text)
+    reporter_anonymous = db.Column(db.Text)
+    status = db.Column(db.Text)
+    confirmed = db.Column(db.Text)
+    priority = db.Column(db.Text)
+    assigned_to = db.Column(db.Text)
+    notes = db.Column(db.Text)
+    synced_date = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Case-insensitive filter indexes; the report filters compare lower(column).
+# drug_name has none: its filter is a substring LIKE, which a btree cannot serve
+db.Index('ix_adverse_reactions_status', db.func.lower(AdverseReaction.status))
+db.Index('ix_adverse_reactions_governorate', db.func.lower(AdverseReaction.governorate))
+db.Index('ix_adverse_reactions_severity', db.func.lower(AdverseReaction.reaction_severity))
+db.Index('ix_intruder_reports_status', db.func.lower(IntruderReport.status))
+db.Index('ix_intruder_reports_governorate', db.func.lower(IntruderReport.governorate))
+db.Index('ix_intruder_reports_confirmed', db.func.lower(IntruderReport.confirmed))
+
+class SheetSyncState(db.Model):
+    """Progress of the worksheet-to-PostgreSQL mirror, one row per worksheet"""
+    __tablename__ = 'sheet_sync_state'
+    
+    sheet_name = db.Column(db.String(50), primary_key=True)
+    last_row = db.Column(db.Integer, nullable=False, default=1)  # last mirrored sheet row (1 = header)
+    last_sync = db.Column(db.DateTime)
+    last_full_sync = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'sheet_name': self.sheet_name,
+            'last_row': self.last_row,
+            'last_sync': self.last_sync.isoformat() if self.last_sync else None,
+            'last_full_sync': self.last_full_sync.isoformat() if self.last_full_sync else None
+        }
+
+class ReportRollup(db.Model):
+    """Report counts per day, governorate, drug, severity and status, kept current on ingest and status change"""
+    __tablename__ = 'report_rollups'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    sheet_name = db.Column(db.String(50), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    governorate = db.Column(db.String(100), nullable=False, default='')
+    drug = db.Column(db.String(200), nullable=False, default='')
+    severity = db.Column(db.String(50), nullable=False, default='')
+    status = db.Column(db.String(50), nullable=False, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.UniqueConstraint('sheet_name', 'day', 'governorate', 'drug', 'severity', 'status',
+                            name='uq_report_rollups_key'),
+    )
+
+class ReportRollupKey(db.Model):
+    """The rollup bucket each report is counted in, so a status change can move it"""
+    __tablename__ = 'report_rollup_keys'
+    
+    report_id = db.Column(db.String(40), primary_key=True)
+    sheet_name = db.Column(db.String(50), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    governorate = db.Column(db.String(100), nullable=False, default='')
+    drug = db.Column(db.String(200), nullable=False, default='')
+    severity = db.Column(db.String(50), nullable=False, default='')
+    status = db.Column(db.String(50), nullable=False, default='')
+
+class RollupState(db.Model):
+    """When the rollups of a worksheet were last rebuilt from the sheet"""
+    __tablename__ = 'rollup_state'
+    
+    sheet_name = db.Column(db.String(50), primary_key=True)
+    built_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,110 @@
+"""
+Report Dedup Module
+Catches reports resubmitted by the public form before they reach the sheet.
+Each report that names its reporter gets a fingerprint of its normalized
+drug name, batch number, reaction text, reporter name and phone plus a time
+bucket; the fingerprint is stored on the outbox row and looked up through an
+index, so the check is one indexed query per submission however large the
+sheet grows.
+"""
+
+import hashlib
+import re
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from models import ReportOutbox
+
+# Values accepted by the DUPLICATE_REPORT_ACTION setting
+DUPLICATE_ACTIONS = ['merge', 'flag', 'off']
+
+# Sheet columns that identify a resubmission, per worksheet
+FINGERPRINT_FIELDS = {
+    'adverse_reactions': ['Drug Name', 'Drug Batch Number', 'Reaction Description', 'Reporter Name', 'Reporter Phone']
+}
+
+# Only a report naming its reporter can be a resubmission; two anonymous reports
+# of the same reaction to the same drug come from different people as often as not
+IDENTIFYING_FIELDS = ['Reporter Phone', 'Reporter Name']
+
+NON_WORD = re.compile(r'[\W_]+')
+
+# Local and international forms of an Iraqi mobile number share their last 10 digits
+PHONE_DIGITS = 10
+
+
+def normalize_text(value: Any) -> str:
+    """Lowercase words without punctuation, Arabic diacritics or repeated whitespace"""
+    text = unicodedata.normalize('NFKC', str(value or '')).lower()
+    text = ''.join(char for char in unicodedata.normalize('NFD', text) if unicodedata.category(char) != 'Mn')
+    return ' '.join(NON_WORD.sub(' ', text).split())
+
+
+def normalize_phone(value: Any) -> str:
+    """Trailing digits of a phone number (Arabic-Indic digits included)"""
+    digits = ''.join(str(unicodedata.digit(char)) for char in str(value or '') if char.isdigit())
+    return digits[-PHONE_DIGITS:]
+
+
+def report_fingerprint(sheet_name: str, row_data: Dict[str, Any], bucket: int) -> Optional[str]:
+    """SHA-256 fingerprint of a sheet row within one time bucket.
+
+    None for sheets without dedup and for reports without a reporter phone or
+    name, which are never treated as duplicates.
+    """
+    fields = FINGERPRINT_FIELDS.get(sheet_name)
+    if not fields:
+        return None
+    if not any(normalize_text(row_data.get(field, '')) for field in IDENTIFYING_FIELDS):
+        return None
+
+    parts = [sheet_name, str(bucket)]
+    for field in fields:
+        value = row_data.get(field, '')
+        if field == 'Reporter Phone':
+            parts.append(normalize_phone(value))
+        elif field == 'Drug Batch Number':
+            # Batch codes are retyped with or without separators: B-123, b 123, B123
+            parts.append(normalize_text(value).replace(' ', ''))
+        else:
+            parts.append(normalize_text(value))
+    return hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+
+
+def time_bucket(moment: datetime, window: float) -> int:
+    return int(moment.timestamp() // window)
+
+
+def find_duplicate(sheet_name: str, row_data: Dict[str, Any], window: float,
+                   now: Optional[datetime] = None) -> Tuple[Optional[str], Optional[ReportOutbox]]:
+    """Fingerprint of a new report and the earlier submission it duplicates, if any.
+
+    A duplicate is a report from the same reporter (phone and name) with
+    the same fingerprint submitted less than window seconds ago. Looking up
+    the current and previous bucket and then checking the submission time
+    gives an exact sliding window, not one that resets at bucket boundaries.
+    """
+    now = now or datetime.utcnow()
+    bucket = time_bucket(now, window)
+    fingerprint = report_fingerprint(sheet_name, row_data, bucket)
+    if fingerprint is None:
+        return None, None
+
+    candidates = [fingerprint, report_fingerprint(sheet_name, row_data, bucket - 1)]
+    original = (
+        ReportOutbox.query
+        .filter(ReportOutbox.fingerprint.in_(candidates))
+        .filter(ReportOutbox.created_date >= now - timedelta(seconds=window))
+        .filter(ReportOutbox.duplicate_of.is_(None))
+        .order_by(ReportOutbox.id)
+        .first()
+    )
+    return fingerprint, original
+
+
+def flag_duplicate(row_data: Dict[str, Any], original_id: str):
+    """Mark a sheet row as a possible resubmission of another report in its Notes"""
+    note = f'Possible duplicate of {original_id}'
+    notes = row_data.get('Notes')
+    row_data['Notes'] = f'{note}. {notes}' if notes else note
@@ -0,0 +1,182 @@
+"""
+Report Export Module
+Streaming CSV and XLSX writers for handing complete report datasets to the
+ministry. Both take an iterator of rows and yield the file in pieces, so an
+export holds one chunk of rows in memory regardless of its size.
+"""
+
+import csv
+import io
+import re
+import zipfile
+from typing import Iterable, Iterator, List
+from xml.sax.saxutils import escape
+
+# ?format= values of /pharma/export and their response types
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+}
+
+# Rows written between yields
+ROWS_PER_PIECE = 500
+
+# Leading characters that make a spreadsheet program read a cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Characters XML 1.0 does not allow, even escaped
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{title}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+
+XLSX_SHEET_END = '</sheetData></worksheet>'
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only, non-seekable sink whose contents are taken out piece by piece"""
+
+    def __init__(self):
+        super().__init__()
+        self._pieces: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._pieces.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b''.join(self._pieces)
+        self._pieces = []
+        return data
+
+
+def safe_cell(value) -> str:
+    """CSV cell text that cannot run as a formula when the file is opened in a spreadsheet.
+
+    Free text from the public form starting with =, +, -, @, tab or CR gets a
+    leading apostrophe, which spreadsheet programs show as text. XLSX cells
+    are written as inline strings, which are never evaluated, so they keep
+    their values as they are.
+    """
+    text = str(value) if value is not None else ''
+    return "'" + text if text.startswith(FORMULA_PREFIXES) else text
+
+
+def _pieces(rows: Iterable[List[str]]) -> Iterator[List[List[str]]]:
+    """Group rows into lists of ROWS_PER_PIECE"""
+    piece = []
+    for row in rows:
+        piece.append(row)
+        if len(piece) >= ROWS_PER_PIECE:
+            yield piece
+            piece = []
+    if piece:
+        yield piece
+
+
+def csv_stream(headers: List[str], rows: Iterable[List[str]]) -> Iterator[str]:
+    """CSV file in pieces; starts with a BOM so spreadsheet programs read the Arabic text as UTF-8"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(headers)
+    yield buffer.getvalue()
+
+    for piece in _pieces(rows):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([safe_cell(value) for value in row] for row in piece)
+        yield buffer.getvalue()
+
+
+def _column_letter(index: int) -> str:
+    """Spreadsheet column letters of a 0-based column index (0 -> A, 26 -> AA)"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def _xlsx_row(row_number: int, values: List[str], letters: List[str]) -> str:
+    """One <row> of inline-string cells; inline strings need no shared string table held in memory"""
+    cells = []
+    for letter, value in zip(letters, values):
+        if value:
+            text = escape(INVALID_XML_CHARS.sub('', value))
+            cells.append(f'<c r="{letter}{row_number}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row r="{row_number}">{"".join(cells)}</row>'
+
+
+def xlsx_stream(headers: List[str], rows: Iterable[List[str]], title: str = 'Reports') -> Iterator[bytes]:
+    """Single-sheet XLSX workbook in pieces.
+
+    The zip is written to a non-seekable buffer, so zipfile uses data
+    descriptors instead of seeking back to patch sizes, and the sheet XML is
+    deflated row block by row block as it is produced.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', XLSX_ROOT_RELS)
+        archive.writestr('xl/workbook.xml', XLSX_WORKBOOK.format(title=escape(title[:31], {'"': '&quot;'})))
+        archive.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS)
+        yield buffer.take()
+
+        letters = [_column_letter(index) for index in range(len(headers))]
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((XLSX_SHEET_START + _xlsx_row(1, headers, letters)).encode())
+            row_number = 1
+            for piece in _pieces(rows):
+                xml = []
+                for values in piece:
+                    row_number += 1
+                    xml.append(_xlsx_row(row_number, values, letters))
+                sheet.write(''.join(xml).encode())
+                yield buffer.take()
+            sheet.write(XLSX_SHEET_END.encode())
+    yield buffer.take()
@@ -0,0 +1,130 @@
+"""
+Report Listing Module
+Cursor pagination, field projection and NDJSON streaming shared by the
+/pharma report listing endpoints
+"""
+
+import base64
+import json
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from flask import Response, jsonify, stream_with_context
+
+# Largest page a client may request with ?limit=
+MAX_LISTING_LIMIT = 1000
+
+
+def encode_cursor(key: List[Any]) -> str:
+    """Opaque cursor continuing a listing after the record with this sort key"""
+    return base64.urlsafe_b64encode(json.dumps({'k': key}).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[List[Any]]:
+    """Sort key a cursor continues after, None to start at the top; raises ValueError for malformed cursors.
+
+    A key is [value, sheet row] of the last record returned: its sort value
+    (the worksheet title for listings in sheet order, None when empty) and
+    the sheet row breaking ties.
+    """
+    if not cursor:
+        return None
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))['k']
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if (
+        not isinstance(key, list) or len(key) != 2
+        or not (key[0] is None or isinstance(key[0], str))
+        or not isinstance(key[1], int) or isinstance(key[1], bool) or key[1] < 2
+    ):
+        raise ValueError('Invalid cursor')
+    return key
+
+
+def parse_date_range(args) -> Tuple[Optional[date], Optional[date]]:
+    """date_from/date_to query arguments (YYYY-MM-DD, inclusive); raises ValueError when malformed"""
+    bounds = []
+    for name in ('date_from', 'date_to'):
+        value = args.get(name)
+        try:
+            bounds.append(date.fromisoformat(value) if value else None)
+        except ValueError:
+            raise ValueError(f'Invalid {name}, expected YYYY-MM-DD')
+    return bounds[0], bounds[1]
+
+
+def project(record: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Keep only the requested columns of a record"""
+    if not fields:
+        return record
+    return {field: record.get(field, '') for field in fields}
+
+
+class ListingOptions:
+    """Pagination, projection and streaming options parsed from the query string"""
+
+    def __init__(self, limit: Optional[int] = None, after: Optional[List[Any]] = None,
+                 fields: Optional[List[str]] = None, stream: bool = False):
+        self.limit = limit
+        self.after = after
+        self.fields = fields
+        self.stream = stream
+
+    @classmethod
+    def from_request(cls, request) -> 'ListingOptions':
+        """Read limit, cursor, fields and format=ndjson (or Accept: application/x-ndjson)"""
+        limit = request.args.get('limit', type=int)
+        if limit is not None:
+            limit = max(1, min(limit, MAX_LISTING_LIMIT))
+
+        fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+        stream = (
+            request.args.get('format') == 'ndjson'
+            or 'application/x-ndjson' in request.headers.get('Accept', '')
+        )
+        return cls(limit, decode_cursor(request.args.get('cursor')), fields or None, stream)
+
+
+def _ndjson(records: Iterable[Dict[str, Any]], fields: Optional[List[str]]):
+    for record in records:
+        yield json.dumps(project(record, fields), ensure_ascii=False) + '\n'
+
+
+def listing_response(options: ListingOptions,
+                     fetch: Callable[[Optional[List[Any]], Optional[int]], Iterable[Tuple[List[Any], Dict[str, Any]]]]):
+    """Build the listing response.
+
+    ``fetch(after, count)`` yields (key, record) pairs in listing order,
+    starting with the first record whose sort key comes after ``after`` (from
+    the top when None); ``count`` is None for "all remaining". The next cursor
+    holds the key of the last record returned rather than a position, so
+    reports submitted while a client pages through neither repeat nor skip
+    records. Without ?limit the response is the plain list the endpoints
+    always returned (or an unbounded NDJSON stream). With ?limit one extra
+    record is fetched to decide whether a next cursor exists.
+    """
+    if options.limit is None:
+        records = (record for _, record in fetch(options.after, None))
+        if options.stream:
+            return Response(stream_with_context(_ndjson(records, options.fields)), mimetype='application/x-ndjson')
+        return jsonify([project(record, options.fields) for record in records])
+
+    entries = list(fetch(options.after, options.limit + 1))
+    has_more = len(entries) > options.limit
+    entries = entries[:options.limit]
+    page = [record for _, record in entries]
+    next_cursor = encode_cursor(entries[-1][0]) if has_more else None
+
+    if options.stream:
+        response = Response(_ndjson(page, options.fields), mimetype='application/x-ndjson')
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+
+    return jsonify({
+        'reports': [project(record, options.fields) for record in page],
+        'next_cursor': next_cursor,
+        'limit': options.limit
+    })
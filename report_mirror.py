@@ -0,0 +1,305 @@
+"""
+Report Mirror Module
+Mirrors the adverse_reactions and intruder_reports worksheets into PostgreSQL
+so the /pharma read endpoints can filter, sort and paginate in SQL instead of
+downloading the sheet on every call. Google Sheets remains the source of truth.
+"""
+
+import operator
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import AdverseReaction, IntruderReport, SheetSyncState
+from google_sheets_service import WORKSHEET_HEADERS, CONFIRMED_VALUES, get_sheets_service
+
+MIRROR_MODELS = {
+    'adverse_reactions': AdverseReaction,
+    'intruder_reports': IntruderReport
+}
+
+# Columns the listing endpoints may sort by
+SORTABLE_COLUMNS = {
+    'adverse_reactions': ['timestamp', 'drug_name', 'reaction_severity', 'governorate', 'status', 'priority'],
+    'intruder_reports': ['timestamp', 'governorate', 'pharmacy_name', 'status', 'priority']
+}
+
+
+def sheet_attribute(header: str) -> str:
+    """Model attribute mirroring a sheet header, e.g. 'Drug Name' -> 'drug_name'"""
+    if header == 'ID':
+        return 'report_id'
+    return header.strip().lower().replace(' ', '_')
+
+
+def _parse_timestamp(value: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def row_to_mapping(model, headers: List[str], row: List[str], sheet_row: int) -> Optional[Dict[str, Any]]:
+    """Convert a raw sheet row to column values of a mirror model; None for blank rows"""
+    if not any(cell.strip() for cell in row if cell):
+        return None
+
+    columns = model.__table__.columns
+    mapping = {'sheet_row': sheet_row, 'synced_date': datetime.utcnow()}
+    for header, value in zip(headers, row):
+        attribute = sheet_attribute(header)
+        if attribute == 'timestamp':
+            mapping[attribute] = _parse_timestamp(value.strip())
+        elif attribute in columns and attribute not in ('id', 'sheet_row', 'synced_date'):
+            mapping[attribute] = value.strip()
+    return mapping
+
+
+def to_sheet_record(report, sheet_name: str) -> Dict[str, Any]:
+    """Serialize a mirrored report with the sheet headers as keys, like the Sheets-backed endpoints"""
+    record = {}
+    for header in WORKSHEET_HEADERS[sheet_name]:
+        value = getattr(report, sheet_attribute(header), None)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        record[header] = value if value is not None else ''
+    return record
+
+
+def is_mirror_ready(sheet_name: str) -> bool:
+    """True once a worksheet has completed at least one full sync"""
+    state = db.session.get(SheetSyncState, sheet_name)
+    return state is not None and state.last_full_sync is not None
+
+
+def query_reports(sheet_name: str, filters: Dict[str, Any]):
+    """Build a filtered and sorted query over a mirror table using the listing filter names"""
+    model = MIRROR_MODELS[sheet_name]
+    query = model.query
+
+    if filters.get('status'):
+        query = query.filter(db.func.lower(model.status) == filters['status'].lower())
+
+    if filters.get('governorate'):
+        query = query.filter(db.func.lower(model.governorate) == filters['governorate'].lower())
+
+    if sheet_name == 'adverse_reactions':
+        if filters.get('severity'):
+            query = query.filter(db.func.lower(model.reaction_severity) == filters['severity'].lower())
+        if filters.get('drug_name'):
+            pattern = f"%{filters['drug_name'].lower()}%"
+            query = query.filter(db.func.lower(model.drug_name).like(pattern))
+
+    if sheet_name == 'intruder_reports' and filters.get('confirmed_only'):
+        query = query.filter(db.func.lower(model.confirmed).in_(CONFIRMED_VALUES))
+
+    if filters.get('date_from'):
+        query = query.filter(model.timestamp >= datetime.combine(filters['date_from'], datetime.min.time()))
+    if filters.get('date_to'):
+        query = query.filter(model.timestamp < datetime.combine(filters['date_to'] + timedelta(days=1), datetime.min.time()))
+
+    column, ascending = _sort_column(sheet_name, filters)
+    if ascending:
+        return query.order_by(column.asc(), model.sheet_row.asc())
+    return query.order_by(column.desc(), model.sheet_row.desc())
+
+
+def _sort_column(sheet_name: str, filters: Dict[str, Any]):
+    """(column, ascending) a query_reports listing is ordered by, before the sheet row"""
+    sort = filters.get('sort', 'timestamp')
+    if sort not in SORTABLE_COLUMNS[sheet_name]:
+        sort = 'timestamp'
+    return getattr(MIRROR_MODELS[sheet_name], sort), filters.get('order', 'desc').lower() == 'asc'
+
+
+def listing_key(report, sheet_name: str, filters: Dict[str, Any]) -> List[Any]:
+    """Cursor key of a report in a query_reports listing: its sort value and sheet row"""
+    column, _ = _sort_column(sheet_name, filters)
+    value = getattr(report, column.key)
+    return [value.isoformat() if isinstance(value, datetime) else value, report.sheet_row]
+
+
+def reports_after(query, sheet_name: str, filters: Dict[str, Any], key: List[Any]) -> List[Any]:
+    """Queries reading, one after the other, the rest of a query_reports listing past the report with this cursor key.
+
+    Each query is a single range of the sort column, so its index is read
+    from the cursor on instead of everything before it being sorted again.
+    Reports without a sort value form their own range where the database's
+    default NULL order puts them: first in a descending PostgreSQL listing,
+    last in SQLite. Raises ValueError for a key that does not fit the column.
+    """
+    model = MIRROR_MODELS[sheet_name]
+    column, ascending = _sort_column(sheet_name, filters)
+    value, sheet_row = key
+    if value is not None and isinstance(column.type, db.DateTime):
+        value = datetime.fromisoformat(value)
+
+    beyond, reaching = (operator.gt, operator.ge) if ascending else (operator.lt, operator.le)
+    nulls_first = (db.session.get_bind().dialect.name == 'postgresql') != ascending
+    empty = query.filter(column.is_(None))
+    if value is None:
+        segments = [empty.filter(beyond(model.sheet_row, sheet_row))]
+        if nulls_first:
+            segments.append(query.filter(column.isnot(None)))
+        return segments
+
+    segments = [query.filter(reaching(column, value), db.or_(column != value, beyond(model.sheet_row, sheet_row)))]
+    if not nulls_first:
+        segments.append(empty)
+    return segments
+
+
+def apply_report_update(sheet_name: str, report_id: str, changes: Dict[str, Any]):
+    """Apply a status/assignment change made through the API to the mirror right away"""
+    model = MIRROR_MODELS.get(sheet_name)
+    if model is None or not changes:
+        return
+    values = {sheet_attribute(header): value for header, value in changes.items()}
+    model.query.filter_by(report_id=str(report_id)).update(values, synchronize_session=False)
+    db.session.commit()
+
+
+class ReportMirrorSync:
+    """Background thread that keeps the mirror tables in step with the worksheets.
+
+    Each cycle reads only the rows appended since the last cycle. Every
+    ``full_sync_interval`` seconds the table is rebuilt from a snapshot so edits
+    made directly in the sheet (status changes, deleted rows) are picked up.
+    """
+
+    def __init__(self, app, interval: float = 60.0, full_sync_interval: float = 3600.0):
+        self.app = app
+        self.interval = interval
+        self.full_sync_interval = full_sync_interval
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the sync thread if it is not already running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='report-mirror-sync', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Ask the sync thread to exit after the current cycle"""
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def wake(self):
+        """Run a sync cycle as soon as possible"""
+        self._wake_event.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            with self.app.app_context():
+                try:
+                    self.sync_once()
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.error(f"Report mirror sync failed: {e}")
+                finally:
+                    db.session.remove()
+
+            self._wake_event.wait(self.interval)
+            self._wake_event.clear()
+
+    def sync_once(self) -> Dict[str, int]:
+        """Sync every mirrored worksheet; returns rows written per worksheet"""
+        return {sheet_name: self.sync_sheet(sheet_name) for sheet_name in MIRROR_MODELS}
+
+    def sync_sheet(self, sheet_name: str, full: bool = False) -> int:
+        """Sync one worksheet, incrementally unless a full rebuild is due"""
+        sheets_service = get_sheets_service()
+        if not sheets_service.is_available() or sheet_name not in sheets_service.worksheets:
+            return 0
+
+        # The locked state row serializes syncs of this worksheet across workers
+        state = self._lock_state(sheet_name)
+        now = datetime.utcnow()
+        full_due = (
+            state.last_full_sync is None
+            or now - state.last_full_sync > timedelta(seconds=self.full_sync_interval)
+        )
+
+        if full or full_due:
+            written = self._full_sync(sheets_service, sheet_name, state)
+            state.last_full_sync = now
+        else:
+            written = self._incremental_sync(sheets_service, sheet_name, state)
+
+        state.last_sync = now
+        db.session.commit()
+        return written
+
+    def _lock_state(self, sheet_name: str) -> SheetSyncState:
+        state = SheetSyncState.query.filter_by(sheet_name=sheet_name).with_for_update().first()
+        if state is not None:
+            return state
+
+        try:
+            db.session.add(SheetSyncState(sheet_name=sheet_name, last_row=1))
+            db.session.commit()
+        except IntegrityError:
+            # Another worker created it first
+            db.session.rollback()
+        return SheetSyncState.query.filter_by(sheet_name=sheet_name).with_for_update().one()
+
+    def _full_sync(self, sheets_service, sheet_name: str, state: SheetSyncState) -> int:
+        model = MIRROR_MODELS[sheet_name]
+        snapshot = sheets_service.get_snapshot(sheet_name)
+        if snapshot is None:
+            return 0
+
+        mappings = []
+        for sheet_row, row in enumerate(snapshot.rows, start=2):
+            mapping = row_to_mapping(model, snapshot.headers, row, sheet_row)
+            if mapping:
+                mappings.append(mapping)
+
+        model.query.delete(synchronize_session=False)
+        if mappings:
+            db.session.execute(db.insert(model), mappings)
+        state.last_row = len(snapshot.rows) + 1
+        self.app.logger.info(f"Report mirror: rebuilt {sheet_name} with {len(mappings)} rows")
+        return len(mappings)
+
+    def _incremental_sync(self, sheets_service, sheet_name: str, state: SheetSyncState) -> int:
+        model = MIRROR_MODELS[sheet_name]
+        rows = sheets_service.read_rows(sheet_name, state.last_row + 1)
+        if not rows:
+            return 0
+
+        headers = sheets_service.headers.get(sheet_name) or WORKSHEET_HEADERS[sheet_name]
+        mappings = []
+        for sheet_row, row in enumerate(rows, start=state.last_row + 1):
+            mapping = row_to_mapping(model, headers, row, sheet_row)
+            if mapping:
+                mappings.append(mapping)
+
+        if mappings:
+            db.session.execute(db.insert(model), mappings)
+        state.last_row += len(rows)
+        return len(mappings)
+
+
+# Global sync worker, started once per worker process
+mirror_sync: Optional[ReportMirrorSync] = None
+
+
+def start_mirror_sync(app) -> ReportMirrorSync:
+    """Create and start the global mirror sync worker for this process"""
+    global mirror_sync
+    if mirror_sync is None:
+        mirror_sync = ReportMirrorSync(
+            app,
+            interval=app.config.get('REPORT_MIRROR_SYNC_INTERVAL', 60.0),
+            full_sync_interval=app.config.get('REPORT_MIRROR_FULL_SYNC_INTERVAL', 3600.0)
+        )
+    mirror_sync.start()
+    return mirror_sync
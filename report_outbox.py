@@ -0,0 +1,215 @@
+"""
+Report Outbox Module
+Write-behind queue for report submissions: reports are stored in the database
+as soon as they are submitted and a background flusher appends them to Google
+Sheets in batches, one worksheet at a time and in submission order.
+"""
+
+import json
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from extensions import db
+from models import ReportOutbox
+
+REPORT_ID_PREFIXES = {
+    'adverse_reactions': 'AR',
+    'intruder_reports': 'IR'
+}
+
+
+def generate_report_id(sheet_name: str) -> str:
+    """Generate a server-side report ID such as AR-20261017-3F9A1C2B"""
+    prefix = REPORT_ID_PREFIXES.get(sheet_name, 'RP')
+    return f"{prefix}-{datetime.utcnow().strftime('%Y%m%d')}-{uuid.uuid4().hex[:8].upper()}"
+
+
+def enqueue_report(sheet_name: str, row_data: Dict[str, Any], fingerprint: Optional[str] = None,
+                   duplicate_of: Optional[str] = None) -> ReportOutbox:
+    """Store a prepared sheet row in the outbox and wake the flusher"""
+    entry = ReportOutbox(
+        report_id=row_data['ID'],
+        sheet_name=sheet_name,
+        payload=json.dumps(row_data, default=str),
+        fingerprint=fingerprint,
+        duplicate_of=duplicate_of
+    )
+    db.session.add(entry)
+    db.session.commit()
+
+    if outbox_flusher is not None:
+        outbox_flusher.wake()
+
+    return entry
+
+
+class OutboxFlusher:
+    """Background thread that drains the report outbox into Google Sheets"""
+
+    def __init__(self, app, batch_size: int = 100, interval: float = 2.0,
+                 max_backoff: float = 300.0, retention_days: int = 7):
+        self.app = app
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.retention_days = retention_days
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the flusher thread if it is not already running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='report-outbox-flusher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Ask the flusher thread to exit after the current batch"""
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def wake(self):
+        """Flush as soon as possible instead of waiting for the next interval"""
+        self._wake_event.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            with self.app.app_context():
+                try:
+                    self.flush_once()
+                    self._purge_sent()
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.error(f"Report outbox flush failed: {e}")
+                finally:
+                    db.session.remove()
+
+            self._wake_event.wait(self.interval)
+            self._wake_event.clear()
+
+    def flush_once(self) -> int:
+        """Drain every worksheet that has pending reports; returns the number of rows sent"""
+        sheet_names = [
+            name for (name,) in db.session.query(ReportOutbox.sheet_name)
+            .filter(ReportOutbox.status == 'pending')
+            .distinct()
+            .all()
+        ]
+        db.session.commit()
+
+        sent = 0
+        for sheet_name in sheet_names:
+            while True:
+                flushed = self._flush_sheet(sheet_name)
+                sent += flushed
+                if flushed < self.batch_size:
+                    break
+        return sent
+
+    def _flush_sheet(self, sheet_name: str) -> int:
+        """Send the oldest pending batch of one worksheet in a single append_rows call"""
+        # Row locks make a second worker wait for this batch instead of
+        # appending newer reports ahead of it, which keeps the sheet in order.
+        entries = (
+            ReportOutbox.query
+            .filter_by(sheet_name=sheet_name, status='pending')
+            .order_by(ReportOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update()
+            .all()
+        )
+
+        if not entries:
+            db.session.commit()
+            return 0
+
+        now = datetime.utcnow()
+        head = entries[0]
+        if head.next_attempt_at and head.next_attempt_at > now:
+            # The oldest report is backing off; later ones must wait behind it
+            db.session.rollback()
+            return 0
+
+        from google_sheets_service import get_sheets_service
+        sheets_service = get_sheets_service()
+        rows = [json.loads(entry.payload) for entry in entries]
+
+        # Stop the batch where the target worksheet changes (e.g. at a month
+        # boundary with partitioning), so one append never spans two sheets
+        group = sheets_service.append_group(sheet_name, rows[0])
+        count = next(
+            (position for position, row in enumerate(rows) if sheets_service.append_group(sheet_name, row) != group),
+            len(rows)
+        )
+        entries, rows = entries[:count], rows[:count]
+
+        if sheets_service.is_available() and sheets_service.append_rows(sheet_name, rows):
+            for entry in entries:
+                entry.status = 'sent'
+                entry.sent_date = now
+                entry.last_error = None
+            db.session.commit()
+            return len(entries)
+
+        attempts = head.attempts + 1
+        delay = min(self.max_backoff, self.interval * (2 ** attempts))
+        for entry in entries:
+            entry.attempts = entry.attempts + 1
+            entry.next_attempt_at = now + timedelta(seconds=delay)
+            entry.last_error = 'Google Sheets append failed' if sheets_service.is_available() else 'Google Sheets service not available'
+        db.session.commit()
+        self.app.logger.warning(
+            f"Report outbox: {len(entries)} {sheet_name} reports not sent, retrying in {delay:.0f}s"
+        )
+        return 0
+
+    def _purge_sent(self):
+        """Delete delivered reports older than the retention window"""
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        ReportOutbox.query.filter(
+            ReportOutbox.status == 'sent',
+            ReportOutbox.sent_date < cutoff
+        ).delete(synchronize_session=False)
+        db.session.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return pending counts per worksheet and the age of the oldest pending report"""
+        pending = dict(
+            db.session.query(ReportOutbox.sheet_name, db.func.count(ReportOutbox.id))
+            .filter(ReportOutbox.status == 'pending')
+            .group_by(ReportOutbox.sheet_name)
+            .all()
+        )
+        oldest = (
+            db.session.query(db.func.min(ReportOutbox.created_date))
+            .filter(ReportOutbox.status == 'pending')
+            .scalar()
+        )
+        return {
+            'pending': pending,
+            'oldest_pending_seconds': (datetime.utcnow() - oldest).total_seconds() if oldest else 0,
+            'running': self._thread is not None and self._thread.is_alive()
+        }
+
+
+# Global flusher, started once per worker process
+outbox_flusher: Optional[OutboxFlusher] = None
+
+
+def start_outbox_flusher(app) -> OutboxFlusher:
+    """Create and start the global outbox flusher for this process"""
+    global outbox_flusher
+    if outbox_flusher is None:
+        outbox_flusher = OutboxFlusher(
+            app,
+            batch_size=app.config.get('OUTBOX_BATCH_SIZE', 100),
+            interval=app.config.get('OUTBOX_FLUSH_INTERVAL', 2.0),
+            max_backoff=app.config.get('OUTBOX_MAX_BACKOFF', 300.0),
+            retention_days=app.config.get('OUTBOX_RETENTION_DAYS', 7)
+        )
+    outbox_flusher.start()
+    return outbox_flusher
@@ -0,0 +1,324 @@
+"""
+Report Query Module
+Small declarative query engine for ad-hoc analysis of the report sheets:
+filters, group-by columns, aggregates and top-k, evaluated with NumPy over
+the dictionary-encoded columnar view of the sheet snapshots. Results are
+cached by a hash of the spec and dropped when the snapshots change.
+
+Example spec::
+
+    {
+        "sheet": "adverse_reactions",
+        "filters": [{"column": "Reaction Severity", "op": "eq", "value": "severe"}],
+        "group_by": ["Drug Manufacturer", "Reaction Outcome"],
+        "aggregates": [{"fn": "count"}, {"fn": "avg", "column": "Patient Age"}],
+        "order_by": "count",
+        "top_k": 20
+    }
+"""
+
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sheet_cache import SheetSnapshot
+from sheet_columns import ColumnarTable, normalize_category
+
+FILTER_OPS = ['eq', 'ne', 'in', 'not_in', 'contains']
+
+AGGREGATE_FUNCTIONS = ['count', 'count_distinct', 'sum', 'avg', 'min', 'max']
+
+MAX_GROUP_BY = 4
+MAX_TOP_K = 1000
+
+# Results kept for the current snapshots
+MAX_CACHED_RESULTS = 64
+
+
+class QueryError(ValueError):
+    """Raised for specs that cannot be run; the message is shown to the client"""
+
+
+def _aggregate_name(aggregate: Dict[str, Any]) -> str:
+    if aggregate['fn'] == 'count':
+        return 'count'
+    return f"{aggregate['fn']}_{normalize_category(aggregate['column']).replace(' ', '_')}"
+
+
+def validate_spec(spec: Any, headers: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Check a spec against the known sheets and columns and fill in defaults.
+
+    headers maps each queryable sheet to its columns. Returns the normalized
+    spec, which is also what the cache key is computed from.
+    """
+    if not isinstance(spec, dict):
+        raise QueryError('Query spec must be a JSON object')
+
+    sheet = spec.get('sheet', 'adverse_reactions')
+    if sheet not in headers:
+        raise QueryError(f'Unknown sheet {sheet!r}')
+    columns = headers[sheet]
+
+    def column_of(value: Any, where: str) -> str:
+        if value not in columns:
+            raise QueryError(f'Unknown column {value!r} in {where}')
+        return value
+
+    filters = []
+    for condition in spec.get('filters') or []:
+        if not isinstance(condition, dict):
+            raise QueryError('Each filter must be an object with column, op and value')
+        op = condition.get('op', 'eq')
+        if op not in FILTER_OPS:
+            raise QueryError(f"Unknown filter op {op!r}, expected one of: {', '.join(FILTER_OPS)}")
+        value = condition.get('value')
+        if op in ('in', 'not_in'):
+            if not isinstance(value, list) or not value:
+                raise QueryError(f'Filter op {op} needs a non-empty list value')
+            value = sorted(normalize_category(str(item)) for item in value)
+        else:
+            if value is None or isinstance(value, (list, dict)):
+                raise QueryError(f'Filter op {op} needs a single value')
+            value = normalize_category(str(value))
+        filters.append({'column': column_of(condition.get('column'), 'filters'), 'op': op, 'value': value})
+
+    group_by = spec.get('group_by') or []
+    if not isinstance(group_by, list) or len(group_by) > MAX_GROUP_BY:
+        raise QueryError(f'group_by must be a list of at most {MAX_GROUP_BY} columns')
+    group_by = [column_of(column, 'group_by') for column in group_by]
+
+    aggregates = []
+    for aggregate in spec.get('aggregates') or [{'fn': 'count'}]:
+        if not isinstance(aggregate, dict) or aggregate.get('fn') not in AGGREGATE_FUNCTIONS:
+            raise QueryError(f"Each aggregate needs fn, one of: {', '.join(AGGREGATE_FUNCTIONS)}")
+        if aggregate['fn'] == 'count':
+            aggregates.append({'fn': 'count'})
+        else:
+            aggregates.append({'fn': aggregate['fn'], 'column': column_of(aggregate.get('column'), 'aggregates')})
+    names = [_aggregate_name(aggregate) for aggregate in aggregates]
+    if len(set(names)) != len(names):
+        raise QueryError('Duplicate aggregates')
+
+    order_by = spec.get('order_by') or names[0]
+    if order_by not in names:
+        raise QueryError(f"order_by must name an aggregate: {', '.join(names)}")
+
+    try:
+        top_k = int(spec.get('top_k') or 100)
+    except (TypeError, ValueError):
+        raise QueryError('top_k must be a number')
+    top_k = max(1, min(top_k, MAX_TOP_K))
+
+    dates = []
+    for name in ('date_from', 'date_to'):
+        value = spec.get(name)
+        try:
+            dates.append(date.fromisoformat(value).isoformat() if value else None)
+        except (TypeError, ValueError):
+            raise QueryError(f'Invalid {name}, expected YYYY-MM-DD')
+
+    return {
+        'sheet': sheet,
+        'filters': filters,
+        'date_from': dates[0],
+        'date_to': dates[1],
+        'group_by': group_by,
+        'aggregates': aggregates,
+        'order_by': order_by,
+        'order': 'asc' if spec.get('order') == 'asc' else 'desc',
+        'top_k': top_k
+    }
+
+
+def spec_hash(spec: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+def _filter_mask(table: ColumnarTable, spec: Dict[str, Any]) -> np.ndarray:
+    """Rows matching every filter, resolved on the distinct values of each column"""
+    mask = np.ones(table.length, dtype=bool)
+    for condition in spec['filters']:
+        codes, values = table.encoded(condition['column'])
+        op, value = condition['op'], condition['value']
+        if op in ('eq', 'ne'):
+            matching = [code for code, distinct in enumerate(values) if distinct == value]
+        elif op in ('in', 'not_in'):
+            wanted = set(value)
+            matching = [code for code, distinct in enumerate(values) if distinct in wanted]
+        else:
+            matching = [code for code, distinct in enumerate(values) if value in distinct]
+        hits = np.isin(codes, matching)
+        mask &= ~hits if op in ('ne', 'not_in') else hits
+
+    if spec['date_from'] or spec['date_to']:
+        days = table.days('Timestamp')
+        if spec['date_from']:
+            mask &= days >= date.fromisoformat(spec['date_from']).toordinal()
+        if spec['date_to']:
+            mask &= days <= date.fromisoformat(spec['date_to']).toordinal()
+    return mask
+
+
+def _aggregate(table: ColumnarTable, aggregate: Dict[str, Any], rows: np.ndarray, groups: np.ndarray,
+               group_count: int, sizes: np.ndarray) -> np.ndarray:
+    """One aggregate for every group at once; rows are the selected row positions and groups their group"""
+    fn = aggregate['fn']
+    if fn == 'count':
+        return sizes.astype(np.float64)
+
+    if fn == 'count_distinct':
+        codes, values = table.encoded(aggregate['column'])
+        pairs = np.unique(groups.astype(np.int64) * max(len(values), 1) + codes[rows])
+        return np.bincount(pairs // max(len(values), 1), minlength=group_count).astype(np.float64)
+
+    numbers = table.numbers(aggregate['column'])[rows]
+    present = ~np.isnan(numbers)
+    if fn in ('sum', 'avg'):
+        sums = np.bincount(groups[present], weights=numbers[present], minlength=group_count)
+        if fn == 'sum':
+            return sums
+        counts = np.bincount(groups[present], minlength=group_count)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    result = np.full(group_count, np.nan)
+    reduce = np.fmin if fn == 'min' else np.fmax
+    reduce.at(result, groups[present], numbers[present])
+    return result
+
+
+def run_query(table: ColumnarTable, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Evaluate a validated spec over one columnar table"""
+    rows = np.flatnonzero(_filter_mask(table, spec))
+
+    if spec['group_by']:
+        encodings = [table.encoded(column) for column in spec['group_by']]
+        dims = tuple(max(len(values), 1) for _, values in encodings)
+        codes = tuple(codes[rows] for codes, _ in encodings)
+        if math.prod(dims) <= np.iinfo(np.intp).max:
+            keys = np.ravel_multi_index(codes, dims)
+            unique_keys, groups, sizes = np.unique(keys, return_inverse=True, return_counts=True)
+            combinations = np.stack(np.unravel_index(unique_keys, dims), axis=1)
+        else:
+            # High-cardinality columns whose combined key would overflow: unique rows of the codes instead
+            combinations, groups, sizes = np.unique(
+                np.stack(codes, axis=1), axis=0, return_inverse=True, return_counts=True
+            )
+        groups = groups.reshape(-1)
+    else:
+        encodings = []
+        combinations = np.zeros((1 if len(rows) else 0, 0), dtype=np.int64)
+        groups = np.zeros(len(rows), dtype=np.int64)
+        sizes = np.array([len(rows)] if len(rows) else [], dtype=np.int64)
+    group_count = len(combinations)
+
+    names = [_aggregate_name(aggregate) for aggregate in spec['aggregates']]
+    results = {
+        name: _aggregate(table, aggregate, rows, groups, group_count, sizes)
+        for name, aggregate in zip(names, spec['aggregates'])
+    }
+
+    # Top-k by the ordering aggregate; groups without a value sort last
+    ordering = results[spec['order_by']]
+    ordering = np.where(np.isnan(ordering), -np.inf, ordering if spec['order'] == 'desc' else -ordering)
+    if len(ordering) > spec['top_k']:
+        selected = np.argpartition(-ordering, spec['top_k'] - 1)[:spec['top_k']]
+    else:
+        selected = np.arange(len(ordering))
+    selected = selected[np.argsort(-ordering[selected], kind='stable')]
+
+    output = []
+    for index in selected.tolist():
+        row = {
+            column: values[int(combinations[index, dimension])]
+            for dimension, (column, (_, values)) in enumerate(zip(spec['group_by'], encodings))
+        }
+        for name in names:
+            value = float(results[name][index])
+            row[name] = None if np.isnan(value) else (int(value) if name.startswith('count') else round(value, 4))
+        output.append(row)
+
+    return {'rows': output, 'groups': group_count, 'matched_rows': int(len(rows))}
+
+
+class QueryEngine:
+    """Runs specs against the current snapshots and caches their results"""
+
+    def __init__(self):
+        self._tables: Dict[str, Tuple[Tuple, ColumnarTable]] = {}
+        self._results: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._state: Dict[str, Tuple] = {}
+        self._lock = threading.Lock()
+        self.stats = {'queries': 0, 'cache_hits': 0}
+
+    def _table(self, sheet: str, snapshots: List[SheetSnapshot], headers: List[str]) -> ColumnarTable:
+        """Columnar view of a sheet; partitions are combined into one table in the sheet's column order"""
+        if len(snapshots) == 1:
+            return snapshots[0].columns
+
+        state = tuple((snapshot.sheet_name, snapshot.version) for snapshot in snapshots)
+        cached = self._tables.get(sheet)
+        if cached is not None and cached[0] == state:
+            return cached[1]
+
+        rows = []
+        for snapshot in snapshots:
+            positions = [snapshot.headers.index(header) if header in snapshot.headers else None for header in headers]
+            rows.extend(
+                [row[position] if position is not None and position < len(row) else '' for position in positions]
+                for row in snapshot.rows
+            )
+        table = ColumnarTable(headers, rows)
+        self._tables[sheet] = (state, table)
+        return table
+
+    def execute(self, spec: Dict[str, Any], snapshots: List[SheetSnapshot], headers: List[str]) -> Dict[str, Any]:
+        """Result of a validated spec, from the cache when the snapshots have not changed"""
+        state = tuple((snapshot.sheet_name, snapshot.version) for snapshot in snapshots)
+        key = spec_hash(spec)
+        with self._lock:
+            self.stats['queries'] += 1
+            if self._state.get(spec['sheet']) != state:
+                # New data landed: results computed on the old snapshots are dropped
+                self._state[spec['sheet']] = state
+                for cached_key in [k for k, v in self._results.items() if v['sheet'] == spec['sheet']]:
+                    del self._results[cached_key]
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                self.stats['cache_hits'] += 1
+                return dict(cached, cached=True)
+
+        if not snapshots:
+            result = {'rows': [], 'groups': 0, 'matched_rows': 0}
+        else:
+            result = run_query(self._table(spec['sheet'], snapshots, headers), spec)
+        result.update(sheet=spec['sheet'], spec_hash=key)
+
+        with self._lock:
+            if self._state.get(spec['sheet']) == state:
+                self._results[key] = result
+                while len(self._results) > MAX_CACHED_RESULTS:
+                    self._results.popitem(last=False)
+        return dict(result, cached=False)
+
+
+# One engine per process, like the snapshots it reads
+query_engine: Optional[QueryEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_query_engine() -> QueryEngine:
+    """Get (creating on first use) the process-wide query engine"""
+    global query_engine
+    if query_engine is None:
+        with _engine_lock:
+            if query_engine is None:
+                query_engine = QueryEngine()
+    return query_engine
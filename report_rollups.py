@@ -0,0 +1,200 @@
+"""
+Report Rollups Module
+Report counts per (day, governorate, drug, severity, status) kept in the
+database, so trend charts read a few hundred counters instead of scanning
+the sheet. Counters are bumped when a report is queued and moved when its
+status changes; a rebuild from the sheet snapshots seeds them and picks up
+edits made directly in the sheet.
+"""
+
+import json
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import ReportOutbox, ReportRollup, ReportRollupKey, RollupState
+from report_dedup import normalize_text
+from sheet_cache import SheetSnapshot
+from sheet_columns import normalize_category
+
+# Columns a timeseries can be grouped or filtered by
+ROLLUP_DIMENSIONS = ['governorate', 'drug', 'severity', 'status']
+
+TIMESERIES_INTERVALS = ['day', 'week', 'month']
+
+KEY_COLUMNS = ['sheet_name', 'day'] + ROLLUP_DIMENSIONS
+
+
+def rollup_key(sheet_name: str, row_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Rollup bucket of a sheet row, or None when it has no usable timestamp"""
+    try:
+        day = date.fromisoformat(str(row_data.get('Timestamp', '')).strip()[:10])
+    except ValueError:
+        return None
+
+    return {
+        'sheet_name': sheet_name,
+        'day': day,
+        'governorate': normalize_category(str(row_data.get('Governorate', '')))[:100],
+        'drug': normalize_text(row_data.get('Drug Name', ''))[:200],
+        'severity': normalize_category(str(row_data.get('Reaction Severity', '')))[:50],
+        'status': normalize_category(str(row_data.get('Status', '')))[:50]
+    }
+
+
+def _bump(key: Dict[str, Any], delta: int):
+    """Add delta to one counter, creating it if needed, in the current transaction"""
+    table = ReportRollup.__table__
+    dialect = db.engine.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(table).values(count=delta, **key).on_conflict_do_update(
+            index_elements=KEY_COLUMNS, set_={'count': table.c.count + delta}
+        )
+        db.session.execute(statement)
+        return
+
+    rollup = ReportRollup.query.filter_by(**key).with_for_update().first()
+    if rollup is None:
+        db.session.add(ReportRollup(count=delta, **key))
+    else:
+        rollup.count = rollup.count + delta
+
+
+def rollups_ready(sheet_name: str, max_age: Optional[float] = None) -> bool:
+    """True once the rollups of a worksheet were built (and, with max_age, not longer ago than that)"""
+    state = db.session.get(RollupState, sheet_name)
+    if state is None:
+        return False
+    return max_age is None or datetime.utcnow() - state.built_at < timedelta(seconds=max_age)
+
+
+def record_report(sheet_name: str, row_data: Dict[str, Any]):
+    """Count a newly submitted report; the caller commits.
+
+    Before the first rebuild nothing is recorded, since the rebuild counts
+    every report in the sheet and the outbox anyway.
+    """
+    if not rollups_ready(sheet_name):
+        return
+    key = rollup_key(sheet_name, row_data)
+    if key is None or not row_data.get('ID'):
+        return
+    db.session.add(ReportRollupKey(report_id=row_data['ID'], **key))
+    _bump(key, 1)
+
+
+def record_status_change(sheet_name: str, report_id: str, status: str):
+    """Move a report to the counter of its new status; the caller commits"""
+    entry = db.session.get(ReportRollupKey, str(report_id).strip())
+    new_status = normalize_category(str(status))[:50]
+    if entry is None or entry.sheet_name != sheet_name or entry.status == new_status:
+        return
+
+    key = {column: getattr(entry, column) for column in KEY_COLUMNS}
+    _bump(key, -1)
+    entry.status = key['status'] = new_status
+    _bump(key, 1)
+
+
+def rebuild_rollups(sheet_name: str, snapshots: List[SheetSnapshot]) -> int:
+    """Recount a worksheet from its snapshots plus reports still waiting in the outbox.
+
+    Rows without an ID (submitted before IDs were assigned server-side) are
+    counted too, but get no ReportRollupKey, so their status changes made
+    through the API are only picked up by the next rebuild.
+
+    Returns the number of reports counted, or -1 if another worker rebuilt
+    the same worksheet at the same time.
+    """
+    keys: Dict[str, Dict[str, Any]] = {}
+    unidentified = Counter()
+    for snapshot in snapshots:
+        for record in snapshot.records:
+            key = rollup_key(sheet_name, record)
+            if key is None:
+                continue
+            if record.get('ID'):
+                keys[record['ID']] = key
+            else:
+                unidentified[tuple(key[column] for column in KEY_COLUMNS)] += 1
+
+    pending = ReportOutbox.query.filter_by(sheet_name=sheet_name, status='pending')
+    for entry in pending.yield_per(500):
+        row_data = json.loads(entry.payload)
+        key = rollup_key(sheet_name, row_data)
+        if key is not None:
+            keys.setdefault(entry.report_id, key)
+
+    counts = Counter(tuple(key[column] for column in KEY_COLUMNS) for key in keys.values()) + unidentified
+    try:
+        ReportRollupKey.query.filter_by(sheet_name=sheet_name).delete(synchronize_session=False)
+        ReportRollup.query.filter_by(sheet_name=sheet_name).delete(synchronize_session=False)
+        RollupState.query.filter_by(sheet_name=sheet_name).delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(
+            ReportRollupKey, [dict(key, report_id=report_id) for report_id, key in keys.items()]
+        )
+        db.session.bulk_insert_mappings(
+            ReportRollup, [dict(zip(KEY_COLUMNS, values), count=count) for values, count in counts.items()]
+        )
+        db.session.add(RollupState(sheet_name=sheet_name, built_at=datetime.utcnow()))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return -1
+    return len(keys) + sum(unidentified.values())
+
+
+def period_start(day: date, interval: str) -> date:
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def timeseries(sheet_name: str, date_from: date, date_to: date, interval: str = 'day',
+               group_by: Optional[List[str]] = None, filters: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Report counts per period between date_from and date_to (inclusive), one series per group.
+
+    One grouped SUM over the counters of the range; the result has at most
+    one row per day and group, which is then folded into weeks or months.
+    """
+    group_by = group_by or []
+    group_columns = [getattr(ReportRollup, dimension) for dimension in group_by]
+    query = (
+        db.session.query(ReportRollup.day, *group_columns, db.func.sum(ReportRollup.count))
+        .filter(ReportRollup.sheet_name == sheet_name)
+        .filter(ReportRollup.day >= date_from, ReportRollup.day <= date_to)
+    )
+    for dimension, value in (filters or {}).items():
+        normalized = normalize_text(value) if dimension == 'drug' else normalize_category(value)
+        query = query.filter(getattr(ReportRollup, dimension) == normalized)
+    rows = query.group_by(ReportRollup.day, *group_columns).all()
+
+    series: Dict[tuple, Counter] = {}
+    for row in rows:
+        if not row[-1]:
+            continue  # counters emptied by status changes
+        group = tuple(row[1:1 + len(group_by)])
+        series.setdefault(group, Counter())[period_start(row[0], interval)] += int(row[-1])
+
+    result = []
+    for group, points in series.items():
+        result.append({
+            'group': dict(zip(group_by, group)),
+            'total': sum(points.values()),
+            'points': [{'period': period.isoformat(), 'count': points[period]} for period in sorted(points)]
+        })
+    result.sort(key=lambda item: -item['total'])
+    return {
+        'series': result,
+        'total': sum(item['total'] for item in result),
+        'counters_read': len(rows)
+    }
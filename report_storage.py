@@ -0,0 +1,45 @@
+"""
+Report Storage Module
+Interface every report storage backend implements. The routes, the outbox
+flusher and the PostgreSQL mirror only rely on these operations.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from sheet_cache import SheetSnapshot
+
+# Values accepted by the REPORT_STORAGE_BACKEND setting
+STORAGE_BACKENDS = ['google_sheets', 'fake']
+
+
+class ReportStorage(ABC):
+    """Row-oriented report storage addressed by worksheet name"""
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """True when the backend can currently serve requests"""
+
+    @abstractmethod
+    def append_rows(self, sheet_name: str, rows: List[Dict[str, Any]]) -> bool:
+        """Append header-keyed rows in order"""
+
+    @abstractmethod
+    def get_snapshot(self, sheet_name: str) -> Optional[SheetSnapshot]:
+        """Read all rows of a worksheet (possibly from cache)"""
+
+    @abstractmethod
+    def read_rows(self, sheet_name: str, start_row: int, end_row: Optional[int] = None) -> List[List[str]]:
+        """Read raw rows start_row..end_row of a worksheet"""
+
+    @abstractmethod
+    def update_report_status(self, sheet_name: str, report_id: str, status: str) -> bool:
+        """Set the Status of one report"""
+
+    def append_group(self, sheet_name: str, row: Dict[str, Any]) -> str:
+        """Key of the physical worksheet a row is appended to; rows of one append_rows call should share it"""
+        return sheet_name
+
+    @abstractmethod
+    def batch_update_reports(self, changes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply many report changes; returns one result per change"""
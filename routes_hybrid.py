@@ -1,28 +1,59 @@
-from flask import Blueprint, request, jsonify
+from bisect import bisect_right
+from datetime import date, timedelta
+from itertools import chain, islice
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_login import login_required, current_user
 from extensions import db
 from models import User, FAQ, DrugAlert, EducationalContent, SystemLog
-from google_sheets_service import get_sheets_service
+from google_sheets_service import get_sheets_service, build_adverse_reaction_row, build_intruder_report_row, BULK_UPDATE_FIELDS, WORKSHEET_HEADERS
+import report_outbox
+import sheets_breaker
+from report_outbox import generate_report_id, enqueue_report
+from report_dedup import find_duplicate, flag_duplicate
+from report_rollups import (ROLLUP_DIMENSIONS, TIMESERIES_INTERVALS, record_report, record_status_change,
+                            rebuild_rollups, rollups_ready, timeseries)
+from report_mirror import is_mirror_ready, query_reports, reports_after, listing_key, to_sheet_record, apply_report_update
+from report_listing import ListingOptions, listing_response, project, parse_date_range
+from report_export import EXPORT_FORMATS, csv_stream, xlsx_stream
+from sheets_scheduler import get_sheets_scheduler
+from signal_detection import DEFAULT_CRITERIA, SIGNAL_SORT_KEYS, get_signal_detector
+from report_query import QueryError, get_query_engine, validate_spec
+from content_cache import get_content_cache
+from content_listing import ContentOptions
 
 api_bp = Blueprint("api", __name__)
 user_bp = Blueprint("user", __name__)
 pharma_bp = Blueprint("pharma", __name__)
 
 # API Routes
+def _content_response(table):
+    """Cached JSON listing of a content table with a strong ETag; 304 if the client has it.
+    
+    Accepts lang, fields, category, active, limit and cursor (see content_listing);
+    each combination is cached separately.
+    """
+    try:
+        options = ContentOptions.from_request(table, request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    entry = get_content_cache(current_app.config).get(table, options.key, options.fetch)
+    response = current_app.response_class(entry.body, mimetype='application/json')
+    response.set_etag(entry.etag)
+    response.headers['Cache-Control'] = f"public, max-age={current_app.config.get('CONTENT_CACHE_CONTROL_MAX_AGE', 60)}"
+    return response.make_conditional(request)
+
 @api_bp.route("/faqs", methods=["GET"])
 def get_faqs():
-    faqs = FAQ.query.all()
-    return jsonify([faq.to_dict() for faq in faqs])
+    return _content_response('faqs')
 
 @api_bp.route("/drug_alerts", methods=["GET"])
 def get_drug_alerts():
-    alerts = DrugAlert.query.all()
-    return jsonify([alert.to_dict() for alert in alerts])
+    return _content_response('drug_alerts')
 
 @api_bp.route("/educational_content", methods=["GET"])
 def get_educational_content():
-    content = EducationalContent.query.all()
-    return jsonify([item.to_dict() for item in content])
+    return _content_response('educational_content')
 
 # User Routes
 @user_bp.route("/profile", methods=["GET"])
@@ -30,14 +61,76 @@ def get_educational_content():
 def user_profile():
     return jsonify(current_user.to_dict())
 
+def _queue_report(sheet_name, data, build_row):
+    """Assign a report ID and store the report in the outbox.
+    
+    Returns the report ID, or None when the outbox is disabled or the
+    database write fails and the caller should write to Google Sheets directly.
+    A resubmission of a recent report by the same reporter is flagged, or
+    merged into it (its ID is returned and nothing is stored), depending on
+    DUPLICATE_REPORT_ACTION.
+    """
+    data['id'] = generate_report_id(sheet_name)
+    if not current_app.config.get('OUTBOX_ENABLED'):
+        return None
+    
+    try:
+        row_data = build_row(data)
+        fingerprint, original, duplicate_of = None, None, None
+        action = current_app.config.get('DUPLICATE_REPORT_ACTION', 'flag')
+        if action != 'off':
+            fingerprint, original = find_duplicate(
+                sheet_name, row_data, current_app.config.get('DUPLICATE_REPORT_WINDOW', 1800.0)
+            )
+        
+        if original is not None:
+            current_app.logger.info(f"Report {data['id']} looks like a resubmission of {original.report_id} ({action})")
+            if action == 'merge':
+                data['id'] = original.report_id
+                return data['id']
+            duplicate_of = original.report_id
+            flag_duplicate(row_data, duplicate_of)
+        
+        record_report(sheet_name, row_data)
+        enqueue_report(sheet_name, row_data, fingerprint=fingerprint, duplicate_of=duplicate_of)
+        return data['id']
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Failed to queue {sheet_name} report, writing directly: {e}")
+        return None
+
+def _count_report(sheet_name, data, build_row):
+    """Add a report written directly to Google Sheets to the dashboard rollups"""
+    try:
+        record_report(sheet_name, build_row(data))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Failed to update {sheet_name} rollups: {e}")
+
+def _rollup_status_changes(changes):
+    """Move reports whose status changed to their new rollup counters"""
+    try:
+        for sheet_name, report_id, status in changes:
+            record_status_change(sheet_name, report_id, status)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Failed to update report rollups: {e}")
+
 # Pharma Routes
 @pharma_bp.route("/submit_adverse_reaction", methods=["POST"])
 @login_required
 def submit_adverse_reaction():
     data = request.get_json()
+    report_id = _queue_report('adverse_reactions', data, build_adverse_reaction_row)
+    if report_id:
+        return jsonify({"message": "Adverse reaction report submitted successfully", "report_id": report_id}), 200
+    
     sheets_service = get_sheets_service()
     if sheets_service.add_adverse_reaction(data):
-        return jsonify({"message": "Adverse reaction report submitted successfully"}), 200
+        _count_report('adverse_reactions', data, build_adverse_reaction_row)
+        return jsonify({"message": "Adverse reaction report submitted successfully", "report_id": data['id']}), 200
     else:
         return jsonify({"error": "Failed to submit adverse reaction report"}), 500
 
@@ -64,6 +157,13 @@ def submit_public_report():
         data['submission_source'] = 'public_form'
         data['submission_timestamp'] = request.headers.get('X-Timestamp', '')
         
+        report_id = _queue_report('adverse_reactions', data, build_adverse_reaction_row)
+        if report_id:
+            return jsonify({
+                "message": "تم إرسال التقرير بنجاح! شكراً لمساهمتك في تحسين سلامة الأدوية.",
+                "report_id": report_id
+            }), 200
+        
         sheets_service = get_sheets_service()
         
         if not sheets_service or not sheets_service.is_available():
@@ -72,9 +172,10 @@ def submit_public_report():
             }), 503
         
         if sheets_service.add_adverse_reaction(data):
+            _count_report('adverse_reactions', data, build_adverse_reaction_row)
             return jsonify({
                 "message": "تم إرسال التقرير بنجاح! شكراً لمساهمتك في تحسين سلامة الأدوية.",
-                "report_id": data.get('id', 'N/A')
+                "report_id": data['id']
             }), 200
         else:
             return jsonify({
@@ -91,9 +192,14 @@ def submit_public_report():
 @login_required
 def submit_intruder_report():
     data = request.get_json()
+    report_id = _queue_report('intruder_reports', data, build_intruder_report_row)
+    if report_id:
+        return jsonify({"message": "Intruder report submitted successfully", "report_id": report_id}), 200
+    
     sheets_service = get_sheets_service()
     if sheets_service.add_intruder_report(data):
-        return jsonify({"message": "Intruder report submitted successfully"}), 200
+        _count_report('intruder_reports', data, build_intruder_report_row)
+        return jsonify({"message": "Intruder report submitted successfully", "report_id": data['id']}), 200
     else:
         return jsonify({"error": "Failed to submit intruder report"}), 500
 
@@ -104,21 +210,195 @@ def reports_summary():
     summary = sheets_service.get_reports_summary()
     return jsonify(summary)
 
+@pharma_bp.route("/sheets_metrics", methods=["GET"])
+@login_required
+def sheets_metrics():
+    """Sheets API scheduler, circuit breaker and background worker state for this worker"""
+    metrics = {
+        "scheduler": get_sheets_scheduler(current_app.config).get_stats(),
+        "snapshot_refreshes": get_sheets_service().refresh_stats,
+        "content_cache": get_content_cache(current_app.config).get_stats()
+    }
+    if report_outbox.outbox_flusher is not None:
+        metrics["outbox"] = report_outbox.outbox_flusher.get_stats()
+    if sheets_breaker.sheets_supervisor is not None:
+        metrics["supervisor"] = sheets_breaker.sheets_supervisor.get_stats()
+    return jsonify(metrics)
+
+# Query arguments that filter a sheet listing (anything else leaves range-read paging possible)
+SHEET_LISTING_FILTERS = {
+    'adverse_reactions': ['status', 'severity', 'drug_name', 'governorate', 'date_from', 'date_to'],
+    'intruder_reports': ['status', 'governorate', 'confirmed_only', 'date_from', 'date_to']
+}
+
+def _use_mirror(sheet_name):
+    """True if listings of this worksheet should be served from the PostgreSQL mirror"""
+    if not current_app.config.get('REPORT_MIRROR_ENABLED'):
+        return False
+    if current_app.config.get('SHEETS_PARTITIONING') == 'monthly':
+        return False  # the mirror follows only the base worksheet, not the monthly partitions
+    try:
+        return is_mirror_ready(sheet_name)
+    except Exception as e:
+        current_app.logger.error(f"Report mirror unavailable for {sheet_name}: {e}")
+        return False
+
+def _mirror_listing(sheet_name, filters, options):
+    """Serve a report listing from the mirror, paginated when ?page= is given"""
+    query = query_reports(sheet_name, filters)
+    page = request.args.get('page', type=int)
+    
+    if not page:
+        def fetch(after, count):
+            segments = [query] if after is None else reports_after(query, sheet_name, filters, after)
+            if count is not None:
+                segments = [segment.limit(count) for segment in segments]
+            reports = islice(chain.from_iterable(segment.yield_per(500) for segment in segments), count)
+            return (
+                (listing_key(report, sheet_name, filters), to_sheet_record(report, sheet_name))
+                for report in reports
+            )
+        
+        try:
+            return listing_response(options, fetch)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+    
+    per_page = min(request.args.get('per_page', 50, type=int), 500)
+    reports = query.paginate(page=page, per_page=per_page, error_out=False)
+    return jsonify({
+        'reports': [project(to_sheet_record(report, sheet_name), options.fields) for report in reports.items],
+        'total': reports.total,
+        'pages': reports.pages,
+        'current_page': page
+    })
+
+def _sheet_page(sheet_name, filters, fetch_filtered):
+    """Serve ?page= from the sheet itself, newest first, in the mirror's page format.
+    
+    Without filters each page is one range read; with filters the cached
+    snapshot is filtered and sliced.
+    """
+    page = max(request.args.get('page', type=int), 1)
+    per_page = max(1, min(request.args.get('per_page', request.args.get('limit', 50, type=int), type=int), 500))
+    fields = ListingOptions.from_request(request).fields
+    
+    if not any(filters.get(name) for name in SHEET_LISTING_FILTERS[sheet_name]):
+        result = get_sheets_service().get_report_page(sheet_name, page, per_page)
+    else:
+        reports = fetch_filtered(filters)
+        start = (page - 1) * per_page
+        result = {
+            'reports': reports[::-1][start:start + per_page],
+            'total': len(reports),
+            'pages': -(-len(reports) // per_page),
+            'current_page': page
+        }
+    
+    result['reports'] = [project(report, fields) for report in result['reports']]
+    return jsonify(result)
+
+def _sheet_listing(entries, options):
+    """Serve already filtered (worksheet, sheet row, record) entries with limit/cursor/fields/format.
+    
+    The cursor key is the worksheet and row of the last record: partition
+    titles sort by month after the original sheet, so keys follow sheet order.
+    """
+    def fetch(after, count):
+        start = 0
+        if after is not None:
+            if after[0] is None:
+                raise ValueError('Invalid cursor')
+            start = bisect_right([(worksheet, row) for worksheet, row, _ in entries], tuple(after))
+        selected = islice(entries, start, None if count is None else start + count)
+        return (([worksheet, row], record) for worksheet, row, record in selected)
+    
+    try:
+        return listing_response(options, fetch)
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+
 @pharma_bp.route("/adverse_reactions", methods=["GET"])
 @login_required
 def get_adverse_reactions_reports():
     filters = request.args.to_dict()
+    try:
+        options = ListingOptions.from_request(request)
+        filters['date_from'], filters['date_to'] = parse_date_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if _use_mirror('adverse_reactions'):
+        return _mirror_listing('adverse_reactions', filters, options)
+    
     sheets_service = get_sheets_service()
-    reports = sheets_service.get_adverse_reactions(filters)
-    return jsonify(reports)
+    if request.args.get('page', type=int):
+        return _sheet_page('adverse_reactions', filters, sheets_service.get_adverse_reactions)
+    
+    return _sheet_listing(sheets_service.get_report_rows('adverse_reactions', filters), options)
 
 @pharma_bp.route("/intruder_reports", methods=["GET"])
 @login_required
 def get_intruder_reports_data():
     filters = request.args.to_dict()
+    try:
+        options = ListingOptions.from_request(request)
+        filters['date_from'], filters['date_to'] = parse_date_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if _use_mirror('intruder_reports'):
+        return _mirror_listing('intruder_reports', filters, options)
+    
     sheets_service = get_sheets_service()
-    reports = sheets_service.get_intruder_reports(filters)
-    return jsonify(reports)
+    if request.args.get('page', type=int):
+        return _sheet_page('intruder_reports', filters, sheets_service.get_intruder_reports)
+    
+    return _sheet_listing(sheets_service.get_report_rows('intruder_reports', filters), options)
+
+@pharma_bp.route("/export/<sheet_name>", methods=["GET"])
+@login_required
+def export_reports(sheet_name):
+    """Download a whole report sheet as CSV or XLSX, streamed, with the listing filters"""
+    if sheet_name not in SHEET_LISTING_FILTERS:
+        return jsonify({"error": "Unknown report sheet"}), 404
+    
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unsupported format, expected one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    filters = request.args.to_dict()
+    try:
+        filters['date_from'], filters['date_to'] = parse_date_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    headers = WORKSHEET_HEADERS[sheet_name]
+    if _use_mirror(sheet_name):
+        filters['order'] = filters.get('order', 'asc')
+        query = query_reports(sheet_name, filters)
+        rows = (
+            [str(value) for value in to_sheet_record(report, sheet_name).values()]
+            for report in query.yield_per(500)
+        )
+    else:
+        sheets_service = get_sheets_service()
+        if not sheets_service.is_available():
+            return jsonify({"error": "Report storage is unavailable"}), 503
+        rows = sheets_service.iter_report_rows(sheet_name, filters)
+    
+    if export_format == 'xlsx':
+        body = xlsx_stream(headers, rows, title=sheet_name)
+    else:
+        body = csv_stream(headers, rows)
+    
+    filename = f"{sheet_name}_{date.today().isoformat()}.{export_format}"
+    current_app.logger.info(f"Exporting {sheet_name} as {export_format} for {current_user.username}")
+    return Response(
+        stream_with_context(body),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
 
 @pharma_bp.route("/update_report_status", methods=["POST"])
 @login_required
@@ -133,10 +413,170 @@ def update_report_status():
     
     sheets_service = get_sheets_service()
     if sheets_service.update_report_status(sheet_name, report_id, status):
+        _rollup_status_changes([(sheet_name, report_id, status)])
+        if current_app.config.get('REPORT_MIRROR_ENABLED'):
+            try:
+                apply_report_update(sheet_name, report_id, {'Status': status})
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.error(f"Failed to update report mirror: {e}")
         return jsonify({"message": "Report status updated successfully"}), 200
     else:
         return jsonify({"error": "Failed to update report status"}), 500
 
+@pharma_bp.route("/bulk_update_reports", methods=["POST"])
+@login_required
+def bulk_update_reports():
+    """Update status, assignment, priority or notes of many reports at once"""
+    data = request.get_json() or {}
+    updates = data.get("updates")
+    
+    if not isinstance(updates, list) or not updates:
+        return jsonify({"error": "Missing updates list"}), 400
+    
+    if len(updates) > 500:
+        return jsonify({"error": "Too many updates in one request (maximum 500)"}), 400
+    
+    sheets_service = get_sheets_service()
+    results = sheets_service.batch_update_reports(updates)
+    _rollup_status_changes([
+        (change['sheet_name'], change['report_id'], change['status'])
+        for change, result in zip(updates, results) if result['success'] and change.get('status')
+    ])
+    
+    if current_app.config.get('REPORT_MIRROR_ENABLED'):
+        try:
+            for change, result in zip(updates, results):
+                if result['success']:
+                    apply_report_update(change['sheet_name'], change['report_id'], {
+                        header: change[key] for key, header in BULK_UPDATE_FIELDS.items() if key in change
+                    })
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Failed to update report mirror: {e}")
+    
+    updated = sum(1 for result in results if result['success'])
+    return jsonify({
+        "updated": updated,
+        "failed": len(results) - updated,
+        "results": results
+    }), 200
+
+@pharma_bp.route("/signals", methods=["GET"])
+@login_required
+def get_signals():
+    """Disproportionality signals (PRR, ROR, chi-square) of drug-reaction pairs.
+    
+    Thresholds default to the usual screening criteria and may be overridden
+    with min_count, min_prr, min_chi2 and min_ror_lower; drug and reaction
+    narrow the pairs by substring, sort picks prr, ror, chi2 or count.
+    """
+    criteria = {
+        name: request.args.get(name, default, type=type(default))
+        for name, default in DEFAULT_CRITERIA.items()
+    }
+    criteria['drug'] = request.args.get('drug', '').strip()
+    criteria['reaction'] = request.args.get('reaction', '').strip()
+    sort = request.args.get('sort', 'prr')
+    if sort not in SIGNAL_SORT_KEYS:
+        return jsonify({"error": f"Invalid sort, expected one of: {', '.join(SIGNAL_SORT_KEYS)}"}), 400
+    limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+    
+    sheets_service = get_sheets_service()
+    if not sheets_service.is_available():
+        return jsonify({"error": "Report storage is unavailable"}), 503
+    
+    try:
+        result = get_signal_detector().detect(sheets_service.report_snapshots('adverse_reactions'), criteria, sort)
+    except Exception as e:
+        current_app.logger.error(f"Signal detection failed: {e}")
+        return jsonify({"error": "Failed to compute signals"}), 500
+    
+    return jsonify({
+        "signals": result['signals'][:limit],
+        "total_signals": len(result['signals']),
+        "total_reports": result['total_reports'],
+        "pairs_evaluated": result['pairs_evaluated'],
+        "criteria": criteria,
+        "sort": sort
+    })
+
+@pharma_bp.route("/query", methods=["POST"])
+@login_required
+def run_report_query():
+    """Ad-hoc filter / group-by / aggregate / top-k query over a report sheet (see report_query)"""
+    try:
+        spec = validate_spec(request.get_json(silent=True), WORKSHEET_HEADERS)
+    except QueryError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    sheets_service = get_sheets_service()
+    if not sheets_service.is_available():
+        return jsonify({"error": "Report storage is unavailable"}), 503
+    
+    date_from = date.fromisoformat(spec['date_from']) if spec['date_from'] else None
+    date_to = date.fromisoformat(spec['date_to']) if spec['date_to'] else None
+    try:
+        snapshots = sheets_service.report_snapshots(spec['sheet'], date_from, date_to)
+        result = get_query_engine().execute(spec, snapshots, WORKSHEET_HEADERS[spec['sheet']])
+    except Exception as e:
+        current_app.logger.error(f"Report query failed: {e}")
+        return jsonify({"error": "Failed to run query"}), 500
+    
+    result['spec'] = spec
+    return jsonify(result)
+
+@pharma_bp.route("/statistics/timeseries", methods=["GET"])
+@login_required
+def get_statistics_timeseries():
+    """Report counts per day, week or month from the rollup counters.
+    
+    Defaults to adverse reactions per day over the last 90 days; group_by
+    takes a comma-separated subset of governorate, drug, severity and status,
+    and each of those may also be given as an exact-match filter.
+    """
+    sheet_name = request.args.get('sheet', 'adverse_reactions')
+    if sheet_name not in SHEET_LISTING_FILTERS:
+        return jsonify({"error": "Unknown report sheet"}), 404
+    
+    interval = request.args.get('interval', 'day')
+    if interval not in TIMESERIES_INTERVALS:
+        return jsonify({"error": f"Invalid interval, expected one of: {', '.join(TIMESERIES_INTERVALS)}"}), 400
+    
+    group_by = [name.strip() for name in request.args.get('group_by', '').split(',') if name.strip()]
+    unknown = [name for name in group_by if name not in ROLLUP_DIMENSIONS]
+    if unknown:
+        return jsonify({"error": f"Cannot group by {', '.join(unknown)}"}), 400
+    
+    try:
+        date_from, date_to = parse_date_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=89)
+    filters = {name: request.args[name] for name in ROLLUP_DIMENSIONS if request.args.get(name)}
+    
+    if not rollups_ready(sheet_name, current_app.config.get('ROLLUP_REBUILD_INTERVAL', 86400.0)):
+        sheets_service = get_sheets_service()
+        if not sheets_service.is_available():
+            return jsonify({"error": "Report storage is unavailable"}), 503
+        snapshots = sheets_service.report_snapshots(sheet_name)
+        if snapshots:
+            counted = rebuild_rollups(sheet_name, snapshots)
+            current_app.logger.info(f"Rebuilt {sheet_name} rollups from {counted} reports")
+        elif not rollups_ready(sheet_name):
+            return jsonify({"error": "Report storage is unavailable"}), 503
+    
+    result = timeseries(sheet_name, date_from, date_to, interval, group_by, filters)
+    result.update({
+        "sheet": sheet_name,
+        "interval": interval,
+        "group_by": group_by,
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat()
+    })
+    return jsonify(result)
+
 @pharma_bp.route("/statistics", methods=["GET"])
 def get_statistics():
     """Get basic statistics for the dashboard from Google Sheets"""
@@ -2,6 +2,7 @@ from datetime import datetime, date
 from models import FAQ, DrugAlert, EducationalContent, User
 from extensions import db
 from sqlalchemy import inspect, text
+from content_cache import mark_changed
 
 def check_column_exists(table_name, column_name):
     """Check if a column exists in a table"""
@@ -111,6 +112,7 @@ def seed_database():
                 """
                 
                 db.session.execute(text(insert_sql), available_data)
+                mark_changed(db.session, 'faqs')  # raw SQL is invisible to the content cache
                 db.session.commit()
                 print(f"Seeded FAQ: {available_data['question_ar'][:50]}...")
             else:
@@ -196,6 +198,7 @@ def seed_database():
                 """
                 
                 db.session.execute(text(insert_sql), available_data)
+                mark_changed(db.session, 'drug_alerts')  # raw SQL is invisible to the content cache
                 db.session.commit()
                 print(f"Seeded Drug Alert: {available_data['title_ar'][:50]}...")
             else:
@@ -275,6 +278,7 @@ def seed_database():
                 """
                 
                 db.session.execute(text(insert_sql), available_data)
+                mark_changed(db.session, 'educational_content')  # raw SQL is invisible to the content cache
                 db.session.commit()
                 print(f"Seeded Educational Content: {available_data['title_ar'][:50]}...")
             else:
@@ -0,0 +1,279 @@
+"""
+Shared Cache Module
+Key-value store shared by all worker processes, used so that N gunicorn
+workers download a worksheet once instead of N times. Redis is used when
+SHARED_CACHE_URL (or REDIS_URL) points at one and the redis package is
+installed; otherwise entries live as files in a local directory, which is
+enough for the workers of a single instance.
+
+Both stores offer the same small interface: byte values with an optional
+TTL, atomic counters, and short-lived locks for single-flight refreshes.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from flask import current_app
+
+try:
+    import redis
+except ImportError:  # optional dependency
+    redis = None
+
+KEY_PREFIX = 'pv:'
+
+# How often a FileStore deletes expired values, and how old an abandoned
+# temporary file from an interrupted write must be to be removed (seconds)
+FILE_SWEEP_INTERVAL = 300.0
+FILE_TEMP_MAX_AGE = 3600.0
+
+
+class SharedStore(ABC):
+    """Byte values, counters and locks visible to every worker process"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Value of key, or None if missing or expired"""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        """Store value, expiring after ttl seconds when given"""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove key if present"""
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        """Atomically increment a counter and return the new value"""
+
+    @abstractmethod
+    def try_lock(self, key: str, ttl: float) -> Optional[str]:
+        """Take a lock without waiting; returns a token, or None if another holder has it.
+
+        The lock expires after ttl seconds so a crashed holder cannot block refreshes.
+        """
+
+    @abstractmethod
+    def unlock(self, key: str, token: str):
+        """Release a lock taken with try_lock"""
+
+    def get_json(self, key: str) -> Any:
+        value = self.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set_json(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.set(key, json.dumps(value).encode(), ttl)
+
+    def get_packed(self, key: str) -> Any:
+        """JSON value stored compressed with set_packed"""
+        value = self.get(key)
+        return json.loads(zlib.decompress(value)) if value is not None else None
+
+    def set_packed(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a large JSON value (such as a worksheet) zlib-compressed"""
+        self.set(key, zlib.compress(json.dumps(value, separators=(',', ':')).encode(), 1), ttl)
+
+
+class FileStore(SharedStore):
+    """Shared store backed by files in one directory (workers of a single host).
+
+    Each value file starts with its expiry time on the first line. Writes go
+    through a temporary file and os.replace, so readers never see partial
+    values; counters are updated under an flock. Expiry is checked on read,
+    and set() sweeps expired files out of the directory every
+    FILE_SWEEP_INTERVAL seconds so it does not grow without bound.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._next_sweep = time.monotonic() + FILE_SWEEP_INTERVAL
+        self._sweep_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str, suffix: str = '') -> str:
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.directory, digest + suffix)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), 'rb') as handle:
+                expires = float(handle.readline())
+                if expires and expires < time.time():
+                    return None
+                return handle.read()
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        expires = time.time() + ttl if ttl else 0
+        handle, temp_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(handle, 'wb') as temp_file:
+                temp_file.write(f'{expires}\n'.encode())
+                temp_file.write(value)
+            os.replace(temp_path, self._path(key))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        if time.monotonic() >= self._next_sweep and self._sweep_lock.acquire(blocking=False):
+            try:
+                self._next_sweep = time.monotonic() + FILE_SWEEP_INTERVAL
+                self.sweep()
+            finally:
+                self._sweep_lock.release()
+
+    def sweep(self) -> int:
+        """Delete expired values and abandoned temporary files; returns the number removed"""
+        removed = 0
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.name.startswith('tmp'):
+                    if entry.stat().st_mtime + FILE_TEMP_MAX_AGE < now:
+                        os.unlink(entry.path)
+                        removed += 1
+                    continue
+                if '.' in entry.name:
+                    continue  # counters and locks
+                with open(entry.path, 'rb') as handle:
+                    expires = float(handle.readline())
+                    # Skip a file another process replaced with a fresh value meanwhile
+                    if expires and expires < now and os.fstat(handle.fileno()).st_ino == os.stat(entry.path).st_ino:
+                        os.unlink(entry.path)
+                        removed += 1
+            except (OSError, ValueError):
+                continue
+        return removed
+
+    def delete(self, key: str):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def incr(self, key: str) -> int:
+        with open(self._path(key, '.counter'), 'a+') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                handle.seek(0)
+                value = int(handle.read() or 0) + 1
+                handle.seek(0)
+                handle.truncate()
+                handle.write(str(value))
+                handle.flush()
+                return value
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def try_lock(self, key: str, ttl: float) -> Optional[str]:
+        path = self._path(key, '.lock')
+        token = uuid.uuid4().hex
+        for _ in range(2):
+            try:
+                handle = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                # Break the lock of a holder that died without releasing it
+                try:
+                    if os.path.getmtime(path) + ttl < time.time():
+                        os.unlink(path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                return None
+            with os.fdopen(handle, 'w') as lock_file:
+                lock_file.write(token)
+            return token
+        return None
+
+    def unlock(self, key: str, token: str):
+        path = self._path(key, '.lock')
+        try:
+            with open(path) as lock_file:
+                if lock_file.read() != token:
+                    return
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+class RedisStore(SharedStore):
+    """Shared store on a Redis-compatible server"""
+
+    def __init__(self, url: str):
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(KEY_PREFIX + key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        self.client.set(KEY_PREFIX + key, value, px=int(ttl * 1000) if ttl else None)
+
+    def delete(self, key: str):
+        self.client.delete(KEY_PREFIX + key)
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(KEY_PREFIX + key))
+
+    def try_lock(self, key: str, ttl: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        if self.client.set(KEY_PREFIX + key, token, nx=True, px=int(ttl * 1000)):
+            return token
+        return None
+
+    def unlock(self, key: str, token: str):
+        key = KEY_PREFIX + key
+        if self.client.get(key) == token.encode():
+            self.client.delete(key)
+
+
+def create_shared_store(url: Optional[str]) -> Optional[SharedStore]:
+    """Store for a SHARED_CACHE_URL; None disables sharing (each worker caches alone)"""
+    if not url or url in ('none', 'memory://'):
+        return None
+
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        if redis is None:
+            current_app.logger.warning('redis package not installed; using the file-based shared cache')
+            return FileStore(os.path.join(tempfile.gettempdir(), 'pharmacovigilance-cache'))
+        return RedisStore(url)
+
+    if url.startswith('file://'):
+        return FileStore(url[len('file://'):])
+
+    current_app.logger.warning(f'Unsupported SHARED_CACHE_URL {url!r}; cache sharing disabled')
+    return None
+
+
+# One store per process, created on first use
+shared_store = None
+_store_lock = threading.Lock()
+_store_created = False
+
+
+def get_shared_store(config) -> Optional[SharedStore]:
+    """Get (creating on first use) the process-wide shared store, or None if disabled"""
+    global shared_store, _store_created
+    if not _store_created:
+        with _store_lock:
+            if not _store_created:
+                shared_store = create_shared_store(config.get('SHARED_CACHE_URL'))
+                _store_created = True
+    return shared_store
+
+
+def reset_shared_store():
+    """Forget the store so a forked worker opens its own connections"""
+    global shared_store, _store_created
+    shared_store = None
+    _store_created = False
@@ -0,0 +1,372 @@
+"""
+Sheet Cache Module
+In-memory snapshots of Google Sheets worksheets so dashboard reads are served
+from memory instead of downloading the whole sheet on every request. With a
+shared store the snapshots are also published to the other worker processes.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+
+from shared_cache import SharedStore
+from sheet_columns import ColumnarTable
+from sheet_indexes import FilterIndex
+
+
+def _wall_time(monotonic_time: float) -> float:
+    """Convert a time.monotonic() reading to a wall-clock timestamp other processes understand"""
+    return time.time() - (time.monotonic() - monotonic_time)
+
+
+def _monotonic_time(wall_time: float) -> float:
+    return time.monotonic() - (time.time() - wall_time)
+
+
+class SheetSnapshot:
+    """Values of one worksheet as downloaded at a point in time"""
+
+    def __init__(self, sheet_name: str, values: List[List[str]], version: int,
+                 modified_time: Optional[str] = None):
+        self.sheet_name = sheet_name
+        self.headers = values[0] if values else []
+        self.rows = values[1:] if values else []
+        self.version = version
+        self.shared_version: Optional[int] = None  # version in the shared store, if published
+        self.modified_time = modified_time
+        self.fetched_at = time.monotonic()
+        self.checked_at = self.fetched_at
+        self._records = None
+        self._columns = None
+        self._filter_index = None
+        self._lock = threading.Lock()
+
+    @property
+    def records(self) -> List[Dict[str, Any]]:
+        """Rows as header-keyed dictionaries, built once per snapshot"""
+        if self._records is None:
+            with self._lock:
+                if self._records is None:
+                    self._records = self._build_records()
+        return self._records
+
+    @property
+    def columns(self) -> ColumnarTable:
+        """Column-oriented view used for counts and aggregations, built once per snapshot"""
+        if self._columns is None:
+            with self._lock:
+                if self._columns is None:
+                    self._columns = ColumnarTable(self.headers, self.rows)
+        return self._columns
+
+    @property
+    def filter_index(self) -> FilterIndex:
+        """Posting-list and n-gram indexes over the columnar view, built once per snapshot"""
+        if self._filter_index is None:
+            columns = self.columns
+            with self._lock:
+                if self._filter_index is None:
+                    self._filter_index = FilterIndex(columns)
+        return self._filter_index
+
+    def _build_records(self) -> List[Dict[str, Any]]:
+        """Convert raw rows to records, handling empty rows and malformed data"""
+        records = []
+
+        # Process each data row (header row is already split off)
+        for row_index, row in enumerate(self.rows, start=2):
+            try:
+                # Skip completely empty rows
+                if not any(cell.strip() for cell in row if cell):
+                    continue
+
+                # Create record dictionary, handling missing columns
+                record = {}
+                for col_index, header in enumerate(self.headers):
+                    if col_index < len(row):
+                        record[header] = row[col_index].strip()
+                    else:
+                        record[header] = ''  # Default empty value for missing columns
+
+                # Only add record if it has some meaningful data
+                if any(value.strip() for value in record.values()):
+                    records.append(record)
+
+            except Exception as row_error:
+                current_app.logger.warning(f"Error processing row {row_index} of {self.sheet_name}: {row_error}")
+                continue  # Skip problematic rows
+
+        return records
+
+
+class SnapshotCache:
+    """Per-worksheet snapshot store with a TTL and explicit invalidation.
+
+    A snapshot younger than ``ttl`` seconds is served as is. An older one is
+    served only after a staleness probe confirms the spreadsheet has not
+    changed, and never once it is older than ``max_age`` seconds.
+
+    When a shared store is given, every new snapshot and every successful
+    probe is published there, so a worker whose own copy went stale can pick
+    up the one another worker already refreshed instead of downloading it.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_age: float = 600.0, shared: Optional[SharedStore] = None,
+                 lock_ttl: float = 60.0):
+        self.ttl = ttl
+        self.max_age = max_age
+        self.shared = shared
+        self.lock_ttl = lock_ttl
+        self._snapshots: Dict[str, SheetSnapshot] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, sheet_name: str) -> Optional[SheetSnapshot]:
+        """Return the cached snapshot, fresh or not"""
+        return self._snapshots.get(sheet_name)
+
+    def is_fresh(self, snapshot: SheetSnapshot) -> bool:
+        """True while the snapshot is within its TTL since the last check"""
+        return time.monotonic() - snapshot.checked_at < self.ttl
+
+    def can_revalidate(self, snapshot: SheetSnapshot) -> bool:
+        """True if a stale snapshot may still be kept after a successful probe"""
+        return (
+            snapshot.modified_time is not None
+            and time.monotonic() - snapshot.fetched_at < self.max_age
+        )
+
+    def can_extend(self, snapshot: SheetSnapshot) -> bool:
+        """True if a stale snapshot may be refreshed by fetching only its new tail rows.
+
+        Past max_age the next refresh is a full reload, which also picks up
+        out-of-band edits the change probe cannot see.
+        """
+        return time.monotonic() - snapshot.fetched_at < self.max_age
+
+    def mark_checked(self, snapshot: SheetSnapshot):
+        """Restart the TTL of a snapshot the probe found unchanged"""
+        snapshot.checked_at = time.monotonic()
+        if snapshot.shared_version is not None:
+            self._publish_meta(snapshot)
+
+    def put(self, sheet_name: str, values: List[List[str]],
+            modified_time: Optional[str] = None) -> SheetSnapshot:
+        """Store freshly downloaded values as the new snapshot of a worksheet"""
+        with self._lock:
+            version = self._versions.get(sheet_name, 0) + 1
+            self._versions[sheet_name] = version
+            snapshot = SheetSnapshot(sheet_name, values, version, modified_time)
+            self._snapshots[sheet_name] = snapshot
+        self._publish(snapshot)
+        return snapshot
+
+    def extend(self, snapshot: SheetSnapshot, new_rows: List[List[str]],
+               modified_time: Optional[str] = None) -> SheetSnapshot:
+        """New version of a snapshot with rows appended below it (from a tail fetch)"""
+        with self._lock:
+            version = self._versions.get(snapshot.sheet_name, 0) + 1
+            self._versions[snapshot.sheet_name] = version
+            extended = SheetSnapshot(
+                snapshot.sheet_name, [snapshot.headers] + snapshot.rows + new_rows, version, modified_time
+            )
+            extended.fetched_at = snapshot.fetched_at
+            self._snapshots[snapshot.sheet_name] = extended
+        self._publish(extended)
+        return extended
+
+    def expire(self, sheet_name: str):
+        """Mark a snapshot stale but keep it as the base for an incremental refresh"""
+        snapshot = self._snapshots.get(sheet_name)
+        if snapshot is not None:
+            snapshot.checked_at = float('-inf')
+        self._unpublish(sheet_name)
+
+    def update_cells(self, sheet_name: str, updates: List[Tuple[int, int, str]]) -> Optional[SheetSnapshot]:
+        """Apply cell writes made by this process to the cached snapshot as a new version.
+
+        ``updates`` holds (sheet row, 1-based column, value) tuples. The previous
+        snapshot object is left untouched for readers still holding it.
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(sheet_name)
+            if snapshot is None:
+                self._versions[sheet_name] = self._versions.get(sheet_name, 0) + 1
+                updated = None
+            else:
+                rows = list(snapshot.rows)
+                for row_number, column, value in updates:
+                    position = row_number - 2
+                    if position < 0 or position >= len(rows):
+                        continue
+                    row = list(rows[position])
+                    if len(row) < column:
+                        row.extend([''] * (column - len(row)))
+                    row[column - 1] = str(value)
+                    rows[position] = row
+
+                version = self._versions.get(sheet_name, 0) + 1
+                self._versions[sheet_name] = version
+                updated = SheetSnapshot(sheet_name, [snapshot.headers] + rows, version, snapshot.modified_time)
+                updated.fetched_at = snapshot.fetched_at
+                updated.checked_at = snapshot.checked_at
+                self._snapshots[sheet_name] = updated
+
+        if updated is not None:
+            self._publish(updated)
+        else:
+            self._unpublish(sheet_name)
+        return updated
+
+    def invalidate(self, sheet_name: Optional[str] = None):
+        """Drop the snapshot of one worksheet, or all of them"""
+        with self._lock:
+            names = [sheet_name] if sheet_name else list(self._snapshots)
+            for name in names:
+                self._snapshots.pop(name, None)
+                self._versions[name] = self._versions.get(name, 0) + 1
+        for name in names:
+            self._unpublish(name)
+
+    def version(self, sheet_name: str) -> int:
+        """Current version counter of a worksheet; bumps on every reload and write"""
+        return self._versions.get(sheet_name, 0)
+
+    # Shared store
+
+    def _publish(self, snapshot: SheetSnapshot):
+        """Publish a snapshot's values under a new shared version"""
+        if self.shared is None:
+            return
+        try:
+            shared_version = self.shared.incr(f'snapshot:{snapshot.sheet_name}:version')
+            self.shared.set_packed(
+                f'snapshot:{snapshot.sheet_name}:{shared_version}',
+                [snapshot.headers] + snapshot.rows,
+                ttl=self.max_age * 2
+            )
+            snapshot.shared_version = shared_version
+            self._publish_meta(snapshot)
+            # The meta now points at the new copy; a worker still loading the old
+            # one finds it gone and refetches. Old summaries expire on their own.
+            self.shared.delete(f'snapshot:{snapshot.sheet_name}:{shared_version - 1}')
+        except Exception as e:
+            current_app.logger.warning(f"Could not publish {snapshot.sheet_name} snapshot to the shared cache: {e}")
+
+    def _publish_meta(self, snapshot: SheetSnapshot):
+        try:
+            self.shared.set_json(f'snapshot:{snapshot.sheet_name}:meta', {
+                'version': snapshot.shared_version,
+                'modified_time': snapshot.modified_time,
+                'fetched_at': _wall_time(snapshot.fetched_at),
+                'checked_at': _wall_time(snapshot.checked_at)
+            }, ttl=self.max_age)
+        except Exception as e:
+            current_app.logger.warning(f"Could not publish {snapshot.sheet_name} snapshot metadata: {e}")
+
+    def _unpublish(self, sheet_name: str):
+        """Make other workers stop serving the shared snapshot of a worksheet"""
+        if self.shared is None:
+            return
+        try:
+            self.shared.delete(f'snapshot:{sheet_name}:meta')
+        except Exception as e:
+            current_app.logger.warning(f"Could not invalidate shared {sheet_name} snapshot: {e}")
+
+    def _shared_meta(self, sheet_name: str) -> Optional[Dict[str, Any]]:
+        """Metadata of the shared snapshot if one exists and is within the TTL"""
+        if self.shared is None:
+            return None
+        try:
+            meta = self.shared.get_json(f'snapshot:{sheet_name}:meta')
+        except Exception as e:
+            current_app.logger.warning(f"Could not read shared {sheet_name} snapshot metadata: {e}")
+            return None
+        if not meta or time.time() - meta['checked_at'] >= self.ttl:
+            return None
+        return meta
+
+    def is_current(self, snapshot: SheetSnapshot) -> bool:
+        """False if another worker has since published a newer snapshot or invalidated this one"""
+        if self.shared is None or snapshot.shared_version is None:
+            return True
+        try:
+            meta = self.shared.get_json(f'snapshot:{snapshot.sheet_name}:meta')
+        except Exception:
+            return True
+        return meta is not None and meta['version'] == snapshot.shared_version
+
+    def load_shared(self, sheet_name: str) -> Optional[SheetSnapshot]:
+        """Adopt the shared snapshot of a worksheet if another worker refreshed it recently"""
+        meta = self._shared_meta(sheet_name)
+        if meta is None:
+            return None
+
+        current = self._snapshots.get(sheet_name)
+        if current is not None and current.shared_version == meta['version']:
+            # Same data, just re-checked elsewhere
+            current.checked_at = _monotonic_time(meta['checked_at'])
+            return current
+
+        try:
+            values = self.shared.get_packed(f"snapshot:{sheet_name}:{meta['version']}")
+        except Exception as e:
+            current_app.logger.warning(f"Could not read shared {sheet_name} snapshot: {e}")
+            return None
+        if values is None:
+            return None
+
+        with self._lock:
+            version = self._versions.get(sheet_name, 0) + 1
+            self._versions[sheet_name] = version
+            snapshot = SheetSnapshot(sheet_name, values, version, meta['modified_time'])
+            snapshot.shared_version = meta['version']
+            snapshot.fetched_at = _monotonic_time(meta['fetched_at'])
+            snapshot.checked_at = _monotonic_time(meta['checked_at'])
+            self._snapshots[sheet_name] = snapshot
+        return snapshot
+
+    @contextmanager
+    def refresh_lock(self, sheet_name: str):
+        """Single-flight guard across workers; yields True if this worker should refresh.
+
+        Without a shared store (or if it fails) every worker refreshes for itself.
+        """
+        token = None
+        acquired = True
+        if self.shared is not None:
+            try:
+                token = self.shared.try_lock(f'snapshot:{sheet_name}:refresh', self.lock_ttl)
+                acquired = token is not None
+            except Exception as e:
+                current_app.logger.warning(f"Shared refresh lock unavailable for {sheet_name}: {e}")
+        try:
+            yield acquired
+        finally:
+            if token is not None:
+                try:
+                    self.shared.unlock(f'snapshot:{sheet_name}:refresh', token)
+                except Exception as e:
+                    current_app.logger.warning(f"Could not release shared refresh lock for {sheet_name}: {e}")
+
+    def shared_summary(self, sheet_name: str, name: str) -> Any:
+        """A derived result (e.g. status counts) stored for the current shared snapshot"""
+        meta = self._shared_meta(sheet_name)
+        if meta is None:
+            return None
+        try:
+            return self.shared.get_json(f"{name}:{sheet_name}:{meta['version']}")
+        except Exception:
+            return None
+
+    def store_summary(self, snapshot: SheetSnapshot, name: str, value: Any):
+        """Share a result derived from a published snapshot with the other workers"""
+        if self.shared is None or snapshot.shared_version is None:
+            return
+        try:
+            self.shared.set_json(f'{name}:{snapshot.sheet_name}:{snapshot.shared_version}', value, ttl=self.max_age)
+        except Exception as e:
+            current_app.logger.warning(f"Could not share {name} of {snapshot.sheet_name}: {e}")
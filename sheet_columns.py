@@ -0,0 +1,147 @@
+"""
+Sheet Columns Module
+Column-oriented, dictionary-encoded view of a worksheet snapshot so summaries
+and group-by counts are computed with vectorized NumPy passes instead of
+per-row Python loops
+"""
+
+import math
+import re
+import threading
+from datetime import date
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+def normalize_category(value: str) -> str:
+    """Canonical form used when comparing categorical cells (status, governorate, ...)"""
+    return value.strip().lower()
+
+
+LEADING_NUMBER = re.compile(r'^\s*(-?\d+(?:\.\d+)?)')
+
+
+def _day_ordinal(value: str) -> float:
+    try:
+        return float(date.fromisoformat(value[:10]).toordinal())
+    except ValueError:
+        return float('nan')
+
+
+def _leading_number(value: str) -> float:
+    match = LEADING_NUMBER.match(value)
+    return float(match.group(1)) if match else float('nan')
+
+
+class ColumnarTable:
+    """Columns of the non-empty rows of a worksheet.
+
+    Each column is kept as a list of stripped strings. Categorical columns
+    are dictionary-encoded on first use into an int32 code array plus the
+    list of distinct normalized values.
+    """
+
+    def __init__(self, headers: List[str], rows: List[List[str]]):
+        self.headers = list(headers)
+        width = len(self.headers)
+
+        kept_rows = []
+        row_numbers = []
+        for row_number, row in enumerate(rows, start=2):
+            # Same rule as the records view: skip rows without any content
+            if any(cell.strip() for cell in row[:width] if cell):
+                kept_rows.append(row)
+                row_numbers.append(row_number)
+
+        self.length = len(kept_rows)
+        self.row_numbers = np.array(row_numbers, dtype=np.int32)
+        self._columns = {
+            header: [row[index].strip() if index < len(row) else '' for row in kept_rows]
+            for index, header in enumerate(self.headers)
+        }
+        self._encoded: Dict[str, Tuple[np.ndarray, List[str]]] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._derived: Dict[Tuple[str, str], np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def column(self, header: str) -> List[str]:
+        """Raw (stripped) values of a column; empty strings if the sheet lacks it"""
+        values = self._columns.get(header)
+        return values if values is not None else [''] * self.length
+
+    def encoded(self, header: str) -> Tuple[np.ndarray, List[str]]:
+        """Dictionary encoding of a column: (codes, distinct normalized values)"""
+        result = self._encoded.get(header)
+        if result is None:
+            with self._lock:
+                result = self._encoded.get(header)
+                if result is None:
+                    lookup: Dict[str, int] = {}
+                    codes = np.fromiter(
+                        (lookup.setdefault(normalize_category(value), len(lookup)) for value in self.column(header)),
+                        dtype=np.int32,
+                        count=self.length
+                    )
+                    result = (codes, list(lookup))
+                    self._encoded[header] = result
+        return result
+
+    def _derive(self, kind: str, header: str, parse) -> np.ndarray:
+        """Per-row array computed once from the distinct values of a column"""
+        result = self._derived.get((kind, header))
+        if result is None:
+            codes, values = self.encoded(header)
+            parsed = np.array([parse(value) for value in values], dtype=np.float64)
+            result = parsed[codes] if len(codes) else np.empty(0, dtype=np.float64)
+            self._derived[(kind, header)] = result
+        return result
+
+    def days(self, header: str) -> np.ndarray:
+        """Date of an ISO timestamp column as a day ordinal per row (NaN where unparseable)"""
+        return self._derive('days', header, _day_ordinal)
+
+    def numbers(self, header: str) -> np.ndarray:
+        """Leading number of each cell, e.g. 45 for '45 years' (NaN where there is none)"""
+        return self._derive('numbers', header, _leading_number)
+
+    def value_counts(self, header: str) -> Dict[str, int]:
+        """Count rows per normalized value of a column in one bincount pass"""
+        counts = self._counts.get(header)
+        if counts is None:
+            codes, values = self.encoded(header)
+            totals = np.bincount(codes, minlength=len(values))
+            counts = dict(zip(values, totals.tolist()))
+            self._counts[header] = counts
+        return counts
+
+    def group_counts(self, headers: List[str], mask: np.ndarray = None) -> Dict[Tuple[str, ...], int]:
+        """Count rows per combination of normalized values of several columns.
+
+        The per-column codes are combined into a single integer key with
+        ravel_multi_index, so the whole group-by is one vectorized pass. When
+        the product of the column cardinalities does not fit an index integer,
+        the rows of stacked codes are made unique instead.
+        """
+        if self.length == 0:
+            return {}
+
+        encodings = [self.encoded(header) for header in headers]
+        dims = tuple(max(len(values), 1) for _, values in encodings)
+        codes = tuple(codes for codes, _ in encodings)
+        if math.prod(dims) <= np.iinfo(np.intp).max:
+            keys = np.ravel_multi_index(codes, dims)
+            if mask is not None:
+                keys = keys[mask]
+            unique_keys, totals = np.unique(keys, return_counts=True)
+            combinations = zip(*np.unravel_index(unique_keys, dims))
+        else:
+            stacked = np.stack(codes, axis=1)
+            if mask is not None:
+                stacked = stacked[mask]
+            combinations, totals = np.unique(stacked, axis=0, return_counts=True)
+
+        groups = {}
+        for combination, total in zip(combinations, totals.tolist()):
+            groups[tuple(values[code] for (_, values), code in zip(encodings, combination))] = total
+        return groups
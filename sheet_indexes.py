@@ -0,0 +1,136 @@
+"""
+Sheet Indexes Module
+Secondary indexes over a worksheet snapshot: posting lists for categorical
+columns and a trigram index for substring search, so report filters become
+set intersections instead of a scan over every row
+"""
+
+import threading
+from typing import Any, Dict, List, Set, Tuple
+
+import numpy as np
+
+from sheet_columns import ColumnarTable, normalize_category
+
+EMPTY_POSTINGS = np.empty(0, dtype=np.int64)
+
+
+def trigrams(text: str) -> Set[str]:
+    """Distinct 3-character substrings of a (lowercased) string"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def row_matches(conditions: List[Tuple[str, str, Any]], headers: List[str], row: List[str]) -> bool:
+    """Row-at-a-time equivalent of resolving conditions through a FilterIndex.
+
+    Used by streaming scans that never build a snapshot; a condition on a
+    column the sheet lacks matches nothing, as with the index.
+    """
+    for kind, header, value in conditions:
+        if header not in headers:
+            return False
+        position = headers.index(header)
+        cell = normalize_category(row[position]) if position < len(row) else ''
+        if kind == 'equals' and cell != value.lower():
+            return False
+        if kind == 'any_of' and cell not in value:
+            return False
+        if kind == 'contains' and value.lower() not in cell:
+            return False
+    return True
+
+
+class FilterIndex:
+    """Posting lists and n-gram indexes built lazily per column of one snapshot.
+
+    Positions refer to rows of the ColumnarTable, which line up with the
+    snapshot's records list.
+    """
+
+    def __init__(self, columns: ColumnarTable):
+        self.columns = columns
+        self._postings: Dict[str, Dict[str, np.ndarray]] = {}
+        self._ngrams: Dict[str, Dict[str, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def _column_postings(self, header: str) -> Dict[str, np.ndarray]:
+        """Sorted row positions for every distinct normalized value of a column"""
+        postings = self._postings.get(header)
+        if postings is None:
+            with self._lock:
+                postings = self._postings.get(header)
+                if postings is None:
+                    codes, values = self.columns.encoded(header)
+                    # A stable sort groups positions by code while keeping each group ascending
+                    order = np.argsort(codes, kind='stable')
+                    bounds = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(values)))))
+                    postings = {
+                        value: order[bounds[code]:bounds[code + 1]]
+                        for code, value in enumerate(values)
+                    }
+                    self._postings[header] = postings
+        return postings
+
+    def _column_ngrams(self, header: str) -> Dict[str, np.ndarray]:
+        """Trigram -> dictionary codes of the distinct values containing it"""
+        ngrams = self._ngrams.get(header)
+        if ngrams is None:
+            with self._lock:
+                ngrams = self._ngrams.get(header)
+                if ngrams is None:
+                    _, values = self.columns.encoded(header)
+                    collected: Dict[str, List[int]] = {}
+                    for code, value in enumerate(values):
+                        for gram in trigrams(value):
+                            collected.setdefault(gram, []).append(code)
+                    ngrams = {gram: np.array(codes, dtype=np.int64) for gram, codes in collected.items()}
+                    self._ngrams[header] = ngrams
+        return ngrams
+
+    def equals(self, header: str, value: str) -> np.ndarray:
+        """Positions whose normalized cell equals value (case-insensitive)"""
+        return self._column_postings(header).get(value.lower(), EMPTY_POSTINGS)
+
+    def any_of(self, header: str, values: List[str]) -> np.ndarray:
+        """Positions whose normalized cell is one of values"""
+        postings = self._column_postings(header)
+        matches = [postings[value] for value in values if value in postings]
+        if not matches:
+            return EMPTY_POSTINGS
+        return np.sort(np.concatenate(matches))
+
+    def contains(self, header: str, text: str) -> np.ndarray:
+        """Positions whose cell contains text (case-insensitive substring)"""
+        needle = text.lower()
+        _, values = self.columns.encoded(header)
+
+        if len(needle) >= 3:
+            ngrams = self._column_ngrams(header)
+            candidates = None
+            for gram in trigrams(needle):
+                codes = ngrams.get(gram)
+                if codes is None:
+                    return EMPTY_POSTINGS
+                candidates = codes if candidates is None else np.intersect1d(candidates, codes, assume_unique=True)
+                if candidates.size == 0:
+                    return EMPTY_POSTINGS
+            candidate_codes = candidates.tolist()
+        else:
+            # Too short for trigrams; the distinct values are still far fewer than rows
+            candidate_codes = range(len(values))
+
+        matching = [values[code] for code in candidate_codes if needle in values[code]]
+        return self.any_of(header, matching)
+
+    @staticmethod
+    def intersect(position_sets: List[np.ndarray]) -> np.ndarray:
+        """Intersection of sorted position arrays, smallest first"""
+        if not position_sets:
+            return EMPTY_POSTINGS
+        ordered = sorted(position_sets, key=len)
+        result = ordered[0]
+        for positions in ordered[1:]:
+            if result.size == 0:
+                break
+            result = np.intersect1d(result, positions, assume_unique=True)
+        return result
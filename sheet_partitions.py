@@ -0,0 +1,112 @@
+"""
+Sheet Partitions Module
+Monthly partitioning of the report worksheets. With SHEETS_PARTITIONING=monthly
+new reports go to per-month worksheets such as adverse_reactions_2026_10, and
+reads only touch the months that overlap the requested date range. The
+original unpartitioned worksheet stays readable as the partition holding
+everything written before partitioning was enabled.
+"""
+
+import re
+import threading
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+# Values accepted by the SHEETS_PARTITIONING setting
+PARTITIONING_MODES = ['none', 'monthly']
+
+PARTITION_PATTERN = re.compile(r'^(?P<base>[a-z_]+)_(?P<year>\d{4})_(?P<month>\d{2})$')
+REPORT_ID_DATE_PATTERN = re.compile(r'^[A-Z]+-(?P<year>\d{4})(?P<month>\d{2})\d{2}-')
+
+Month = Tuple[int, int]
+
+
+def partition_name(base: str, month: Month) -> str:
+    """Worksheet title of one month of a report sheet, e.g. adverse_reactions_2026_10"""
+    return f'{base}_{month[0]:04d}_{month[1]:02d}'
+
+
+def parse_partition(title: str) -> Optional[Tuple[str, Month]]:
+    """(base sheet, month) of a partition title, or None for other worksheets"""
+    match = PARTITION_PATTERN.match(title)
+    if not match:
+        return None
+    month = int(match.group('month'))
+    if not 1 <= month <= 12:
+        return None
+    return match.group('base'), (int(match.group('year')), month)
+
+
+def month_of(moment: date) -> Month:
+    return moment.year, moment.month
+
+
+def month_of_timestamp(value: str) -> Optional[Month]:
+    """Month of an ISO timestamp cell such as 2026-10-17T09:30:00"""
+    try:
+        return month_of(datetime.fromisoformat(str(value).strip()[:10]))
+    except ValueError:
+        return None
+
+
+def month_of_report_id(report_id: str) -> Optional[Month]:
+    """Month encoded in server-generated IDs such as AR-20261017-3F9A1C2B"""
+    match = REPORT_ID_DATE_PATTERN.match(report_id or '')
+    if not match:
+        return None
+    month = int(match.group('month'))
+    if not 1 <= month <= 12:
+        return None
+    return int(match.group('year')), month
+
+
+class PartitionCatalog:
+    """Known monthly partitions of each report sheet, built from the worksheet titles"""
+
+    def __init__(self, bases: List[str]):
+        self.bases = list(bases)
+        self._partitions: Dict[str, Dict[Month, str]] = {base: {} for base in bases}
+        self._lock = threading.Lock()
+
+    def register(self, title: str) -> bool:
+        """Record a worksheet title if it is a partition of a known sheet"""
+        parsed = parse_partition(title)
+        if parsed is None or parsed[0] not in self._partitions:
+            return False
+        base, month = parsed
+        with self._lock:
+            self._partitions[base][month] = title
+        return True
+
+    def get(self, base: str, month: Month) -> Optional[str]:
+        return self._partitions.get(base, {}).get(month)
+
+    def partitions(self, base: str) -> List[str]:
+        """All partitions of a sheet, oldest first, after the original sheet"""
+        months = self._partitions.get(base, {})
+        return [base] + [months[month] for month in sorted(months)]
+
+    def overlapping(self, base: str, date_from: Optional[date] = None,
+                    date_to: Optional[date] = None) -> List[str]:
+        """Partitions holding reports between date_from and date_to (inclusive), oldest first.
+
+        The original sheet has no date bounds, so it is always included unless
+        the range starts in or after the first partitioned month.
+        """
+        months = self._partitions.get(base, {})
+        first = min(months) if months else None
+        low = month_of(date_from) if date_from else None
+        high = month_of(date_to) if date_to else None
+
+        names = [] if first is not None and low is not None and low >= first else [base]
+        for month in sorted(months):
+            if (low is None or month >= low) and (high is None or month <= high):
+                names.append(months[month])
+        return names
+
+    def is_closed(self, name: str, today: Optional[date] = None) -> bool:
+        """True for partitions that no longer receive new reports (past months and the original sheet)"""
+        parsed = parse_partition(name)
+        if parsed is None:
+            return name in self._partitions and bool(self._partitions[name])
+        return parsed[1] < month_of(today or datetime.now())
@@ -0,0 +1,205 @@
+"""
+Sheets Breaker Module
+Circuit breaker for the Google Sheets backend and the supervisor thread that
+reconnects it. After repeated upstream failures the breaker opens and every
+Sheets call fails immediately instead of waiting on a timeout; the
+supervisor then re-initializes the client with exponential backoff and
+closes the breaker once a trial connection succeeds.
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+class SheetsUnavailable(Exception):
+    """Raised instead of calling Sheets while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Closed -> open after failure_threshold consecutive failures -> half-open trial -> closed.
+
+    Only the thread running a trial (see trial()) may call through while the
+    breaker is half-open, so one probe decides for everyone.
+    """
+
+    def __init__(self, failure_threshold: int = 5):
+        self.failure_threshold = failure_threshold
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.stats = {'opened': 0, 'rejected': 0, 'trials': 0}
+        self._trial_thread: Optional[int] = None
+        self._trial_failed = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != 'closed'
+
+    def allow(self) -> bool:
+        """True if a call may go upstream now"""
+        if self.state == 'closed':
+            return True
+        if self.state == 'half_open' and self._trial_thread == threading.get_ident():
+            return True
+        with self._lock:
+            self.stats['rejected'] += 1
+        return False
+
+    def record_success(self):
+        if self.state == 'closed' and self.failures:
+            with self._lock:
+                self.failures = 0
+
+    def record_failure(self):
+        """Count an upstream failure (outage-type errors only, not quota or 4xx)"""
+        with self._lock:
+            if self.state == 'half_open':
+                self._trial_failed = True
+            elif self.state == 'closed':
+                self.failures += 1
+                if self.failures >= self.failure_threshold:
+                    self._open()
+
+    def _open(self):
+        self.state = 'open'
+        self.opened_at = time.monotonic()
+        self.stats['opened'] += 1
+
+    @contextmanager
+    def trial(self):
+        """Half-open the breaker for calls made by this thread.
+
+        Yields a callable returning whether the trial has failed so far. The
+        breaker closes if the block finishes without recorded failures or
+        exceptions, and re-opens otherwise.
+        """
+        with self._lock:
+            self.state = 'half_open'
+            self._trial_thread = threading.get_ident()
+            self._trial_failed = False
+            self.stats['trials'] += 1
+        succeeded = False
+        try:
+            yield lambda: self._trial_failed
+            succeeded = not self._trial_failed
+        finally:
+            with self._lock:
+                self._trial_thread = None
+                if succeeded:
+                    self.state = 'closed'
+                    self.failures = 0
+                    self.opened_at = None
+                else:
+                    self._open()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(
+            self.stats,
+            state=self.state,
+            consecutive_failures=self.failures,
+            open_for=time.monotonic() - self.opened_at if self.opened_at else 0.0
+        )
+
+
+class SheetsSupervisor:
+    """Background thread that reconnects the Sheets service while it is down"""
+
+    def __init__(self, app, interval: float = 15.0, max_backoff: float = 300.0):
+        self.app = app
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.attempts = 0
+        self.next_attempt = 0.0
+        self.last_error: Optional[str] = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the supervisor thread if it is not already running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='sheets-supervisor', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                with self.app.app_context():
+                    self.check_once()
+            except Exception as e:
+                self.app.logger.error(f"Sheets supervisor check failed: {e}")
+
+    def check_once(self) -> bool:
+        """Reconnect if the service is unavailable or the breaker is open; returns True if healthy"""
+        from google_sheets_service import get_sheets_service
+
+        service = get_sheets_service()
+        breaker = service.scheduler.breaker
+        if service.is_available() and not breaker.is_open:
+            self.attempts = 0
+            return True
+
+        if time.monotonic() < self.next_attempt:
+            return False
+
+        healthy = False
+        error = None
+        try:
+            with breaker.trial() as trial_failed:
+                if service.is_available():
+                    # Client is fine; one cheap call tells whether the upstream recovered
+                    service.probe()
+                else:
+                    service.connect()
+                healthy = service.is_available() and not trial_failed()
+                if not healthy:
+                    breaker.record_failure()
+        except Exception as e:
+            healthy = False
+            error = str(e)
+
+        if healthy:
+            self.app.logger.info(f"Google Sheets backend recovered after {self.attempts + 1} attempt(s)")
+            self.attempts = 0
+            self.last_error = None
+            return True
+
+        # Full-jitter exponential backoff between reconnect attempts
+        self.attempts += 1
+        delay = random.uniform(0, min(self.max_backoff, self.interval * (2 ** self.attempts)))
+        self.next_attempt = time.monotonic() + delay
+        self.last_error = error or f"Reconnect attempt {self.attempts} failed"
+        self.app.logger.warning(f"Google Sheets backend still unavailable, next attempt in {delay:.0f}s")
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'attempts': self.attempts,
+            'next_attempt_in': max(0.0, self.next_attempt - time.monotonic()),
+            'last_error': self.last_error,
+            'running': self._thread is not None and self._thread.is_alive()
+        }
+
+
+# Global supervisor, started once per worker process
+sheets_supervisor = None
+
+
+def start_sheets_supervisor(app) -> SheetsSupervisor:
+    """Create and start the global Sheets supervisor for this process"""
+    global sheets_supervisor
+    if sheets_supervisor is None:
+        sheets_supervisor = SheetsSupervisor(
+            app,
+            interval=app.config.get('SHEETS_SUPERVISOR_INTERVAL', 15.0),
+            max_backoff=app.config.get('SHEETS_SUPERVISOR_MAX_BACKOFF', 300.0)
+        )
+    sheets_supervisor.start()
+    return sheets_supervisor
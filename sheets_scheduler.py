@@ -0,0 +1,280 @@
+"""
+Sheets Scheduler Module
+Single gate for every Google Sheets API call made by this process. Reads and
+writes draw from separate token buckets sized to the per-minute quotas,
+writes are admitted before reads, and 429/5xx responses are retried with
+exponential backoff and full jitter. A 429 pauses the whole bucket so the
+other waiting callers back off too instead of burning the quota further.
+Outage-type failures feed the circuit breaker, which makes calls fail fast
+while the backend is down.
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import gspread
+import requests
+
+from sheets_breaker import CircuitBreaker, SheetsUnavailable
+
+# Lower value is admitted first
+PRIORITIES = {'write': 0, 'read': 1}
+
+# Status codes worth retrying; 429 never applied the request, 5xx may have
+RETRYABLE_SERVER_ERRORS = {500, 502, 503, 504}
+
+
+class SheetsQuotaTimeout(Exception):
+    """Raised when a call waited longer than allowed for a quota token"""
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+class TokenBucket:
+    """Refills per_minute tokens per minute, holding up to burst tokens (0 disables the limit).
+
+    The burst defaults to the whole per-minute quota: Google counts requests
+    per minute, so a minute's worth may go out at once without a 429.
+    """
+
+    def __init__(self, per_minute: int, burst: Optional[float] = None):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1.0, float(per_minute))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float):
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token can be taken (0 when one is available now)"""
+        if now < self.paused_until:
+            return self.paused_until - now
+        if not self.per_minute:
+            return 0.0
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now: float):
+        if self.per_minute:
+            self._refill(now)
+            self.tokens -= 1
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for the next seconds (after a 429)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = min(self.tokens, 0.0)
+
+
+class SheetsScheduler:
+    """Admission control, prioritization and retries for Sheets API calls"""
+
+    def __init__(self, read_per_minute: int = 0, write_per_minute: int = 0, max_concurrency: int = 4,
+                 max_retries: int = 4, base_backoff: float = 1.0, max_backoff: float = 32.0,
+                 max_wait: float = 20.0, failure_threshold: int = 5, read_burst: Optional[float] = None,
+                 write_burst: Optional[float] = None):
+        self.buckets = {
+            'read': TokenBucket(read_per_minute, read_burst),
+            'write': TokenBucket(write_per_minute, write_burst)
+        }
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_wait = max_wait
+        self.breaker = CircuitBreaker(failure_threshold)
+
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of (priority, sequence, kind)
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._random = random.Random()
+        self.stats = {
+            kind: {
+                'calls': 0, 'retries': 0, 'throttled': 0, 'server_errors': 0, 'timeouts': 0,
+                'wait_total': 0.0, 'wait_max': 0.0
+            }
+            for kind in PRIORITIES
+        }
+
+    @classmethod
+    def from_config(cls, config) -> 'SheetsScheduler':
+        return cls(
+            read_per_minute=config.get('SHEETS_READ_QUOTA', 0),
+            write_per_minute=config.get('SHEETS_WRITE_QUOTA', 0),
+            max_concurrency=config.get('SHEETS_MAX_CONCURRENCY', 4),
+            max_retries=config.get('SHEETS_MAX_RETRIES', 4),
+            base_backoff=config.get('SHEETS_BACKOFF_BASE', 1.0),
+            max_backoff=config.get('SHEETS_BACKOFF_MAX', 32.0),
+            max_wait=config.get('SHEETS_MAX_QUEUE_WAIT', 20.0),
+            failure_threshold=config.get('SHEETS_BREAKER_THRESHOLD', 5),
+            read_burst=config.get('SHEETS_READ_BURST'),
+            write_burst=config.get('SHEETS_WRITE_BURST')
+        )
+
+    def _admission_delay(self, entry, now: float) -> Optional[float]:
+        """0 when entry may run now, else how long to sleep before checking again.
+
+        A waiter is admitted when a concurrency slot is free, its bucket has a
+        token, and no waiter ahead of it (writes first, then arrival order)
+        could run right now. Waiters stuck on an empty bucket do not block
+        the other kind.
+        """
+        if self._in_flight >= self.max_concurrency:
+            return None
+        for waiter in sorted(self._waiting):
+            delay = self.buckets[waiter[2]].wait_time(now)
+            if waiter is entry:
+                return delay
+            if delay == 0:
+                return None
+        return None
+
+    def _acquire(self, kind: str, max_wait: float):
+        entry = (PRIORITIES[kind], next(self._sequence), kind)
+        started = time.monotonic()
+        deadline = started + max_wait
+
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = self._admission_delay(entry, now)
+                    if delay == 0:
+                        self.buckets[kind].take(now)
+                        self._in_flight += 1
+                        self.stats[kind]['calls'] += 1
+                        break
+                    if now >= deadline:
+                        self.stats[kind]['timeouts'] += 1
+                        raise SheetsQuotaTimeout(f'Waited {max_wait:.0f}s for a Sheets {kind} quota token')
+                    # Releases and other admissions notify; timed waits cover token refills
+                    self._cond.wait(min(delay if delay is not None else 1.0, deadline - now))
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+            waited = time.monotonic() - started
+            self.stats[kind]['wait_total'] += waited
+            self.stats[kind]['wait_max'] = max(self.stats[kind]['wait_max'], waited)
+
+    def _count(self, kind: str, counter: str):
+        with self._cond:
+            self.stats[kind][counter] += 1
+
+    def _release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        return self._random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+
+    def call(self, kind: str, func: Callable[..., Any], *args, retry_server_errors: bool = True,
+             max_wait: Optional[float] = None, **kwargs) -> Any:
+        """Run func(*args, **kwargs) as one Sheets API request of the given kind ('read' or 'write').
+
+        Set retry_server_errors=False for non-idempotent writes such as
+        appends, where a 5xx may still have applied the request; 429s are
+        always retried because the request was rejected before running.
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        attempt = 0
+        while True:
+            # Checked before every attempt, so retries stop as soon as the breaker opens
+            if not self.breaker.allow():
+                raise SheetsUnavailable('Google Sheets circuit breaker is open')
+
+            self._acquire(kind, max_wait)
+            try:
+                result = func(*args, **kwargs)
+                self.breaker.record_success()
+                return result
+            except (gspread.exceptions.APIError, requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout) as e:
+                status = _status_code(e)
+                if status == 429:
+                    self._count(kind, 'throttled')
+                elif status in RETRYABLE_SERVER_ERRORS or status is None:
+                    self._count(kind, 'server_errors')
+                    self.breaker.record_failure()
+                    if not retry_server_errors:
+                        raise
+                else:
+                    raise
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            finally:
+                self._release()
+
+            attempt += 1
+            self._count(kind, 'retries')
+            if status == 429:
+                # Everyone drawing on this quota backs off, this caller included
+                self.buckets[kind].pause(delay)
+            else:
+                time.sleep(delay)
+
+    def read(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        return self.call('read', func, *args, **kwargs)
+
+    def write(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        return self.call('write', func, *args, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight calls, wait times and retry counters per request kind"""
+        with self._cond:
+            now = time.monotonic()
+            queued = {kind: 0 for kind in PRIORITIES}
+            for _, _, kind in self._waiting:
+                queued[kind] += 1
+
+            stats = {
+                'in_flight': self._in_flight,
+                'max_concurrency': self.max_concurrency,
+                'breaker': self.breaker.get_stats()
+            }
+            for kind, counters in self.stats.items():
+                bucket = self.buckets[kind]
+                bucket.wait_time(now)  # refill so the token count is current
+                stats[kind] = dict(
+                    counters,
+                    queued=queued[kind],
+                    wait_avg=counters['wait_total'] / counters['calls'] if counters['calls'] else 0.0,
+                    quota_per_minute=bucket.per_minute,
+                    tokens=round(bucket.tokens, 2) if bucket.per_minute else None,
+                    paused_for=max(0.0, bucket.paused_until - now)
+                )
+            return stats
+
+
+# One scheduler per process: the quota belongs to the project, not to a service instance
+sheets_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_sheets_scheduler(config) -> SheetsScheduler:
+    """Get (creating on first use) the process-wide scheduler"""
+    global sheets_scheduler
+    if sheets_scheduler is None:
+        with _scheduler_lock:
+            if sheets_scheduler is None:
+                sheets_scheduler = SheetsScheduler.from_config(config)
+    return sheets_scheduler
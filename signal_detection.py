@@ -0,0 +1,293 @@
+"""
+Signal Detection Module
+Disproportionality analysis of the adverse reaction reports. Drug names and
+reaction terms are counted into a sparse drug x reaction contingency table,
+and PRR, ROR and chi-square with 95% confidence intervals are computed for
+every drug-reaction pair at once with NumPy array operations.
+
+Counts are kept per worksheet and extended with only the rows appended since
+the last run, so repeated calls cost little more than the new reports.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from report_dedup import normalize_text
+from sheet_cache import SheetSnapshot
+
+# Two-sided 95% normal quantile for the log-scale confidence intervals
+Z_95 = 1.959963984540054
+
+# Pair codes are drug * PAIR_STRIDE + term, so new terms never re-encode old pairs
+PAIR_STRIDE = 1 << 32
+
+# A reaction description lists its reactions separated by commas, semicolons or lines
+TERM_SEPARATORS = re.compile(r'[,;\n/،؛]+|\s+(?:and|و)\s+')
+
+# Default signal criteria (Evans et al.: at least 3 reports, PRR >= 2, chi-square >= 4)
+DEFAULT_CRITERIA = {
+    'min_count': 3,
+    'min_prr': 2.0,
+    'min_chi2': 4.0,
+    'min_ror_lower': 0.0
+}
+
+# Sort keys accepted by /pharma/signals
+SIGNAL_SORT_KEYS = ['prr', 'ror', 'chi2', 'count']
+
+# Results kept per (sheet state, criteria)
+MAX_CACHED_RESULTS = 32
+
+
+def reaction_terms(description: str) -> List[str]:
+    """Distinct normalized reaction terms of a free-text reaction description"""
+    terms = []
+    for part in TERM_SEPARATORS.split(description or ''):
+        term = normalize_text(part)
+        if term and term not in terms:
+            terms.append(term)
+    return terms
+
+
+def disproportionality(a: np.ndarray, drug_totals: np.ndarray, term_totals: np.ndarray,
+                       total: int) -> Dict[str, np.ndarray]:
+    """PRR, ROR and Yates chi-square of many 2x2 tables at once.
+
+    For each pair, a is the number of reports with the drug and the reaction,
+    drug_totals and term_totals the reports with the drug and with the
+    reaction, and total the number of reports. Pairs with an empty cell get
+    the Haldane correction (0.5 added to every cell) for the ratios and their
+    intervals; the chi-square uses the raw counts.
+    """
+    a = a.astype(np.float64)
+    b = drug_totals - a
+    c = term_totals - a
+    d = total - drug_totals - term_totals + a
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        numerator = total * np.square(np.maximum(np.abs(a * d - b * c) - total / 2.0, 0.0))
+        denominator = (a + b) * (c + d) * (a + c) * (b + d)
+        chi2 = np.where(denominator > 0, numerator / denominator, 0.0)
+
+        correction = np.where((b == 0) | (c == 0) | (d == 0), 0.5, 0.0)
+        a, b, c, d = a + correction, b + correction, c + correction, d + correction
+
+        log_prr = np.log((a / (a + b)) / (c / (c + d)))
+        prr_se = np.sqrt(1 / a - 1 / (a + b) + 1 / c - 1 / (c + d))
+        log_ror = np.log((a * d) / (b * c))
+        ror_se = np.sqrt(1 / a + 1 / b + 1 / c + 1 / d)
+
+    return {
+        'prr': np.exp(log_prr),
+        'prr_lower': np.exp(log_prr - Z_95 * prr_se),
+        'prr_upper': np.exp(log_prr + Z_95 * prr_se),
+        'ror': np.exp(log_ror),
+        'ror_lower': np.exp(log_ror - Z_95 * ror_se),
+        'ror_upper': np.exp(log_ror + Z_95 * ror_se),
+        'chi2': chi2
+    }
+
+
+def _add_counts(counts: np.ndarray, codes: List[int], size: int) -> np.ndarray:
+    """counts grown to size and incremented once per code"""
+    added = np.bincount(np.array(codes, dtype=np.int64), minlength=size)
+    grown = np.zeros(size, dtype=np.int64)
+    grown[:len(counts)] = counts
+    return grown + added
+
+
+class PairCounts:
+    """Report counts per drug, reaction term and drug-term pair of one worksheet"""
+
+    def __init__(self, fetched_at: float, headers: List[str]):
+        self.fetched_at = fetched_at
+        self.headers = list(headers)
+        self.version = None
+        self.rows_seen = 0
+        self.total = 0
+        self.drug_counts = np.zeros(0, dtype=np.int64)
+        self.term_counts = np.zeros(0, dtype=np.int64)
+        self.pair_codes = np.zeros(0, dtype=np.int64)  # sorted, unique
+        self.pair_counts = np.zeros(0, dtype=np.int64)
+
+    def can_extend(self, snapshot: SheetSnapshot) -> bool:
+        """True if snapshot is this table's snapshot plus rows appended below it.
+
+        Tail refreshes keep the original fetched_at, so a different one means
+        the sheet was reloaded in full and may have been edited anywhere. The
+        tolerance absorbs clock conversion of snapshots loaded from the
+        shared store.
+        """
+        return (
+            abs(snapshot.fetched_at - self.fetched_at) < 0.5
+            and snapshot.headers == self.headers
+            and len(snapshot.rows) >= self.rows_seen
+        )
+
+    def add_rows(self, rows: List[List[str]], drugs: Dict[str, int], terms: Dict[str, int]):
+        """Count the reports in rows, adding new drugs and terms to the shared vocabularies"""
+        if 'Drug Name' not in self.headers or 'Reaction Description' not in self.headers:
+            return
+        drug_position = self.headers.index('Drug Name')
+        reaction_position = self.headers.index('Reaction Description')
+
+        drug_codes, term_codes, pair_codes = [], [], []
+        for row in rows:
+            drug = normalize_text(row[drug_position]) if drug_position < len(row) else ''
+            row_terms = reaction_terms(row[reaction_position]) if reaction_position < len(row) else []
+            if not drug or not row_terms:
+                continue
+            drug_code = drugs.setdefault(drug, len(drugs))
+            drug_codes.append(drug_code)
+            for term in row_terms:
+                term_code = terms.setdefault(term, len(terms))
+                term_codes.append(term_code)
+                pair_codes.append(drug_code * PAIR_STRIDE + term_code)
+
+        self.total += len(drug_codes)
+        self.drug_counts = _add_counts(self.drug_counts, drug_codes, len(drugs))
+        self.term_counts = _add_counts(self.term_counts, term_codes, len(terms))
+        if pair_codes:
+            merged = np.concatenate([self.pair_codes, np.array(pair_codes, dtype=np.int64)])
+            weights = np.concatenate([self.pair_counts, np.ones(len(pair_codes), dtype=np.int64)])
+            self.pair_codes, inverse = np.unique(merged, return_inverse=True)
+            self.pair_counts = np.bincount(inverse, weights=weights).astype(np.int64)
+
+
+class SignalDetector:
+    """Incrementally maintained contingency counts and cached signal results"""
+
+    def __init__(self):
+        self.drugs: Dict[str, int] = {}
+        self.terms: Dict[str, int] = {}
+        self._tables: Dict[str, PairCounts] = {}
+        self._results: 'OrderedDict[Any, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'full_builds': 0, 'incremental_updates': 0, 'cache_hits': 0}
+
+    def _refresh(self, snapshots: List[SheetSnapshot]) -> Tuple:
+        """Bring the per-worksheet counts up to date; returns a key identifying their state"""
+        for snapshot in snapshots:
+            table = self._tables.get(snapshot.sheet_name)
+            if table is not None and table.version == snapshot.version:
+                continue
+            if table is None or not table.can_extend(snapshot):
+                table = PairCounts(snapshot.fetched_at, snapshot.headers)
+                self._tables[snapshot.sheet_name] = table
+                self.stats['full_builds'] += 1
+            else:
+                self.stats['incremental_updates'] += 1
+            table.add_rows(snapshot.rows[table.rows_seen:], self.drugs, self.terms)
+            table.rows_seen = len(snapshot.rows)
+            table.version = snapshot.version
+        return tuple(sorted((snapshot.sheet_name, id(self._tables[snapshot.sheet_name]), snapshot.version)
+                            for snapshot in snapshots))
+
+    def _combined(self, names: List[str]):
+        """Counts of several worksheets (monthly partitions) added together"""
+        tables = [self._tables[name] for name in names]
+        drug_counts = np.zeros(len(self.drugs), dtype=np.int64)
+        term_counts = np.zeros(len(self.terms), dtype=np.int64)
+        for table in tables:
+            drug_counts[:len(table.drug_counts)] += table.drug_counts
+            term_counts[:len(table.term_counts)] += table.term_counts
+
+        if len(tables) == 1:
+            pair_codes, pair_counts = tables[0].pair_codes, tables[0].pair_counts
+        else:
+            pair_codes, inverse = np.unique(
+                np.concatenate([table.pair_codes for table in tables]), return_inverse=True
+            )
+            pair_counts = np.bincount(
+                inverse, weights=np.concatenate([table.pair_counts for table in tables])
+            ).astype(np.int64)
+        return pair_codes, pair_counts, drug_counts, term_counts, sum(table.total for table in tables)
+
+    def detect(self, snapshots: List[SheetSnapshot], criteria: Dict[str, Any],
+               sort: str = 'prr') -> Dict[str, Any]:
+        """Drug-reaction pairs meeting the criteria, strongest first.
+
+        criteria holds min_count, min_prr, min_chi2, min_ror_lower and the
+        optional drug / reaction substring filters.
+        """
+        with self._lock:
+            state = self._refresh(snapshots)
+            key = (state, tuple(sorted(criteria.items())), sort)
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                self.stats['cache_hits'] += 1
+                return cached
+
+            pair_codes, a, drug_counts, term_counts, total = self._combined([snapshot.sheet_name for snapshot in snapshots])
+            drug_names = list(self.drugs)
+            term_names = list(self.terms)
+
+        drug_codes = pair_codes // PAIR_STRIDE
+        term_codes = pair_codes % PAIR_STRIDE
+        measures = disproportionality(a, drug_counts[drug_codes], term_counts[term_codes], total)
+
+        keep = (
+            (a >= criteria['min_count'])
+            & (measures['prr'] >= criteria['min_prr'])
+            & (measures['chi2'] >= criteria['min_chi2'])
+            & (measures['ror_lower'] >= criteria['min_ror_lower'])
+        )
+        if criteria.get('drug'):
+            needle = normalize_text(criteria['drug'])
+            keep &= np.isin(drug_codes, [code for code, name in enumerate(drug_names) if needle in name])
+        if criteria.get('reaction'):
+            needle = normalize_text(criteria['reaction'])
+            keep &= np.isin(term_codes, [code for code, name in enumerate(term_names) if needle in name])
+
+        selected = np.flatnonzero(keep)
+        order_by = a if sort == 'count' else measures[sort]
+        selected = selected[np.argsort(-order_by[selected], kind='stable')]
+
+        signals = [
+            {
+                'drug': drug_names[drug_codes[position]],
+                'reaction': term_names[term_codes[position]],
+                'count': int(a[position]),
+                'drug_reports': int(drug_counts[drug_codes[position]]),
+                'reaction_reports': int(term_counts[term_codes[position]]),
+                'prr': round(float(measures['prr'][position]), 4),
+                'prr_ci': [round(float(measures['prr_lower'][position]), 4),
+                           round(float(measures['prr_upper'][position]), 4)],
+                'ror': round(float(measures['ror'][position]), 4),
+                'ror_ci': [round(float(measures['ror_lower'][position]), 4),
+                           round(float(measures['ror_upper'][position]), 4)],
+                'chi2': round(float(measures['chi2'][position]), 4)
+            }
+            for position in selected.tolist()
+        ]
+        result = {'signals': signals, 'total_reports': int(total), 'pairs_evaluated': int(len(a))}
+
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > MAX_CACHED_RESULTS:
+                self._results.popitem(last=False)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, drugs=len(self.drugs), reaction_terms=len(self.terms),
+                    cached_results=len(self._results))
+
+
+# One detector per process; its counts follow the process's sheet snapshots
+signal_detector: Optional[SignalDetector] = None
+_detector_lock = threading.Lock()
+
+
+def get_signal_detector() -> SignalDetector:
+    """Get (creating on first use) the process-wide signal detector"""
+    global signal_detector
+    if signal_detector is None:
+        with _detector_lock:
+            if signal_detector is None:
+                signal_detector = SignalDetector()
+    return signal_detector
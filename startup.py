@@ -0,0 +1,148 @@
+"""
+Startup Module
+Per-worker warm-up for the Flask application. The database setup, the Google
+Sheets connection and the background workers are started from a thread when
+a worker starts, so the first visitor does not wait for Google authentication.
+
+Everything here is keyed on the process ID, which makes it safe with
+``gunicorn --preload``: state created in the master process is discarded in
+each forked worker (see gunicorn.conf.py).
+"""
+
+import os
+import threading
+
+from extensions import db
+from models import User, FAQ
+from google_sheets_service import init_sheets_service, reset_sheets_service
+from shared_cache import reset_shared_store
+import report_outbox
+import report_mirror
+import sheets_scheduler
+import sheets_breaker
+
+_warm_up_lock = threading.Lock()
+
+
+def initialize_database(app):
+    """Create missing tables, the default admin user and seed data"""
+    db.create_all()
+    
+    # Create default admin user if it doesn't exist
+    admin_user = User.query.filter_by(username='admin').first()
+    if not admin_user:
+        admin_user = User(
+            username='admin',
+            email='admin@pharmacovigilance.iq',
+            role='admin',
+            full_name='مدير النظام',
+            department='إدارة النظام'
+        )
+        admin_user.set_password(os.environ.get('ADMIN_PASSWORD', 'admin123'))
+        db.session.add(admin_user)
+        db.session.commit()
+        app.logger.info("Default admin user created")
+    
+    # Seed FAQ data if tables are empty (only PostgreSQL data)
+    if FAQ.query.count() == 0:
+        try:
+            from seed_data_hybrid import seed_database
+            seed_database()
+            app.logger.info("Database seeded successfully")
+        except ImportError:
+            app.logger.warning("seed_data_hybrid module not found, skipping seeding")
+        except Exception as e:
+            app.logger.error(f"Error seeding database: {e}")
+
+
+def initialize_services(app, sheets_service):
+    """Connect the published Sheets service, then start the supervisor, outbox flusher and mirror sync"""
+    try:
+        sheets_service.connect()
+        if sheets_service.is_available():
+            app.logger.info("Google Sheets service initialized successfully")
+        else:
+            app.logger.warning("Google Sheets service not available - reports will not be saved")
+    except Exception as e:
+        app.logger.error(f"Failed to initialize Google Sheets service: {e}")
+    
+    # Keeps retrying the connection if it failed, and probes after upstream outages
+    try:
+        sheets_breaker.start_sheets_supervisor(app)
+    except Exception as e:
+        app.logger.error(f"Failed to start Sheets supervisor: {e}")
+    
+    if app.config.get('OUTBOX_ENABLED'):
+        try:
+            report_outbox.start_outbox_flusher(app)
+            app.logger.info("Report outbox flusher started")
+        except Exception as e:
+            app.logger.error(f"Failed to start report outbox flusher: {e}")
+    
+    if app.config.get('REPORT_MIRROR_ENABLED') and app.config.get('SHEETS_PARTITIONING') == 'monthly':
+        app.logger.warning("Report mirror disabled: it only follows the unpartitioned report worksheets")
+    elif app.config.get('REPORT_MIRROR_ENABLED'):
+        try:
+            report_mirror.start_mirror_sync(app)
+            app.logger.info("Report mirror sync started")
+        except Exception as e:
+            app.logger.error(f"Failed to start report mirror sync: {e}")
+
+
+def _warm_up(app, sheets_service, database_ready: threading.Event):
+    with app.app_context():
+        try:
+            # Skipped in workers forked from a gunicorn master that already did it
+            if not getattr(app, '_database_initialized', False):
+                initialize_database(app)
+        except Exception as e:
+            app.logger.error(f"Failed to initialize database: {e}")
+        finally:
+            # Requests may proceed even if setup failed; they report their own errors
+            database_ready.set()
+            db.session.remove()
+        
+        # The mirror and outbox need the tables, so services come after the database
+        initialize_services(app, sheets_service)
+        db.session.remove()
+
+
+def start_warm_up(app) -> threading.Event:
+    """Start the warm-up thread once per process; returns the database-ready event"""
+    pid = os.getpid()
+    if getattr(app, '_warm_up_pid', None) == pid:
+        return app._database_ready
+    
+    with _warm_up_lock:
+        if getattr(app, '_warm_up_pid', None) != pid:
+            app._database_ready = threading.Event()
+            
+            # Publish the service unconnected so requests see "unavailable" instead of
+            # building (and blocking on) their own client while the warm-up runs
+            with app.app_context():
+                sheets_service = init_sheets_service(connect=False)
+            
+            thread = threading.Thread(
+                target=_warm_up, args=(app, sheets_service, app._database_ready),
+                name='app-warm-up', daemon=True
+            )
+            app._warm_up_pid = pid
+            thread.start()
+    return app._database_ready
+
+
+def reset_after_fork(app):
+    """Discard connections and clients inherited from a preloading parent process"""
+    with app.app_context():
+        # Pooled connections must not be shared between processes
+        db.engine.dispose(close=False)
+    
+    # The gspread client holds a requests session; the worker opens its own
+    reset_sheets_service()
+    sheets_scheduler.sheets_scheduler = None
+    sheets_breaker.sheets_supervisor = None
+    reset_shared_store()
+    
+    # Worker threads do not survive fork; let the warm-up create fresh ones
+    report_outbox.outbox_flusher = None
+    report_mirror.mirror_sync = None
@@ -0,0 +1,72 @@
+"""
+Shared fixtures: the application on the in-process fake Sheets backend
+(see fake_sheets.py) with an in-memory database, warmed up once per session.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Read by config.py at import time, so set before the app is imported
+os.environ['FLASK_ENV'] = 'testing'
+os.environ['REPORT_STORAGE_BACKEND'] = 'fake'
+os.environ['FAKE_SHEETS_KEY'] = f'pytest-{os.getpid()}'
+os.environ['OUTBOX_ENABLED'] = 'false'
+os.environ['REPORT_MIRROR_ENABLED'] = 'false'
+os.environ['SHEETS_READ_QUOTA'] = '0'
+os.environ['SHEETS_WRITE_QUOTA'] = '0'
+os.environ['SHARED_CACHE_URL'] = 'none'
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import app as flask_app
+    from google_sheets_service import get_sheets_service
+    from startup import start_warm_up
+
+    assert start_warm_up(flask_app).wait(30)
+    deadline = time.monotonic() + 30
+    with flask_app.app_context():
+        while not get_sheets_service().is_available():
+            assert time.monotonic() < deadline, 'fake Sheets backend did not connect'
+            time.sleep(0.05)
+    return flask_app
+
+
+@pytest.fixture
+def app_context(app):
+    """An application context; outbox rows written by the test are removed afterwards"""
+    from extensions import db
+    from models import ReportOutbox
+
+    with app.app_context():
+        yield app
+        db.session.rollback()
+        ReportOutbox.query.delete()
+        db.session.commit()
+        db.session.remove()
+
+
+@pytest.fixture
+def sheets_service(app_context):
+    from google_sheets_service import get_sheets_service
+    return get_sheets_service()
+
+
+@pytest.fixture
+def fresh_sheets(app_context, monkeypatch):
+    """A service connected to a new, empty fake spreadsheet, published as the global instance"""
+    import uuid
+
+    import google_sheets_service
+    from google_sheets_service import GoogleSheetsService
+
+    monkeypatch.setitem(app_context.config, 'FAKE_SHEETS_KEY', f'pytest-{uuid.uuid4().hex}')
+    service = GoogleSheetsService()
+    assert service.is_available()
+    monkeypatch.setattr(google_sheets_service, 'sheets_service', service)
+    return service
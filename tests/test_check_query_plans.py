@@ -0,0 +1,33 @@
+from check_query_plans import endpoint_queries, sequential_scans, to_sql
+from extensions import db
+
+
+def _scans(sql):
+    with db.engine.connect() as connection:
+        return sequential_scans(connection, sql, set(db.metadata.tables))
+
+
+def test_unfiltered_single_table_limit_is_exempt_not_ok(app_context):
+    tables, exempt, plan = _scans('SELECT id FROM faqs ORDER BY id LIMIT 20')
+    assert tables == []
+    assert exempt == ['faqs']
+    assert 'SCAN faqs' in plan
+
+
+def test_scans_without_limit_or_with_joins_are_reported(app_context):
+    assert _scans('SELECT id FROM faqs ORDER BY id')[:2] == (['faqs'], [])
+
+    tables, exempt, _ = _scans(
+        'SELECT faqs.answer_ar, drug_alerts.content_ar FROM faqs CROSS JOIN drug_alerts LIMIT 20'
+    )
+    assert exempt == []
+    assert sorted(tables) == ['drug_alerts', 'faqs']
+
+
+def test_endpoint_queries_compile(app_context):
+    with db.engine.connect() as connection:
+        for endpoint, query, full_pass in endpoint_queries():
+            sql = to_sql(query, connection.dialect)
+            tables, _, _ = sequential_scans(connection, sql, set(db.metadata.tables))
+            if not full_pass:
+                assert not tables, endpoint
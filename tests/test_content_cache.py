@@ -0,0 +1,87 @@
+import pytest
+
+from content_cache import get_content_cache
+from extensions import db
+from models import FAQ
+
+
+@pytest.fixture
+def faq(app_context):
+    item = FAQ(question_ar='سؤال', answer_ar='جواب', question_en='Question', answer_en='Answer',
+               category='general')
+    db.session.add(item)
+    db.session.commit()
+    yield item
+    FAQ.query.filter_by(id=item.id).delete()
+    db.session.commit()
+
+
+def _counting_build(calls):
+    def build():
+        calls.append(1)
+        return [item.to_dict() for item in FAQ.query.order_by(FAQ.id)]
+    return build
+
+
+def test_commit_invalidates_the_cached_body(app, faq):
+    cache = get_content_cache(app.config)
+    calls = []
+    build = _counting_build(calls)
+
+    other_version = cache.version('drug_alerts')
+    first = cache.get('faqs', 'test', build)
+    assert cache.get('faqs', 'test', build) is first
+    assert len(calls) == 1
+
+    faq.answer_en = 'Updated answer'
+    db.session.commit()
+    updated = cache.get('faqs', 'test', build)
+    assert len(calls) == 2
+    assert updated.etag != first.etag
+    assert b'Updated answer' in updated.body
+
+    # Other tables keep their versions
+    assert cache.version('drug_alerts') == other_version
+
+
+def test_rollback_keeps_the_cached_body(app, faq):
+    cache = get_content_cache(app.config)
+    calls = []
+    build = _counting_build(calls)
+    cache.get('faqs', 'rollback', build)
+    version = cache.version('faqs')
+
+    faq.answer_en = 'Never committed'
+    db.session.flush()
+    db.session.rollback()
+    assert cache.version('faqs') == version
+    cache.get('faqs', 'rollback', build)
+    assert len(calls) == 1
+
+
+def test_bulk_update_invalidates(app, faq):
+    cache = get_content_cache(app.config)
+    version = cache.version('faqs')
+    FAQ.query.filter_by(id=faq.id).update({'is_active': False})
+    db.session.commit()
+    assert cache.version('faqs') != version
+
+
+def test_endpoint_revalidates_with_etag(app, faq):
+    client = app.test_client()
+    response = client.get('/api/faqs?lang=en')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert any(item['answer'] == 'Answer' for item in response.get_json())
+
+    assert client.get('/api/faqs?lang=en', headers={'If-None-Match': etag}).status_code == 304
+
+    with app.app_context():
+        item = db.session.get(FAQ, faq.id)
+        item.answer_en = 'Changed'
+        db.session.commit()
+
+    response = client.get('/api/faqs?lang=en', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert any(item['answer'] == 'Changed' for item in response.get_json())
@@ -0,0 +1,126 @@
+import gspread
+import pytest
+
+from fake_sheets import FakeSheetsClient
+from google_sheets_service import WORKSHEET_HEADERS
+from report_storage import ReportStorage
+from sheets_scheduler import _status_code
+
+HEADERS = WORKSHEET_HEADERS['adverse_reactions']
+
+
+def _worksheet(key):
+    client = FakeSheetsClient()
+    worksheet = client.open_by_key(key).add_worksheet('reports', rows=100, cols=3)
+    worksheet.update('1:1', [['Timestamp', 'ID', 'Status']])
+    return client, worksheet
+
+
+def _row(report_id, **fields):
+    row = {'Timestamp': '2026-10-17 09:00:00', 'ID': report_id, 'Drug Name': 'Paracetamol', 'Status': 'pending'}
+    row.update(fields)
+    return row
+
+
+def test_spreadsheets_outlive_clients():
+    _, worksheet = _worksheet('fake-shared')
+    worksheet.append_rows([['2026-10-17', 'AR-1', 'pending']])
+
+    reopened = FakeSheetsClient().open_by_key('fake-shared').worksheet('reports')
+    assert reopened.get_all_values() == [['Timestamp', 'ID', 'Status'], ['2026-10-17', 'AR-1', 'pending']]
+
+
+def test_worksheet_lookup_errors():
+    client, _ = _worksheet('fake-errors')
+    spreadsheet = client.open_by_key('fake-errors')
+    with pytest.raises(gspread.WorksheetNotFound):
+        spreadsheet.worksheet('missing')
+    with pytest.raises(gspread.exceptions.APIError) as error:
+        spreadsheet.add_worksheet('reports', rows=10, cols=3)
+    assert _status_code(error.value) == 400
+
+
+def test_append_reports_its_range_and_writes_below_the_last_row():
+    _, worksheet = _worksheet('fake-append')
+    worksheet.update_cell(3, 1, '2026-10-16')  # row 2 left blank, as after a manual delete
+
+    response = worksheet.append_rows([['2026-10-17', 'AR-1'], ['2026-10-17', 'AR-2', 'new']])
+    assert response['updates']['updatedRange'] == "'reports'!A4:C5"
+    assert response['updates']['updatedRows'] == 2
+    assert worksheet.col_values(2) == ['ID', '', '', 'AR-1', 'AR-2']
+
+
+def test_range_reads_are_trimmed_like_sheets():
+    _, worksheet = _worksheet('fake-ranges')
+    worksheet.append_rows([['2026-10-17', 'AR-1', ''], ['2026-10-17', '', 'new']])
+
+    assert worksheet.get('A2:C') == [['2026-10-17', 'AR-1'], ['2026-10-17', '', 'new']]
+    assert worksheet.get('B2:B') == [['AR-1']]
+    assert worksheet.get('A10:C20') == []
+    assert worksheet.batch_get(['A1:A1', 'C2:C']) == [[['Timestamp']], [[], ['new']]]
+
+
+def test_batch_update_writes_every_range():
+    _, worksheet = _worksheet('fake-batch')
+    worksheet.append_rows([['2026-10-17', 'AR-1', 'pending'], ['2026-10-17', 'AR-2', 'pending']])
+    worksheet.batch_update([{'range': 'C2', 'values': [['closed']]}, {'range': 'C3', 'values': [[True]]}])
+    assert worksheet.col_values(3) == ['Status', 'closed', 'TRUE']
+
+
+def test_quota_and_error_injection():
+    client = FakeSheetsClient(read_quota=2)
+    client.open_by_key('fake-quota')
+    client.open_by_key('fake-quota')
+    with pytest.raises(gspread.exceptions.APIError) as error:
+        client.open_by_key('fake-quota')
+    assert _status_code(error.value) == 429
+    assert client.stats['quota_errors'] == 1
+
+    failing = FakeSheetsClient(error_rate=1.0)
+    with pytest.raises(gspread.exceptions.APIError) as error:
+        failing.open_by_key('fake-quota')
+    assert _status_code(error.value) == 503
+    assert failing.stats['errors'] == 1
+
+
+def test_service_sets_up_the_report_worksheets(fresh_sheets):
+    assert isinstance(fresh_sheets, ReportStorage)
+    for sheet_name, headers in WORKSHEET_HEADERS.items():
+        assert fresh_sheets.scheduler.read(fresh_sheets.worksheets[sheet_name].row_values, 1) == headers
+
+
+def test_storage_round_trip(fresh_sheets):
+    assert fresh_sheets.append_rows('adverse_reactions', [_row('AR-1'), _row('AR-2', **{'Drug Name': 'Ibuprofen'})])
+
+    snapshot = fresh_sheets.get_snapshot('adverse_reactions')
+    assert [record['ID'] for record in snapshot.records] == ['AR-1', 'AR-2']
+    rows = fresh_sheets.read_rows('adverse_reactions', 3)
+    assert len(rows) == 1 and len(rows[0]) == len(HEADERS)
+    assert rows[0][HEADERS.index('Drug Name')] == 'Ibuprofen'
+    assert fresh_sheets.append_group('adverse_reactions', _row('AR-3')) == 'adverse_reactions'
+    assert [record['ID'] for record in fresh_sheets.get_adverse_reactions({'drug_name': 'ibu'})] == ['AR-2']
+
+
+def test_status_updates(fresh_sheets):
+    fresh_sheets.append_rows('adverse_reactions', [_row('AR-1'), _row('AR-2')])
+
+    assert fresh_sheets.update_report_status('adverse_reactions', 'AR-2', 'reviewed')
+    assert not fresh_sheets.update_report_status('adverse_reactions', 'AR-9', 'reviewed')
+
+    results = fresh_sheets.batch_update_reports([
+        {'sheet_name': 'adverse_reactions', 'report_id': 'AR-1', 'status': 'closed', 'notes': 'done'},
+        {'sheet_name': 'adverse_reactions', 'report_id': 'AR-9', 'status': 'closed'},
+        {'sheet_name': 'adverse_reactions', 'report_id': 'AR-2'},
+        {'sheet_name': 'unknown', 'report_id': 'AR-1', 'status': 'closed'}
+    ])
+    assert [result['success'] for result in results] == [True, False, False, False]
+    assert [result.get('error') for result in results[1:]] == [
+        'Report not found', 'No fields to update', 'Unknown sheet unknown'
+    ]
+
+    worksheet = fresh_sheets.worksheets['adverse_reactions']
+    statuses = worksheet.col_values(HEADERS.index('Status') + 1)
+    assert statuses == ['Status', 'closed', 'reviewed']
+    # The writes are reflected in the cached snapshot without a reload
+    records = fresh_sheets.get_snapshot('adverse_reactions').records
+    assert [(record['Status'], record['Notes']) for record in records] == [('closed', 'done'), ('reviewed', '')]
@@ -0,0 +1,112 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import ReportOutbox
+from report_dedup import find_duplicate, report_fingerprint
+from report_outbox import enqueue_report
+from routes_hybrid import _queue_report
+
+WINDOW = 1800.0
+
+
+def _row(report_id, **fields):
+    row = {
+        'ID': report_id,
+        'Drug Name': 'Amoxicillin 500mg',
+        'Drug Batch Number': 'B-123',
+        'Reaction Description': 'Skin rash, itching',
+        'Reporter Name': 'Ali Hassan',
+        'Reporter Phone': '07701234567'
+    }
+    row.update(fields)
+    return row
+
+
+def _build_row(data):
+    return _row(data['id'], **data.get('fields', {}))
+
+
+def test_anonymous_reports_have_no_fingerprint():
+    row = _row('AR-1', **{'Reporter Name': '', 'Reporter Phone': ''})
+    assert report_fingerprint('adverse_reactions', row, 1) is None
+    assert report_fingerprint('intruder_reports', _row('IR-1'), 1) is None
+
+
+def test_fingerprint_ignores_formatting():
+    bucket = 42
+    original = report_fingerprint('adverse_reactions', _row('AR-1'), bucket)
+    retyped = _row('AR-2', **{
+        'Drug Name': '  AMOXICILLIN 500MG ',
+        'Drug Batch Number': 'b123',
+        'Reaction Description': 'skin rash - itching',
+        'Reporter Phone': '+964 770 123 4567'
+    })
+    assert report_fingerprint('adverse_reactions', retyped, bucket) == original
+    assert report_fingerprint('adverse_reactions', retyped, bucket + 1) != original
+    other_reporter = _row('AR-3', **{'Reporter Phone': '07709999999'})
+    assert report_fingerprint('adverse_reactions', other_reporter, bucket) != original
+
+
+def test_find_duplicate_within_the_window(app_context):
+    now = datetime.utcnow()
+    fingerprint, _ = find_duplicate('adverse_reactions', _row('AR-1'), WINDOW, now)
+    enqueue_report('adverse_reactions', _row('AR-1'), fingerprint=fingerprint)
+
+    _, original = find_duplicate('adverse_reactions', _row('AR-2'), WINDOW, now + timedelta(seconds=60))
+    assert original is not None and original.report_id == 'AR-1'
+
+    _, original = find_duplicate('adverse_reactions', _row('AR-2'), WINDOW, now + timedelta(seconds=WINDOW + 60))
+    assert original is None
+
+    other = _row('AR-3', **{'Reaction Description': 'headache'})
+    assert find_duplicate('adverse_reactions', other, WINDOW, now)[1] is None
+
+
+def _queue(fields=None):
+    return _queue_report('adverse_reactions', {'fields': fields or {}}, _build_row)
+
+
+@pytest.fixture
+def outbox_config(app_context, monkeypatch):
+    monkeypatch.setitem(app_context.config, 'OUTBOX_ENABLED', True)
+    return app_context.config
+
+
+def test_merge_returns_the_original_report(outbox_config, monkeypatch):
+    monkeypatch.setitem(outbox_config, 'DUPLICATE_REPORT_ACTION', 'merge')
+    first = _queue()
+    assert _queue() == first
+    assert ReportOutbox.query.count() == 1
+
+
+def test_flag_keeps_both_and_marks_the_resubmission(outbox_config, monkeypatch):
+    monkeypatch.setitem(outbox_config, 'DUPLICATE_REPORT_ACTION', 'flag')
+    first = _queue()
+    second = _queue({'Notes': 'called twice'})
+    assert second != first
+
+    entry = ReportOutbox.query.filter_by(report_id=second).one()
+    assert entry.duplicate_of == first
+    assert json.loads(entry.payload)['Notes'] == f'Possible duplicate of {first}. called twice'
+
+    # A third submission is flagged against the original, not the flagged copy
+    third = _queue()
+    assert ReportOutbox.query.filter_by(report_id=third).one().duplicate_of == first
+
+
+def test_anonymous_reports_are_never_merged(outbox_config, monkeypatch):
+    monkeypatch.setitem(outbox_config, 'DUPLICATE_REPORT_ACTION', 'merge')
+    anonymous = {'Reporter Name': '', 'Reporter Phone': ''}
+    assert _queue(anonymous) != _queue(anonymous)
+    assert ReportOutbox.query.filter(ReportOutbox.duplicate_of.isnot(None)).count() == 0
+
+
+def test_off_stores_every_submission(outbox_config, monkeypatch):
+    monkeypatch.setitem(outbox_config, 'DUPLICATE_REPORT_ACTION', 'off')
+    _queue()
+    _queue()
+    entries = ReportOutbox.query.all()
+    assert len(entries) == 2
+    assert all(entry.fingerprint is None and entry.duplicate_of is None for entry in entries)
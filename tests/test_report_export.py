@@ -0,0 +1,67 @@
+import csv
+import io
+import re
+import zipfile
+from datetime import date
+
+from google_sheets_service import WORKSHEET_HEADERS
+from report_export import csv_stream, safe_cell, xlsx_stream
+
+HEADERS = WORKSHEET_HEADERS['adverse_reactions']
+
+
+def _xlsx_cells(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+    return re.findall(r'<t xml:space="preserve">(.*?)</t>', sheet)
+
+
+def test_safe_cell():
+    assert safe_cell('=HYPERLINK("http://x")') == '\'=HYPERLINK("http://x")'
+    assert safe_cell('@SUM(A1)') == "'@SUM(A1)"
+    assert safe_cell('rash') == 'rash'
+    assert safe_cell(None) == ''
+
+
+def test_csv_neutralizes_formulas():
+    data = ''.join(csv_stream(['Reporter Phone', 'Notes'], [['+9647701234567', '=1+1']]))
+    assert data.startswith('\ufeff')
+    rows = list(csv.reader(io.StringIO(data.lstrip('\ufeff'))))
+    assert rows == [['Reporter Phone', 'Notes'], ["'+9647701234567", "'=1+1"]]
+
+
+def test_xlsx_keeps_values_unchanged():
+    data = b''.join(xlsx_stream(['Reporter Phone', 'Reaction Description'],
+                                [['+9647701234567', '- rash & itching']]))
+    assert _xlsx_cells(data) == ['Reporter Phone', 'Reaction Description', '+9647701234567', '- rash &amp; itching']
+
+
+def test_xlsx_streams_many_rows():
+    rows = [[str(n), f'drug {n}'] for n in range(1200)]
+    pieces = list(xlsx_stream(['ID', 'Drug Name'], rows))
+    assert len(pieces) > 3
+    cells = _xlsx_cells(b''.join(pieces))
+    assert cells[-2:] == ['1199', 'drug 1199']
+
+
+def test_export_reads_every_row_without_an_id(fresh_sheets):
+    raw = []
+    for n in range(5):
+        row = [''] * len(HEADERS)
+        row[HEADERS.index('Timestamp')] = f'2026-10-0{n + 1} 09:00:00'
+        row[HEADERS.index('Drug Name')] = f'drug {n}'
+        raw.append(row)
+    fresh_sheets.worksheets['adverse_reactions'].append_rows(raw)
+
+    rows = list(fresh_sheets.iter_report_rows('adverse_reactions', chunk_size=2))
+    assert [row[HEADERS.index('Drug Name')] for row in rows] == [f'drug {n}' for n in range(5)]
+
+
+def test_export_filters(fresh_sheets):
+    fresh_sheets.append_rows('adverse_reactions', [
+        {'Timestamp': '2026-09-30 10:00:00', 'ID': 'AR-1', 'Status': 'pending'},
+        {'Timestamp': '2026-10-01 10:00:00', 'ID': 'AR-2', 'Status': 'pending'},
+        {'Timestamp': '2026-10-02 10:00:00', 'ID': 'AR-3', 'Status': 'closed'}
+    ])
+    rows = fresh_sheets.iter_report_rows('adverse_reactions', {'date_from': date(2026, 10, 1), 'status': 'pending'})
+    assert [row[HEADERS.index('ID')] for row in rows] == ['AR-2']
@@ -0,0 +1,103 @@
+import pytest
+from flask import request
+
+from extensions import db
+from models import AdverseReaction, SheetSyncState
+from report_listing import ListingOptions, decode_cursor, encode_cursor
+from report_mirror import ReportMirrorSync
+from routes_hybrid import _mirror_listing, _sheet_listing
+
+def _row(report_id, timestamp):
+    return {'Timestamp': timestamp, 'ID': report_id, 'Drug Name': 'Paracetamol', 'Status': 'pending'}
+
+
+def _page(app, listing, query):
+    """(report IDs, next cursor) of one listing request"""
+    with app.test_request_context(f'/pharma/adverse_reactions?{query}'):
+        response = listing(ListingOptions.from_request(request))
+        body = response.get_json()
+    return [report['ID'] for report in body['reports']], body['next_cursor']
+
+
+def _all_pages(app, listing, query, cursor=None):
+    ids = []
+    while True:
+        more, cursor = _page(app, listing, f'{query}&cursor={cursor}' if cursor else query)
+        ids += more
+        if not cursor:
+            return ids
+
+
+@pytest.fixture
+def mirror(app, fresh_sheets):
+    yield ReportMirrorSync(app)
+    db.session.rollback()
+    AdverseReaction.query.delete()
+    SheetSyncState.query.delete()
+    db.session.commit()
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(['2026-10-17T09:00:00', 12])) == ['2026-10-17T09:00:00', 12]
+    assert decode_cursor(encode_cursor([None, 3])) == [None, 3]
+    assert decode_cursor('') is None
+    for key in ([1, 2], ['x'], ['x', '2'], ['x', 1], ['x', True]):
+        with pytest.raises(ValueError):
+            decode_cursor(encode_cursor(key))
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor')
+
+
+def test_sheet_listing_continues_after_the_last_row(app, fresh_sheets):
+    worksheet = fresh_sheets.worksheets['adverse_reactions']
+    worksheet.append_rows([[f'2026-10-0{n} 09:00:00', f'AR-{n}'] for n in range(1, 5)])
+    worksheet.batch_update([{'range': 'A3:B3', 'values': [['', '']]}])  # a deleted report leaves row 3 empty
+
+    def listing(options):
+        return _sheet_listing(fresh_sheets.get_report_rows('adverse_reactions', {}), options)
+
+    first, cursor = _page(app, listing, 'limit=2')
+    assert first == ['AR-1', 'AR-3']
+    fresh_sheets.append_rows('adverse_reactions', [_row('AR-5', '2026-10-05 09:00:00')])
+    assert _all_pages(app, listing, 'limit=2', cursor) == ['AR-4', 'AR-5']
+
+    with app.test_request_context('/pharma/adverse_reactions?limit=2&cursor=' + encode_cursor([None, 2])):
+        assert listing(ListingOptions.from_request(request))[1] == 400
+
+
+def test_mirror_listing_is_not_shifted_by_new_reports(app, mirror, fresh_sheets):
+    fresh_sheets.append_rows('adverse_reactions', [
+        _row(f'AR-{n}', f'2026-10-0{n} 09:00:00') for n in range(1, 4)
+    ])
+    mirror.sync_sheet('adverse_reactions')
+
+    def listing(options):
+        return _mirror_listing('adverse_reactions', {}, options)
+
+    first, cursor = _page(app, listing, 'limit=2')
+    assert first == ['AR-3', 'AR-2']
+
+    fresh_sheets.append_rows('adverse_reactions', [_row('AR-4', '2026-10-04 09:00:00')])
+    mirror.sync_sheet('adverse_reactions')
+    assert _page(app, listing, f'limit=2&cursor={cursor}') == (['AR-1'], None)
+
+
+@pytest.mark.parametrize('order', ['desc', 'asc'])
+def test_mirror_listing_pages_through_ties_and_empty_timestamps(app, mirror, fresh_sheets, order):
+    fresh_sheets.append_rows('adverse_reactions', [
+        _row('AR-1', '2026-10-01 09:00:00'),
+        _row('AR-2', 'unknown'),
+        _row('AR-3', '2026-10-01 09:00:00'),
+        _row('AR-4', ''),
+        _row('AR-5', '2026-10-02 09:00:00')
+    ])
+    mirror.sync_sheet('adverse_reactions')
+    filters = {'order': order}
+
+    def listing(options):
+        return _mirror_listing('adverse_reactions', filters, options)
+
+    everything, _ = _page(app, listing, 'limit=10')
+    assert sorted(everything) == ['AR-1', 'AR-2', 'AR-3', 'AR-4', 'AR-5']
+    assert _all_pages(app, listing, 'limit=1') == everything
+    assert _all_pages(app, listing, 'limit=2') == everything
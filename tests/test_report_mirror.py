@@ -0,0 +1,74 @@
+import pytest
+
+from extensions import db
+from models import AdverseReaction, IntruderReport, SheetSyncState
+from report_mirror import (ReportMirrorSync, is_mirror_ready, query_reports, row_to_mapping,
+                           to_sheet_record)
+
+
+def _row(report_id, timestamp, **fields):
+    row = {'Timestamp': timestamp, 'ID': report_id, 'Drug Name': 'Paracetamol', 'Governorate': 'Baghdad',
+           'Status': 'pending'}
+    row.update(fields)
+    return row
+
+
+@pytest.fixture
+def mirror(app, fresh_sheets):
+    yield ReportMirrorSync(app)
+    db.session.rollback()
+    AdverseReaction.query.delete()
+    IntruderReport.query.delete()
+    SheetSyncState.query.delete()
+    db.session.commit()
+
+
+def test_mirror_columns_are_unbounded():
+    for model in (AdverseReaction, IntruderReport):
+        for column in model.__table__.columns:
+            assert getattr(column.type, 'length', None) is None, f'{model.__tablename__}.{column.name}'
+
+
+def test_row_to_mapping():
+    headers = ['Timestamp', 'ID', 'Drug Name', 'Unknown Column']
+    mapping = row_to_mapping(AdverseReaction, headers, ['2026-10-17 09:30:00', ' AR-1 ', 'x' * 5000, 'y'], 7)
+    assert mapping['sheet_row'] == 7
+    assert mapping['report_id'] == 'AR-1'
+    assert mapping['timestamp'].isoformat() == '2026-10-17T09:30:00'
+    assert len(mapping['drug_name']) == 5000
+    assert 'unknown_column' not in mapping
+    assert row_to_mapping(AdverseReaction, headers, ['', ' ', '', ''], 8) is None
+
+
+def test_full_then_incremental_sync(mirror, fresh_sheets):
+    fresh_sheets.append_rows('adverse_reactions', [
+        _row('AR-1', '2026-10-01 09:00:00', **{'Reporter Name': 'n' * 500}),
+        _row('AR-2', '2026-10-02 09:00:00', **{'Drug Name': 'Ibuprofen', 'Governorate': 'Erbil'})
+    ])
+    assert not is_mirror_ready('adverse_reactions')
+    assert mirror.sync_sheet('adverse_reactions') == 2
+    assert is_mirror_ready('adverse_reactions')
+
+    fresh_sheets.append_rows('adverse_reactions', [_row('AR-3', '2026-10-03 09:00:00', Status='closed')])
+    assert mirror.sync_sheet('adverse_reactions') == 1
+    assert db.session.get(SheetSyncState, 'adverse_reactions').last_row == 4
+
+    newest_first = query_reports('adverse_reactions', {}).all()
+    assert [report.report_id for report in newest_first] == ['AR-3', 'AR-2', 'AR-1']
+    assert [r.report_id for r in query_reports('adverse_reactions', {'drug_name': 'IBU'})] == ['AR-2']
+    assert [r.report_id for r in query_reports('adverse_reactions', {'status': 'Closed'})] == ['AR-3']
+    assert [r.report_id for r in query_reports('adverse_reactions', {'governorate': 'erbil'})] == ['AR-2']
+
+    record = to_sheet_record(newest_first[-1], 'adverse_reactions')
+    assert record['ID'] == 'AR-1'
+    assert record['Reporter Name'] == 'n' * 500
+    assert record['Timestamp'] == '2026-10-01T09:00:00'
+
+
+def test_full_sync_picks_up_sheet_edits(mirror, fresh_sheets):
+    fresh_sheets.append_rows('adverse_reactions', [_row('AR-1', '2026-10-01 09:00:00')])
+    mirror.sync_sheet('adverse_reactions')
+
+    assert fresh_sheets.update_report_status('adverse_reactions', 'AR-1', 'reviewed')
+    mirror.sync_sheet('adverse_reactions', full=True)
+    assert [report.status for report in AdverseReaction.query.all()] == ['reviewed']
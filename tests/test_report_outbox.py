@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import ReportOutbox
+from report_outbox import OutboxFlusher, enqueue_report, generate_report_id
+
+
+def _report(drug_name):
+    return {
+        'Timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'ID': generate_report_id('adverse_reactions'),
+        'Drug Name': drug_name,
+        'Reaction Description': 'rash',
+        'Status': 'new'
+    }
+
+
+def _sheet_ids(sheets_service):
+    worksheet = sheets_service.worksheets['adverse_reactions']
+    headers = worksheet.row_values(1)
+    return [row[headers.index('ID')] for row in worksheet.get_all_values()[1:]]
+
+
+def test_generate_report_id():
+    assert generate_report_id('adverse_reactions').startswith('AR-')
+    assert generate_report_id('intruder_reports').startswith('IR-')
+    assert generate_report_id('adverse_reactions') != generate_report_id('adverse_reactions')
+
+
+def test_flush_appends_pending_reports_in_order(app, sheets_service):
+    rows = [_report(f'drug {n}') for n in range(3)]
+    for row in rows:
+        enqueue_report('adverse_reactions', row)
+
+    assert OutboxFlusher(app, batch_size=2).flush_once() == 3
+
+    ids = [row['ID'] for row in rows]
+    sheet_ids = _sheet_ids(sheets_service)
+    assert [report_id for report_id in sheet_ids if report_id in ids] == ids
+    entries = ReportOutbox.query.filter(ReportOutbox.report_id.in_(ids)).all()
+    assert {entry.status for entry in entries} == {'sent'}
+    assert all(entry.sent_date is not None for entry in entries)
+
+    # Nothing is left to send
+    assert OutboxFlusher(app).flush_once() == 0
+
+
+def test_failed_flush_backs_off_and_retries(app, sheets_service, monkeypatch):
+    row = _report('retried drug')
+    enqueue_report('adverse_reactions', row)
+    flusher = OutboxFlusher(app, interval=2.0)
+
+    appends = []
+    monkeypatch.setattr(sheets_service, 'append_rows', lambda sheet, rows: appends.append(rows) and False)
+    assert flusher.flush_once() == 0
+    entry = ReportOutbox.query.filter_by(report_id=row['ID']).one()
+    assert entry.status == 'pending'
+    assert entry.attempts == 1
+    assert entry.last_error == 'Google Sheets append failed'
+    assert entry.next_attempt_at > datetime.utcnow() + timedelta(seconds=3)
+
+    # Still backing off: the batch is not sent again yet
+    assert flusher.flush_once() == 0
+    assert len(appends) == 1
+
+    monkeypatch.undo()
+    entry.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    assert flusher.flush_once() == 1
+    entry = ReportOutbox.query.filter_by(report_id=row['ID']).one()
+    assert entry.status == 'sent'
+    assert entry.last_error is None
+    assert row['ID'] in _sheet_ids(sheets_service)
+
+
+def test_backing_off_report_holds_back_later_ones(app, sheets_service):
+    first, second = _report('first'), _report('second')
+    enqueue_report('adverse_reactions', first)
+    enqueue_report('adverse_reactions', second)
+    head = ReportOutbox.query.filter_by(report_id=first['ID']).one()
+    head.next_attempt_at = datetime.utcnow() + timedelta(minutes=5)
+    db.session.commit()
+
+    assert OutboxFlusher(app).flush_once() == 0
+    assert second['ID'] not in _sheet_ids(sheets_service)
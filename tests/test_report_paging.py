@@ -0,0 +1,49 @@
+from google_sheets_service import WORKSHEET_HEADERS
+
+HEADERS = WORKSHEET_HEADERS['adverse_reactions']
+
+
+def _raw_rows(count, with_ids=False):
+    """Sheet rows as typed in by hand: a timestamp and a drug, an ID only if asked for"""
+    rows = []
+    for n in range(count):
+        row = [''] * len(HEADERS)
+        row[HEADERS.index('Timestamp')] = f'2026-10-{n + 1:02d} 09:00:00'
+        row[HEADERS.index('Drug Name')] = f'drug {n}'
+        if with_ids:
+            row[HEADERS.index('ID')] = f'AR-{n}'
+        rows.append(row)
+    return rows
+
+
+def test_rows_without_an_id_are_counted_and_paged(fresh_sheets):
+    worksheet = fresh_sheets.worksheets['adverse_reactions']
+    worksheet.append_rows(_raw_rows(5))
+
+    assert fresh_sheets.count_rows('adverse_reactions') == 5
+    page = fresh_sheets.get_report_page('adverse_reactions', 1, 3)
+    assert page['total'] == 5
+    assert page['pages'] == 2
+    assert [report['Drug Name'] for report in page['reports']] == ['drug 4', 'drug 3', 'drug 2']
+    last = fresh_sheets.get_report_page('adverse_reactions', 2, 3)
+    assert [report['Drug Name'] for report in last['reports']] == ['drug 1', 'drug 0']
+    assert len(fresh_sheets.get_adverse_reactions()) == 5
+
+
+def test_trailing_rows_without_an_id_are_counted(fresh_sheets):
+    worksheet = fresh_sheets.worksheets['adverse_reactions']
+    worksheet.append_rows(_raw_rows(2, with_ids=True))
+    worksheet.append_rows(_raw_rows(3))
+
+    assert fresh_sheets.count_rows('adverse_reactions') == 5
+    page = fresh_sheets.get_report_page('adverse_reactions', 1, 10)
+    assert [report['ID'] for report in page['reports']] == ['', '', '', 'AR-1', 'AR-0']
+
+
+def test_page_from_a_fresh_snapshot(fresh_sheets):
+    fresh_sheets.worksheets['adverse_reactions'].append_rows(_raw_rows(4))
+    fresh_sheets.get_snapshot('adverse_reactions')
+
+    page = fresh_sheets.get_report_page('adverse_reactions', 2, 3)
+    assert page['total'] == 4
+    assert [report['Drug Name'] for report in page['reports']] == ['drug 0']
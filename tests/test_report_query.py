@@ -0,0 +1,111 @@
+import pytest
+
+from report_query import MAX_GROUP_BY, MAX_TOP_K, QueryError, run_query, validate_spec
+from sheet_columns import ColumnarTable
+
+HEADERS = {
+    'adverse_reactions': ['Timestamp', 'ID', 'Drug Name', 'Drug Manufacturer', 'Reaction Severity',
+                          'Reaction Outcome', 'Patient Age', 'Governorate', 'Status']
+}
+
+
+def test_defaults():
+    assert validate_spec({}, HEADERS) == {
+        'sheet': 'adverse_reactions',
+        'filters': [],
+        'date_from': None,
+        'date_to': None,
+        'group_by': [],
+        'aggregates': [{'fn': 'count'}],
+        'order_by': 'count',
+        'order': 'desc',
+        'top_k': 100
+    }
+
+
+def test_normalizes_filters_and_aggregates():
+    spec = validate_spec({
+        'filters': [
+            {'column': 'Reaction Severity', 'value': ' Severe '},
+            {'column': 'Governorate', 'op': 'in', 'value': ['Erbil', 'Baghdad']}
+        ],
+        'group_by': ['Drug Manufacturer'],
+        'aggregates': [{'fn': 'count'}, {'fn': 'avg', 'column': 'Patient Age'}],
+        'order_by': 'avg_patient_age',
+        'order': 'asc',
+        'top_k': 5000,
+        'date_from': '2026-01-01'
+    }, HEADERS)
+
+    assert spec['filters'] == [
+        {'column': 'Reaction Severity', 'op': 'eq', 'value': 'severe'},
+        {'column': 'Governorate', 'op': 'in', 'value': ['baghdad', 'erbil']}
+    ]
+    assert spec['aggregates'] == [{'fn': 'count'}, {'fn': 'avg', 'column': 'Patient Age'}]
+    assert spec['order'] == 'asc'
+    assert spec['top_k'] == MAX_TOP_K
+    assert spec['date_from'] == '2026-01-01'
+
+
+@pytest.mark.parametrize('spec, message', [
+    ([], 'must be a JSON object'),
+    ({'sheet': 'users'}, "Unknown sheet 'users'"),
+    ({'filters': ['Status']}, 'Each filter must be an object'),
+    ({'filters': [{'column': 'Password', 'value': 'x'}]}, "Unknown column 'Password' in filters"),
+    ({'filters': [{'column': 'Status', 'op': 'like', 'value': 'x'}]}, "Unknown filter op 'like'"),
+    ({'filters': [{'column': 'Status', 'op': 'in', 'value': []}]}, 'needs a non-empty list'),
+    ({'filters': [{'column': 'Status', 'op': 'in', 'value': 'new'}]}, 'needs a non-empty list'),
+    ({'filters': [{'column': 'Status', 'value': ['new']}]}, 'needs a single value'),
+    ({'filters': [{'column': 'Status'}]}, 'needs a single value'),
+    ({'group_by': 'Status'}, 'group_by must be a list'),
+    ({'group_by': ['Status'] * (MAX_GROUP_BY + 1)}, 'group_by must be a list'),
+    ({'group_by': ['Reporter Phone']}, "Unknown column 'Reporter Phone' in group_by"),
+    ({'aggregates': [{'fn': 'median', 'column': 'Patient Age'}]}, 'Each aggregate needs fn'),
+    ({'aggregates': [{'fn': 'sum'}]}, 'Unknown column None in aggregates'),
+    ({'aggregates': [{'fn': 'count'}, {'fn': 'count'}]}, 'Duplicate aggregates'),
+    ({'order_by': 'Status'}, 'order_by must name an aggregate'),
+    ({'top_k': 'all'}, 'top_k must be a number'),
+    ({'date_from': '17/10/2026'}, 'Invalid date_from'),
+    ({'date_to': 20261017}, 'Invalid date_to'),
+])
+def test_rejections(spec, message):
+    with pytest.raises(QueryError, match=message):
+        validate_spec(spec, HEADERS)
+
+
+def test_group_by_counts_and_averages():
+    table = ColumnarTable(HEADERS['adverse_reactions'], [
+        ['2026-10-01', 'AR-1', 'Paracetamol', 'Acme', 'severe', 'recovered', '30', 'Erbil', 'new'],
+        ['2026-10-02', 'AR-2', 'Paracetamol', 'acme ', 'mild', 'recovered', '50', 'Erbil', 'new'],
+        ['2026-10-03', 'AR-3', 'Ibuprofen', 'Other', 'mild', 'unknown', '', 'Basra', 'new']
+    ])
+    spec = validate_spec({'group_by': ['Drug Manufacturer', 'Reaction Outcome'],
+                          'aggregates': [{'fn': 'count'}, {'fn': 'avg', 'column': 'Patient Age'}]}, HEADERS)
+    assert run_query(table, spec) == {
+        'rows': [
+            {'Drug Manufacturer': 'acme', 'Reaction Outcome': 'recovered', 'count': 2, 'avg_patient_age': 40.0},
+            {'Drug Manufacturer': 'other', 'Reaction Outcome': 'unknown', 'count': 1, 'avg_patient_age': None}
+        ],
+        'groups': 2,
+        'matched_rows': 3
+    }
+
+
+def test_group_by_high_cardinality_columns_does_not_overflow():
+    # 60000 distinct values in each of four columns: the combined key space exceeds int64
+    headers = HEADERS['adverse_reactions']
+    rows = [['2026-10-01', f'AR-{n}', f'drug {n}', f'maker {n}', 'mild', 'recovered', str(n % 90), f'place {n}', 'new']
+            for n in range(60000)]
+    rows.append(rows[7])
+    table = ColumnarTable(headers, rows)
+    group_by = ['ID', 'Drug Name', 'Drug Manufacturer', 'Governorate']
+
+    result = run_query(table, validate_spec({'group_by': group_by, 'top_k': 2}, HEADERS))
+    assert result['groups'] == 60000
+    assert result['matched_rows'] == 60001
+    assert result['rows'][0] == {'ID': 'ar-7', 'Drug Name': 'drug 7', 'Drug Manufacturer': 'maker 7',
+                                 'Governorate': 'place 7', 'count': 2}
+
+    counts = table.group_counts(group_by)
+    assert len(counts) == 60000
+    assert counts[('ar-7', 'drug 7', 'maker 7', 'place 7')] == 2
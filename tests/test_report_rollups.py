@@ -0,0 +1,99 @@
+from datetime import date
+
+import pytest
+
+from extensions import db
+from models import ReportRollup, ReportRollupKey, RollupState
+from report_outbox import enqueue_report
+from report_rollups import (period_start, rebuild_rollups, record_report, record_status_change, rollup_key,
+                            rollups_ready, timeseries)
+from sheet_cache import SheetSnapshot
+
+HEADERS = ['Timestamp', 'ID', 'Drug Name', 'Reaction Severity', 'Governorate', 'Status']
+
+
+def _row(report_id, timestamp, drug='Paracetamol', severity='mild', governorate='Erbil', status='new'):
+    return {'Timestamp': timestamp, 'ID': report_id, 'Drug Name': drug, 'Reaction Severity': severity,
+            'Governorate': governorate, 'Status': status}
+
+
+def _snapshot(*rows):
+    return SheetSnapshot('adverse_reactions', [HEADERS] + [[row[header] for header in HEADERS] for row in rows], 1)
+
+
+def _series(**arguments):
+    result = timeseries('adverse_reactions', date(2026, 10, 1), date(2026, 10, 31), **arguments)
+    return {tuple(item['group'].values()): item['points'] for item in result['series']}
+
+
+@pytest.fixture
+def rollups(app_context):
+    yield
+    db.session.rollback()
+    for model in (ReportRollup, ReportRollupKey, RollupState):
+        model.query.delete()
+    db.session.commit()
+
+
+def test_rollup_key_normalizes_dimensions():
+    key = rollup_key('adverse_reactions', _row('AR-1', '2026-10-05 09:00:00', drug=' Para-cetamol ',
+                                               governorate='ERBIL ', status='New'))
+    assert key == {'sheet_name': 'adverse_reactions', 'day': date(2026, 10, 5), 'governorate': 'erbil',
+                   'drug': 'para cetamol', 'severity': 'mild', 'status': 'new'}
+    assert rollup_key('adverse_reactions', _row('AR-2', 'yesterday')) is None
+
+
+def test_period_start():
+    assert period_start(date(2026, 10, 17), 'day') == date(2026, 10, 17)
+    assert period_start(date(2026, 10, 17), 'week') == date(2026, 10, 12)
+    assert period_start(date(2026, 10, 17), 'month') == date(2026, 10, 1)
+
+
+def test_rebuild_counts_the_sheet_and_the_outbox(rollups):
+    snapshot = _snapshot(
+        _row('AR-1', '2026-10-05 09:00:00'),
+        _row('AR-2', '2026-10-05 10:00:00', severity='severe'),
+        _row('', '2026-10-06 09:00:00'),
+        _row('', '2026-10-06 10:00:00'),
+        _row('AR-3', 'not a date')
+    )
+    enqueue_report('adverse_reactions', _row('AR-4', '2026-10-07 09:00:00', drug='Ibuprofen'))
+    enqueue_report('adverse_reactions', _row('AR-5', '2026-09-30 09:00:00'))
+    enqueue_report('adverse_reactions', _row('AR-1', '2026-10-05 09:00:00'))  # appended, not yet marked sent
+
+    assert not rollups_ready('adverse_reactions')
+    assert rebuild_rollups('adverse_reactions', [snapshot]) == 6
+    assert rollups_ready('adverse_reactions')
+    assert db.session.get(ReportRollupKey, 'AR-4').drug == 'ibuprofen'
+
+    assert _series(group_by=['drug']) == {
+        ('paracetamol',): [{'period': '2026-10-05', 'count': 2}, {'period': '2026-10-06', 'count': 2}],
+        ('ibuprofen',): [{'period': '2026-10-07', 'count': 1}]
+    }
+    assert _series(interval='week', filters={'severity': 'Severe'}) == {
+        (): [{'period': '2026-10-05', 'count': 1}]
+    }
+
+
+def test_new_reports_and_status_changes_move_counters(rollups):
+    record_report('adverse_reactions', _row('AR-1', '2026-10-05 09:00:00'))
+    assert ReportRollup.query.count() == 0  # nothing is counted before the first rebuild
+
+    rebuild_rollups('adverse_reactions', [_snapshot(_row('AR-1', '2026-10-05 09:00:00'))])
+    record_report('adverse_reactions', _row('AR-2', '2026-10-05 11:00:00'))
+    db.session.commit()
+    assert _series(group_by=['status']) == {('new',): [{'period': '2026-10-05', 'count': 2}]}
+
+    record_status_change('adverse_reactions', 'AR-2', 'Closed')
+    record_status_change('adverse_reactions', 'AR-9', 'closed')
+    db.session.commit()
+    assert _series(group_by=['status']) == {
+        ('new',): [{'period': '2026-10-05', 'count': 1}],
+        ('closed',): [{'period': '2026-10-05', 'count': 1}]
+    }
+
+    record_status_change('adverse_reactions', 'AR-1', 'closed')
+    db.session.commit()
+    result = timeseries('adverse_reactions', date(2026, 10, 1), date(2026, 10, 31), group_by=['status'])
+    assert [item['group'] for item in result['series']] == [{'status': 'closed'}]
+    assert result['total'] == 2
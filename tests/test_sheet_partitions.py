@@ -0,0 +1,92 @@
+import uuid
+from datetime import date
+
+import pytest
+
+import google_sheets_service
+from google_sheets_service import GoogleSheetsService
+from sheet_partitions import (PartitionCatalog, month_of_report_id, month_of_timestamp, parse_partition,
+                              partition_name)
+
+
+def _row(report_id, timestamp):
+    return {'Timestamp': timestamp, 'ID': report_id, 'Drug Name': 'Paracetamol', 'Status': 'pending'}
+
+
+@pytest.fixture
+def partitioned(app_context, monkeypatch):
+    """A service on a new fake spreadsheet with monthly partitioning"""
+    monkeypatch.setitem(app_context.config, 'FAKE_SHEETS_KEY', f'pytest-{uuid.uuid4().hex}')
+    monkeypatch.setitem(app_context.config, 'SHEETS_PARTITIONING', 'monthly')
+    service = GoogleSheetsService()
+    assert service.is_available()
+    monkeypatch.setattr(google_sheets_service, 'sheets_service', service)
+    return service
+
+
+def test_partition_names_and_months():
+    assert partition_name('adverse_reactions', (2026, 9)) == 'adverse_reactions_2026_09'
+    assert parse_partition('adverse_reactions_2026_09') == ('adverse_reactions', (2026, 9))
+    assert parse_partition('adverse_reactions_2026_13') is None
+    assert parse_partition('adverse_reactions') is None
+    assert month_of_timestamp('2026-10-17T09:30:00') == (2026, 10)
+    assert month_of_timestamp('17/10/2026') is None
+    assert month_of_report_id('AR-20261017-3F9A1C2B') == (2026, 10)
+    assert month_of_report_id('AR-1') is None
+
+
+def test_catalog_selects_overlapping_partitions():
+    catalog = PartitionCatalog(['adverse_reactions'])
+    for title in ('adverse_reactions_2026_10', 'adverse_reactions_2026_08', 'intruder_reports_2026_08', 'notes'):
+        catalog.register(title)
+
+    assert catalog.partitions('adverse_reactions') == [
+        'adverse_reactions', 'adverse_reactions_2026_08', 'adverse_reactions_2026_10'
+    ]
+    # The original sheet only holds reports from before the first partitioned month
+    assert catalog.overlapping('adverse_reactions', date(2026, 7, 1)) == catalog.partitions('adverse_reactions')
+    assert catalog.overlapping('adverse_reactions', date(2026, 9, 1)) == ['adverse_reactions_2026_10']
+    assert catalog.overlapping('adverse_reactions', date(2026, 8, 15), date(2026, 9, 30)) == [
+        'adverse_reactions_2026_08'
+    ]
+    assert catalog.overlapping('adverse_reactions', date_to=date(2026, 7, 31)) == ['adverse_reactions']
+    assert catalog.is_closed('adverse_reactions')
+    assert catalog.is_closed('adverse_reactions_2026_08', today=date(2026, 10, 17))
+    assert not catalog.is_closed('adverse_reactions_2026_10', today=date(2026, 10, 17))
+
+
+def test_reports_are_written_to_and_read_from_their_month(partitioned):
+    partitioned.worksheets['adverse_reactions'].append_rows([['2026-07-20 09:00:00', 'AR-0']])
+    assert partitioned.append_rows('adverse_reactions', [
+        _row('AR-20260910-A', '2026-09-10 09:00:00'),
+        _row('AR-20261001-B', '2026-10-01 09:00:00'),
+        _row('AR-20260912-C', '2026-09-12 09:00:00')
+    ])
+    assert partitioned.append_group('adverse_reactions', _row('AR-1', '2026-10-05')) == 'adverse_reactions_2026_10'
+
+    september = partitioned.worksheets['adverse_reactions_2026_09']
+    assert september.col_values(2) == ['ID', 'AR-20260910-A', 'AR-20260912-C']
+
+    everything = partitioned.get_adverse_reactions()
+    assert [report['ID'] for report in everything] == ['AR-0', 'AR-20260910-A', 'AR-20260912-C', 'AR-20261001-B']
+    rows = partitioned.get_report_rows('adverse_reactions', {'date_from': date(2026, 9, 11)})
+    assert [(worksheet, row, record['ID']) for worksheet, row, record in rows] == [
+        ('adverse_reactions_2026_09', 3, 'AR-20260912-C'),
+        ('adverse_reactions_2026_10', 2, 'AR-20261001-B')
+    ]
+
+    page = partitioned.get_report_page('adverse_reactions', 1, 3)
+    assert page['total'] == 4
+    assert [report['ID'] for report in page['reports']] == ['AR-20261001-B', 'AR-20260912-C', 'AR-20260910-A']
+
+    assert partitioned.update_report_status('adverse_reactions', 'AR-20260910-A', 'reviewed')
+    assert partitioned.update_report_status('adverse_reactions', 'AR-0', 'reviewed')
+    assert september.col_values(september.row_values(1).index('Status') + 1)[1] == 'reviewed'
+
+
+def test_existing_partitions_are_found_on_connect(partitioned, app_context):
+    partitioned.append_rows('adverse_reactions', [_row('AR-20260910-A', '2026-09-10 09:00:00')])
+
+    reconnected = GoogleSheetsService()
+    assert 'adverse_reactions_2026_09' in reconnected.worksheets
+    assert [report['ID'] for report in reconnected.get_adverse_reactions()] == ['AR-20260910-A']
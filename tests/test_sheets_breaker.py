@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+
+from fake_sheets import FakeSheetsClient
+from sheets_breaker import CircuitBreaker, SheetsUnavailable
+from sheets_scheduler import SheetsScheduler
+
+
+def _allowed_from_other_thread(breaker):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(breaker.allow()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert breaker.is_open
+    assert not breaker.allow()
+    stats = breaker.get_stats()
+    assert stats['opened'] == 1
+    assert stats['rejected'] == 1
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    assert breaker.failures == 1
+
+
+def test_successful_trial_closes():
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.record_failure()
+
+    with breaker.trial() as failed:
+        assert breaker.state == 'half_open'
+        assert breaker.allow()
+        assert not _allowed_from_other_thread(breaker)
+        breaker.record_success()
+        assert not failed()
+
+    assert breaker.state == 'closed'
+    assert breaker.failures == 0
+    assert breaker.opened_at is None
+    assert breaker.get_stats()['trials'] == 1
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.record_failure()
+
+    with breaker.trial() as failed:
+        breaker.record_failure()
+        assert failed()
+
+    assert breaker.state == 'open'
+    assert breaker.get_stats()['opened'] == 2
+
+
+def test_trial_raising_reopens():
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.record_failure()
+
+    with pytest.raises(RuntimeError):
+        with breaker.trial():
+            raise RuntimeError('probe failed')
+
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+
+def test_scheduler_fails_fast_once_the_fake_backend_is_down():
+    client = FakeSheetsClient(error_rate=1.0)
+    scheduler = SheetsScheduler(max_retries=10, failure_threshold=2)
+    scheduler._backoff = lambda attempt: 0.0
+
+    with pytest.raises(SheetsUnavailable):
+        scheduler.read(client.open_by_key, 'breaker-outage')
+    # Retries stop as soon as the breaker opens
+    assert client.stats['errors'] == 2
+    assert scheduler.breaker.state == 'open'
+
+    with pytest.raises(SheetsUnavailable):
+        scheduler.read(client.open_by_key, 'breaker-outage')
+    assert client.stats['errors'] == 2
+
+    client.error_rate = 0.0
+    with scheduler.breaker.trial():
+        scheduler.read(client.open_by_key, 'breaker-outage')
+    assert scheduler.breaker.state == 'closed'
+    assert scheduler.read(client.open_by_key, 'breaker-outage').title
@@ -0,0 +1,130 @@
+import time
+
+import gspread
+import pytest
+
+from fake_sheets import FakeSheetsClient, _api_error
+from sheets_scheduler import SheetsQuotaTimeout, SheetsScheduler, TokenBucket, _status_code
+
+
+def _scheduler(**kwargs):
+    scheduler = SheetsScheduler(**kwargs)
+    # Deterministic backoff instead of full jitter
+    scheduler._backoff = lambda attempt: 0.2
+    return scheduler
+
+
+def test_token_bucket_limits_and_refills():
+    bucket = TokenBucket(60, burst=2)
+    now = time.monotonic()
+    bucket.take(now)
+    bucket.take(now)
+    assert bucket.wait_time(now) == pytest.approx(1.0)
+    assert bucket.wait_time(now + 1.0) == 0.0
+
+
+def test_burst_defaults_to_the_per_minute_quota():
+    scheduler = SheetsScheduler.from_config({'SHEETS_READ_QUOTA': 30, 'SHEETS_WRITE_QUOTA': 60})
+    assert scheduler.buckets['read'].capacity == 30
+    assert scheduler.buckets['write'].capacity == 60
+
+    started = time.monotonic()
+    for _ in range(30):
+        scheduler.read(lambda: None)
+    assert time.monotonic() - started < 0.5
+    assert scheduler.buckets['read'].wait_time(time.monotonic()) > 1.0
+
+
+def test_burst_override():
+    scheduler = SheetsScheduler.from_config({'SHEETS_READ_QUOTA': 30, 'SHEETS_READ_BURST': 5.0})
+    assert scheduler.buckets['read'].capacity == 5.0
+    assert TokenBucket(0).capacity == 1.0
+
+
+def test_paused_bucket_hands_out_no_tokens():
+    bucket = TokenBucket(0)
+    assert bucket.wait_time(time.monotonic()) == 0.0
+    bucket.pause(0.5)
+    wait = bucket.wait_time(time.monotonic())
+    assert 0.3 < wait <= 0.5
+
+
+def test_429_pauses_the_bucket_and_retries():
+    scheduler = _scheduler(max_retries=3)
+    calls = []
+
+    def throttled_once():
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise _api_error(429, 'Quota exceeded', 'RESOURCE_EXHAUSTED')
+        return 'ok'
+
+    assert scheduler.read(throttled_once) == 'ok'
+    assert calls[1] - calls[0] >= 0.2
+
+    stats = scheduler.get_stats()
+    assert stats['read']['throttled'] == 1
+    assert stats['read']['retries'] == 1
+    assert stats['read']['calls'] == 2
+    # Quota errors are not outages
+    assert stats['breaker']['consecutive_failures'] == 0
+
+
+def test_429_pause_holds_back_other_callers_of_the_same_kind():
+    scheduler = _scheduler()
+    scheduler.buckets['read'].pause(0.3)
+
+    started = time.monotonic()
+    assert scheduler.write(lambda: 'written') == 'written'
+    assert time.monotonic() - started < 0.2
+    assert scheduler.read(lambda: 'read') == 'read'
+    assert time.monotonic() - started >= 0.25
+
+
+def test_pause_longer_than_max_wait_times_out():
+    scheduler = _scheduler()
+    scheduler.buckets['read'].pause(5)
+    with pytest.raises(SheetsQuotaTimeout):
+        scheduler.read(lambda: None, max_wait=0.1)
+    assert scheduler.get_stats()['read']['timeouts'] == 1
+
+
+def test_fake_backend_quota_errors_surface_after_retries():
+    client = FakeSheetsClient(read_quota=1)
+    scheduler = _scheduler(max_retries=1)
+    scheduler.read(client.open_by_key, 'scheduler-quota')
+
+    with pytest.raises(gspread.exceptions.APIError) as error:
+        scheduler.read(client.open_by_key, 'scheduler-quota')
+    assert _status_code(error.value) == 429
+    assert client.stats['quota_errors'] == 2
+    assert scheduler.get_stats()['read']['throttled'] == 2
+
+
+def test_server_errors_are_not_retried_for_appends():
+    scheduler = _scheduler()
+    calls = []
+
+    def unavailable():
+        calls.append(1)
+        raise _api_error(503, 'The service is currently unavailable.', 'UNAVAILABLE')
+
+    with pytest.raises(gspread.exceptions.APIError):
+        scheduler.write(unavailable, retry_server_errors=False)
+    assert len(calls) == 1
+    assert scheduler.get_stats()['write']['server_errors'] == 1
+    assert scheduler.breaker.failures == 1
+
+
+def test_client_errors_are_raised_immediately():
+    scheduler = _scheduler()
+    calls = []
+
+    def not_found():
+        calls.append(1)
+        raise _api_error(404, 'Requested entity was not found.', 'NOT_FOUND')
+
+    with pytest.raises(gspread.exceptions.APIError):
+        scheduler.read(not_found)
+    assert len(calls) == 1
+    assert scheduler.breaker.failures == 0
@@ -0,0 +1,58 @@
+import math
+
+import numpy as np
+import pytest
+
+from signal_detection import Z_95, disproportionality, reaction_terms
+
+
+def _single(a, b, c, d):
+    """Disproportionality of one 2x2 table given by its four cells"""
+    result = disproportionality(np.array([a]), np.array([a + b]), np.array([a + c]), a + b + c + d)
+    return {name: values[0] for name, values in result.items()}
+
+
+def test_known_table():
+    # 20 of 100 reports for the drug mention the reaction, 10 of 900 for all other drugs
+    result = _single(20, 80, 10, 890)
+
+    assert result['prr'] == pytest.approx(18.0)
+    assert result['ror'] == pytest.approx(22.25)
+    assert result['chi2'] == pytest.approx(1000 * 16500 ** 2 / (100 * 900 * 30 * 970))
+
+    prr_se = math.sqrt(1 / 20 - 1 / 100 + 1 / 10 - 1 / 900)
+    assert result['prr_lower'] == pytest.approx(18.0 * math.exp(-Z_95 * prr_se))
+    assert result['prr_upper'] == pytest.approx(18.0 * math.exp(Z_95 * prr_se))
+    ror_se = math.sqrt(1 / 20 + 1 / 80 + 1 / 10 + 1 / 890)
+    assert result['ror_lower'] == pytest.approx(22.25 * math.exp(-Z_95 * ror_se))
+    assert result['ror_upper'] == pytest.approx(22.25 * math.exp(Z_95 * ror_se))
+
+
+def test_no_disproportion():
+    result = _single(10, 90, 100, 900)
+    assert result['prr'] == pytest.approx(1.0)
+    assert result['ror'] == pytest.approx(1.0)
+    assert result['chi2'] == 0.0
+    assert result['prr_lower'] < 1.0 < result['prr_upper']
+
+
+def test_empty_cell_uses_the_haldane_correction():
+    # The reaction was never reported for any other drug
+    result = _single(5, 15, 0, 980)
+    assert result['prr'] == pytest.approx((5.5 / 21) / (0.5 / 981))
+    assert result['ror'] == pytest.approx((5.5 * 980.5) / (15.5 * 0.5))
+    assert all(math.isfinite(value) for value in result.values())
+
+
+def test_many_tables_at_once():
+    a = np.array([20, 10])
+    result = disproportionality(a, np.array([100, 100]), np.array([30, 100]), 1000)
+    assert result['prr'] == pytest.approx([18.0, 1.0])
+    assert result['ror'] == pytest.approx([22.25, 1.0])
+
+
+def test_reaction_terms():
+    assert reaction_terms('Skin rash, itching; Rash\nnausea and vomiting') == [
+        'skin rash', 'itching', 'rash', 'nausea', 'vomiting'
+    ]
+    assert reaction_terms('') == []
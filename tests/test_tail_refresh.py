@@ -0,0 +1,79 @@
+import time
+
+from google_sheets_service import WORKSHEET_HEADERS
+
+HEADERS = WORKSHEET_HEADERS['adverse_reactions']
+
+
+def _raw_row(report_id, status='pending'):
+    row = [''] * len(HEADERS)
+    row[HEADERS.index('Timestamp')] = '2026-10-17 09:00:00'
+    row[HEADERS.index('ID')] = report_id
+    row[HEADERS.index('Status')] = status
+    return row
+
+
+def _refresh(service):
+    """Let the cached snapshot go stale, as after its TTL, and read it again"""
+    service.snapshot_cache.expire('adverse_reactions')
+    return service.get_snapshot('adverse_reactions')
+
+
+def _ids(snapshot):
+    return [record['ID'] for record in snapshot.records]
+
+
+def test_appended_rows_are_fetched_as_a_tail(fresh_sheets):
+    worksheet = fresh_sheets.worksheets['adverse_reactions']
+    worksheet.append_rows([_raw_row('AR-1'), _raw_row('AR-2')])
+    first = fresh_sheets.get_snapshot('adverse_reactions')
+    stats = dict(fresh_sheets.refresh_stats)
+
+    assert _refresh(fresh_sheets) is first
+    assert fresh_sheets.refresh_stats['revalidated'] == stats['revalidated'] + 1
+
+    worksheet.append_rows([_raw_row('AR-3')])
+    extended = _refresh(fresh_sheets)
+    assert fresh_sheets.refresh_stats['tail'] == stats['tail'] + 1
+    assert fresh_sheets.refresh_stats['full'] == stats['full']
+    assert _ids(extended) == ['AR-1', 'AR-2', 'AR-3']
+    assert _ids(first) == ['AR-1', 'AR-2']  # readers holding the old snapshot are unaffected
+    assert fresh_sheets._find_report_row('adverse_reactions', 'AR-3') == 4
+
+
+def test_own_appends_are_picked_up_by_a_tail_fetch(fresh_sheets):
+    fresh_sheets.get_snapshot('adverse_reactions')
+    stats = dict(fresh_sheets.refresh_stats)
+
+    fresh_sheets.append_rows('adverse_reactions', [{'Timestamp': '2026-10-17 09:00:00', 'ID': 'AR-1'}])
+    assert _ids(fresh_sheets.get_snapshot('adverse_reactions')) == ['AR-1']
+    assert fresh_sheets.refresh_stats['tail'] == stats['tail'] + 1
+
+
+def test_out_of_band_edits_force_a_full_reload(fresh_sheets):
+    worksheet = fresh_sheets.worksheets['adverse_reactions']
+    worksheet.append_rows([_raw_row('AR-1'), _raw_row('AR-2')])
+    fresh_sheets.get_snapshot('adverse_reactions')
+    full = fresh_sheets.refresh_stats['full']
+
+    worksheet.update_cell(3, HEADERS.index('Status') + 1, 'closed')
+    worksheet.append_rows([_raw_row('AR-3')])
+    snapshot = _refresh(fresh_sheets)
+    assert fresh_sheets.refresh_stats['full'] == full + 1
+    assert [record['Status'] for record in snapshot.records] == ['pending', 'closed', 'pending']
+
+    worksheet.update_cell(2, HEADERS.index('ID') + 1, 'AR-9')
+    assert _ids(_refresh(fresh_sheets)) == ['AR-9', 'AR-2', 'AR-3']
+    assert fresh_sheets.refresh_stats['full'] == full + 2
+
+
+def test_old_snapshots_are_reloaded_in_full(fresh_sheets):
+    worksheet = fresh_sheets.worksheets['adverse_reactions']
+    worksheet.append_rows([_raw_row('AR-1')])
+    snapshot = fresh_sheets.get_snapshot('adverse_reactions')
+    full = fresh_sheets.refresh_stats['full']
+
+    snapshot.fetched_at = time.monotonic() - fresh_sheets.snapshot_cache.max_age - 1
+    worksheet.append_rows([_raw_row('AR-2')])
+    assert _ids(_refresh(fresh_sheets)) == ['AR-1', 'AR-2']
+    assert fresh_sheets.refresh_stats['full'] == full + 1